@@ -4,17 +4,17 @@ import asyncio
 import logging
 import random
 import sys
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from datetime import datetime
 from pathlib import Path
-from time import time
+from time import monotonic, time
 from typing import Final
 
 import aiofiles
 import dotenv
 import nextcord
 from httpx import RequestError
-from nextcord.ext import commands
+from nextcord.ext import commands, tasks
 from nextcord.utils import get
 
 import brawl
@@ -41,7 +41,46 @@ OwnerId: Final[int] = 196354892208537600
 EggGuildId: Final[int] = 442403231864324119
 SparCooldown: Final[int] = 7200
 
-BeardlessBot = commands.Bot(
+# Blackjack games nobody has touched for IdleGameTimeout seconds get settled
+# and removed. The reaper checks for them every IdleGameTick seconds.
+IdleGameTimeout: Final[int] = 300
+IdleGameTick: Final[float] = 5.0
+
+# Inactivity deadlines for every game in BlackjackGames, all kept in a single
+# timing wheel so that a game's deadline can be pushed back in O(1).
+IdleGames: bucks.TimingWheel[bucks.BlackjackGame] = bucks.TimingWheel(
+	monotonic(), IdleGameTick,
+)
+
+# A player at a multiplayer table who does not act within TurnTimeout seconds
+# of their turn starting is stayed automatically. Turn deadlines share the
+# reaper with the inactivity deadlines, and are keyed by game, as each table
+# only ever has one player to act. TURNTIMEOUT in .env overrides the default.
+TurnTimeout = 60
+TurnTimers: bucks.TimingWheel[bucks.BlackjackGame] = bucks.TimingWheel(
+	monotonic(), IdleGameTick,
+)
+
+# Multiplayer tables report through a single status message that is edited in
+# place. Reports that arrive within TableEditDelay seconds of the first one
+# are queued here and coalesced into a single edit, which is made by the
+# table's task in TableFlushes.
+TableEditDelay: Final[float] = 1.5
+TableUpdates: dict[bucks.BlackjackGame, list[str]] = {}
+TableFlushes: dict[bucks.BlackjackGame, asyncio.Task[None]] = {}
+
+# Every game in BlackjackGames by game_id, for routing button presses. Button
+# custom ids take the form "blackjack:<action>:<game_id>".
+BlackjackTables: dict[int, bucks.BlackjackGame] = {}
+BlackjackButtonPrefix: Final[str] = "blackjack"
+BlackjackButtons: dict[str, tuple[str, nextcord.ButtonStyle]] = {
+	"hit": ("Hit", nextcord.ButtonStyle.primary),
+	"stay": ("Stay", nextcord.ButtonStyle.secondary),
+	"join": ("Join", nextcord.ButtonStyle.success),
+	"start": ("Start", nextcord.ButtonStyle.success),
+}
+
+BeardlessBot = misc.BbBot(
 	command_prefix="!",
 	case_insensitive=True,
 	help_command=misc.BbHelpCommand(),
@@ -71,12 +110,16 @@ async def on_ready() -> None:
 	triggering an HTTPException.
 
 	The method also initializes sparPings to enable a 2-hour cooldown for the
-	spar command, and chunks (caches) all guilds to speed up operations.
+	spar command, starts the background refresh of Brawlhalla site data, and
+	chunks (caches) all guilds to speed up operations.
 	This also allows you to get a good idea of how many unique users are in
 	all guilds in which Beardless Bot operates.
 	"""
 	logger.info("Beardless Bot %s online!", __version__)
 
+	if not brawl_data_refresher.is_running():
+		brawl_data_refresher.start()
+
 	assert BeardlessBot.user is not None
 	try:
 		async with aiofiles.open("resources/images/prof.png", "rb") as f:
@@ -98,6 +141,9 @@ async def on_ready() -> None:
 			SparPings[guild.id] = dict.fromkeys(brawl.Regions, 0)
 		logger.info("Zeroed SparPings! Sparring is now possible.")
 
+		if not idle_game_reaper.is_running():
+			idle_game_reaper.start()
+
 		logger.info("Chunking guilds, collecting analytics...")
 		members: set[nextcord.Member] = set()
 		for guild in BeardlessBot.guilds:
@@ -112,6 +158,11 @@ async def on_ready() -> None:
 		)
 
 
+@tasks.loop(hours=1)
+async def brawl_data_refresher() -> None:
+	await brawl.refresh_brawl_data()
+
+
 @BeardlessBot.event
 async def on_guild_join(guild: nextcord.Guild) -> None:
 	logger.info("Just joined %s!", guild.name)
@@ -320,6 +371,415 @@ async def on_thread_update(
 	return emb
 
 
+# Blackjack table management:
+
+
+def add_game(
+	game: bucks.BlackjackGame, channel: nextcord.abc.Messageable,
+) -> None:
+	"""
+	Start tracking a game of blackjack.
+
+	Args:
+		game (bucks.BlackjackGame): The game to track
+		channel (nextcord.abc.Messageable): The channel the game is played in
+
+	"""
+	game.channel = channel
+	BlackjackGames.append(game)
+	BlackjackTables[game.game_id] = game
+	IdleGames.schedule(game, IdleGameTimeout, monotonic())
+
+
+def touch_game(game: bucks.BlackjackGame) -> None:
+	"""
+	Push back a game's inactivity deadline after someone acts in it.
+
+	If a multiplayer round is in progress, the player to act gets a fresh
+	TurnTimeout seconds; otherwise, the game's turn deadline is cancelled.
+
+	Args:
+		game (bucks.BlackjackGame): The game that was acted in
+
+	"""
+	now = monotonic()
+	IdleGames.schedule(game, IdleGameTimeout, now)
+	if game.multiplayer and game.started and not game.round_over():
+		TurnTimers.schedule(game, TurnTimeout, now)
+	else:
+		TurnTimers.cancel(game)
+
+
+def remove_game(game: bucks.BlackjackGame) -> None:
+	"""
+	Stop tracking a game of blackjack.
+
+	Args:
+		game (bucks.BlackjackGame): The game to remove
+
+	"""
+	BlackjackGames.remove(game)
+	BlackjackTables.pop(game.game_id, None)
+	IdleGames.cancel(game)
+	TurnTimers.cancel(game)
+
+
+async def reap_idle_games(now: float | None = None) -> int:
+	"""
+	Settle and remove every game whose inactivity deadline has passed.
+
+	Args:
+		now (float | None): The current monotonic time; if None, read the
+			clock (default is None)
+
+	Returns:
+		int: The number of games reaped.
+
+	"""
+	reaped = 0
+	for game in IdleGames.advance(monotonic() if now is None else now):
+		if game not in BlackjackGames:
+			continue
+		remove_game(game)
+		report = game.expire()
+		reaped += 1
+		logger.info(
+			"Reaped idle blackjack game owned by %s.", game.owner.name.name,
+		)
+		if game.channel is not None:
+			try:
+				await game.channel.send(
+					embed=misc.bb_embed("Beardless Bot Blackjack", report),
+				)
+			except nextcord.DiscordException:
+				logger.exception("Failed to send idle game report!")
+	return reaped
+
+
+async def expire_turns(now: float | None = None) -> int:
+	"""
+	Stay every player whose turn deadline has passed.
+
+	Args:
+		now (float | None): The current monotonic time; if None, read the
+			clock (default is None)
+
+	Returns:
+		int: The number of players stayed.
+
+	"""
+	stayed = 0
+	for game in TurnTimers.advance(monotonic() if now is None else now):
+		if (
+			game not in BlackjackGames
+			or not game.started
+			or game.round_over()
+		):
+			continue
+		player = game.players[game.turn_idx]
+		report = (
+			f"{player.name.mention}, you ran out of time.\n"
+			+ game.stay_current_player()
+		)
+		touch_game(game)
+		stayed += 1
+		logger.info("Stayed %s after their turn timed out.", player.name.name)
+		TableUpdates.setdefault(game, []).append(report)
+		await flush_table(game)
+	return stayed
+
+
+@tasks.loop(seconds=IdleGameTick)
+async def idle_game_reaper() -> None:
+	await expire_turns()
+	await reap_idle_games()
+
+
+def update_table(game: bucks.BlackjackGame, report: str) -> None:
+	"""
+	Queue a report for a multiplayer table's status message.
+
+	The first report in a burst schedules a flush of the table for
+	TableEditDelay seconds later, so every report queued in the meantime
+	rides along in the same edit. The caller does not wait for the flush.
+
+	Args:
+		game (bucks.BlackjackGame): The table to report to
+		report (str): What just happened at the table
+
+	"""
+	if game in TableUpdates:
+		TableUpdates[game].append(report)
+		return
+	TableUpdates[game] = [report]
+	TableFlushes[game] = asyncio.create_task(flush_table_later(game))
+
+
+async def flush_table_later(game: bucks.BlackjackGame) -> None:
+	"""
+	Flush a table once TableEditDelay seconds have passed.
+
+	Args:
+		game (bucks.BlackjackGame): The table to flush
+
+	"""
+	try:
+		await asyncio.sleep(TableEditDelay)
+		await flush_table(game)
+	finally:
+		TableFlushes.pop(game, None)
+
+
+async def flush_table(game: bucks.BlackjackGame) -> None:
+	"""
+	Show a table's queued reports and current state in its status message.
+
+	The status message is sent the first time a table is flushed, and edited
+	in place every time after that. If it has since been deleted, a new one
+	is sent. Edits notify no one, so whenever the turn passes to a new
+	player, a short message mentioning them is sent as well.
+
+	Args:
+		game (bucks.BlackjackGame): The table to flush
+
+	"""
+	reports = TableUpdates.pop(game, [])
+	if not reports or game.channel is None:
+		return
+	emb = misc.bb_embed(
+		"Beardless Bot Blackjack",
+		"\n".join(report.strip() for report in reports)[-misc.MaxDescLength:],
+	).add_field(
+		name="Table", value=game.table_status()[:misc.MaxMsgLength],
+	)
+	view = blackjack_controls(game) if game.game_id in BlackjackTables else None
+	try:
+		if game.status is not None:
+			try:
+				game.status = await game.status.edit(embed=emb, view=view)
+			except nextcord.NotFound:
+				game.status = None
+		if game.status is None:
+			game.status = await game.channel.send(embed=emb, view=view)
+		to_act = (
+			game.players[game.turn_idx]
+			if game.started and not game.round_over()
+			else None
+		)
+		if to_act is not game.pinged:
+			game.pinged = to_act
+			if to_act is not None:
+				await game.channel.send(
+					f"{to_act.name.mention}, it is your turn.",
+				)
+	except nextcord.DiscordException:
+		logger.exception("Failed to update blackjack table!")
+
+
+async def send_blackjack_report(
+	ctx: misc.BotContext,
+	report: str,
+	game: bucks.BlackjackGame | None = None,
+	title: str = "Beardless Bot Blackjack",
+) -> None:
+	"""
+	Reply to a blackjack command.
+
+	Reports about a multiplayer table go to its status message; everything
+	else, including errors, is sent as a new message.
+
+	Args:
+		ctx (misc.BotContext): The context of the command
+		report (str): The reply
+		game (bucks.BlackjackGame | None): The game the command acted on,
+			if it succeeded (default is None)
+		title (str): The title of the reply's embed (default is
+			"Beardless Bot Blackjack")
+
+	"""
+	if game is not None and game.multiplayer:
+		update_table(game, report)
+	else:
+		await ctx.send(
+			embed=misc.bb_embed(title, report),
+			view=(
+				blackjack_controls(game)
+				if game is not None and game.game_id in BlackjackTables
+				else None
+			),
+		)
+
+
+def blackjack_controls(game: bucks.BlackjackGame) -> nextcord.ui.View:
+	"""
+	Build the buttons for a game of blackjack.
+
+	Multiplayer tables get Join and Start buttons as well as Hit and Stay.
+	The view is never stored by nextcord, and its buttons have no callbacks
+	of their own; on_blackjack_button routes every press by custom id
+	instead, so the buttons work for as long as the game does.
+
+	Args:
+		game (bucks.BlackjackGame): The game the buttons act on
+
+	Returns:
+		nextcord.ui.View: The buttons.
+
+	"""
+	view = nextcord.ui.View(timeout=None, prevent_update=False)
+	actions = ("hit", "stay", "join", "start") if game.multiplayer else (
+		"hit", "stay",
+	)
+	for action in actions:
+		label, style = BlackjackButtons[action]
+		view.add_item(nextcord.ui.Button(
+			label=label,
+			style=style,
+			custom_id=f"{BlackjackButtonPrefix}:{action}:{game.game_id}",
+		))
+	return view
+
+
+# Blackjack actions, shared by commands and buttons. Each returns a report
+# and, if the action went through, the game it acted on.
+
+
+def blackjack_hit(
+	game: bucks.BlackjackGame, player: bucks.BlackjackPlayer,
+) -> tuple[str, bucks.BlackjackGame | None]:
+	"""Deal a player a card, if it is their turn."""
+	if not game.started:
+		return "Game has not started yet", None
+	if not game.is_turn(player):
+		return f"It is not your turn {player.name.mention}", None
+	assert game.dealerUp is not None
+	report = game.deal_current_player()
+	if (player.check_bust() or player.perfect()) and not game.multiplayer:
+		remove_game(game)
+	else:
+		touch_game(game)
+	return report, game
+
+
+def blackjack_stay(
+	game: bucks.BlackjackGame, player: bucks.BlackjackPlayer,
+) -> tuple[str, bucks.BlackjackGame | None]:
+	"""Stay a player, if it is their turn."""
+	if not game.started:
+		return "Game has not started yet", None
+	if not game.is_turn(player):
+		return f"It is not your turn {player.name.mention}", None
+	report = game.stay_current_player()
+	if not game.multiplayer:
+		remove_game(game)
+	else:
+		touch_game(game)
+	return report, game
+
+
+def blackjack_start(
+	game: bucks.BlackjackGame, player: bucks.BlackjackPlayer,
+) -> tuple[str, bucks.BlackjackGame | None]:
+	"""Start a multiplayer round, if the table's owner asks."""
+	if game.owner is not player:
+		return "You are not the owner of this table", None
+	if not game.multiplayer or game.started:
+		return "The round has already started", None
+	if not game.ready_to_start():
+		return "Not all players have made their bets", None
+	report = "Match started\n" + game.start_game()
+	touch_game(game)
+	return report, game
+
+
+def blackjack_join(
+	game: bucks.BlackjackGame, user: nextcord.User | nextcord.Member,
+) -> tuple[str, bucks.BlackjackGame | None]:
+	"""Seat a user at a multiplayer table between rounds."""
+	host = game.owner.name.mention
+	if "," in user.name:
+		return bucks.CommaWarn.format(user.mention), None
+	if bucks.player_in_game(BlackjackGames, user):
+		return bucks.FinMsg.format(user.mention), None
+	if not game.multiplayer:
+		return f"Can't join {host}'s singleplayer blackjack game.", None
+	if game.started:
+		return (
+			f"Cannot join {host}'s blackjack game mid-round."
+			" Please wait for the round to end."
+		), None
+	game.add_player(user)
+	touch_game(game)
+	return f"{user.mention} joined {host}'s blackjack game.", game
+
+
+PlayerActions: dict[str, Callable[
+	[bucks.BlackjackGame, bucks.BlackjackPlayer],
+	tuple[str, bucks.BlackjackGame | None],
+]] = {"hit": blackjack_hit, "stay": blackjack_stay, "start": blackjack_start}
+
+
+def press_button(
+	custom_id: str, user: nextcord.User | nextcord.Member,
+) -> tuple[str, bucks.BlackjackGame | None] | None:
+	"""
+	Route a blackjack button press straight to its game.
+
+	Args:
+		custom_id (str): The custom id of the button that was pressed
+		user (nextcord.User or Member): The user who pressed it
+
+	Returns:
+		tuple[str, bucks.BlackjackGame | None] | None: None if the button
+		is not a blackjack button; otherwise, the report and, if the
+		action went through, the game it acted on.
+
+	"""
+	prefix, _, rest = custom_id.partition(":")
+	action, _, game_id = rest.partition(":")
+	if prefix != BlackjackButtonPrefix or action not in BlackjackButtons:
+		return None
+	if (
+		not game_id.isdecimal()
+		or (game := BlackjackTables.get(int(game_id))) is None
+	):
+		return "This game of blackjack is over.", None
+	if action == "join":
+		return blackjack_join(game, user)
+	if (player := game.get_player(user)) is None:
+		return f"You are not playing in this game, {user.mention}.", None
+	return PlayerActions[action](game, player)
+
+
+@BeardlessBot.listen("on_interaction")
+async def on_blackjack_button(
+	interaction: nextcord.Interaction[commands.Bot],
+) -> int:
+	if (
+		interaction.type != nextcord.InteractionType.component
+		or interaction.data is None
+		or interaction.user is None
+		or (result := press_button(
+			str(interaction.data.get("custom_id", "")), interaction.user,
+		)) is None
+	):
+		return -1
+	report, game = result
+	emb = misc.bb_embed("Beardless Bot Blackjack", report)
+	if game is None:
+		await interaction.response.send_message(embed=emb, ephemeral=True)
+	elif game.multiplayer:
+		await interaction.response.defer()
+		update_table(game, report)
+	elif game.game_id in BlackjackTables:
+		await interaction.response.send_message(
+			embed=emb, view=blackjack_controls(game),
+		)
+	else:
+		await interaction.response.send_message(embed=emb)
+	return 1
+
+
 # Commands:
 
 
@@ -333,7 +793,11 @@ async def cmd_flip(ctx: misc.BotContext, bet: str = "10") -> int:
 		report = (
 			bucks.FinMsg.format(ctx.author.mention)
 			if bucks.player_in_game(BlackjackGames, ctx.author)
-			else bucks.flip(ctx.author, bet.lower())
+			else bucks.flip(
+				ctx.author,
+				bet.lower(),
+				misc.new_rng(context=misc.rng_context(ctx)),
+			)
 		)
 	await ctx.send(embed=misc.bb_embed("Beardless Bot Coin Flip", report))
 	return 1
@@ -344,6 +808,7 @@ async def cmd_flip(ctx: misc.BotContext, bet: str = "10") -> int:
 async def cmd_blackjack(ctx: misc.BotContext, bet: str = "10") -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
+	table = None
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
 	elif bucks.player_in_game(BlackjackGames, ctx.author):
@@ -354,10 +819,13 @@ async def cmd_blackjack(ctx: misc.BotContext, bet: str = "10") -> int:
 			assert bet_report is not None
 			report = bet_report
 		else:
-			report, game = bucks.blackjack(ctx.author, bet)
+			report, game = bucks.blackjack(
+				ctx.author, bet, context=misc.rng_context(ctx),
+			)
 			if game and not game.round_over():
-				BlackjackGames.append(game)
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+				add_game(game, ctx.channel)
+				table = game
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -365,6 +833,7 @@ async def cmd_blackjack(ctx: misc.BotContext, bet: str = "10") -> int:
 async def cmd_tableleave(ctx: misc.BotContext) -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
+	table = None
 	if result := bucks.player_in_game(BlackjackGames, ctx.author):
 		game, player = result
 		if not game.multiplayer:
@@ -375,22 +844,27 @@ async def cmd_tableleave(ctx: misc.BotContext) -> int:
 		elif game.started:
 			report = "Cannot leave mid-round. Please wait for the round to end."
 		elif len(game.players) == 1:
-			BlackjackGames.remove(game)
+			remove_game(game)
+			table = game
 			report = "Game disbanded.\n"
 		elif player == game.owner:
 			assert game.owner == game.players[0]
 			game.players.remove(player)
 			game.owner = game.players[0]
+			touch_game(game)
+			table = game
 			report = (
-				f"You left. {game.owner.name.mention} "
+				f"{ctx.author.mention} left. {game.owner.name.mention} "
 				"you are now the owner of the game.\n"
 			)
 		else:
 			game.players.remove(player)
-			report = "You left.\n"
+			touch_game(game)
+			table = game
+			report = f"{ctx.author.mention} left.\n"
 	else:
 		report = bucks.NoMultiplayerGameMsg.format(ctx.author.mention)
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -401,13 +875,16 @@ async def cmd_tablenew(ctx: misc.BotContext) -> int:
 		return -1
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
+	table = None
 	if bucks.player_in_game(BlackjackGames, ctx.author):
 		report = bucks.FinMsg.format(ctx.author.mention)
 	else:
-		report, game = bucks.blackjack(ctx.author, None)
-		if game:
-			BlackjackGames.append(game)
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+		report, table = bucks.blackjack(
+			ctx.author, None, context=misc.rng_context(ctx),
+		)
+		if table:
+			add_game(table, ctx.channel)
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -416,6 +893,7 @@ async def cmd_tablebet(ctx: misc.BotContext, bet: str = "10") -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
 	report: str | None
+	table = None
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
 	else:
@@ -437,8 +915,10 @@ async def cmd_tablebet(ctx: misc.BotContext, bet: str = "10") -> int:
 							f"{bet_number}\n{ctx.author.mention}"
 						)
 						player.bet = bet_number
+						touch_game(game)
+						table = game
 					assert report is not None
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -446,25 +926,14 @@ async def cmd_tablebet(ctx: misc.BotContext, bet: str = "10") -> int:
 async def cmd_deal(ctx: misc.BotContext) -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
+	table = None
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
 	else:
 		report = bucks.NoGameMsg.format(ctx.author.mention)
 		if result := bucks.player_in_game(BlackjackGames, ctx.author):
-			game, player = result
-			if not game.started:
-				report = "Game has not started yet"
-			elif not game.is_turn(player):
-				report = f"It is not your turn {ctx.author.mention}"
-			else:
-				assert game.dealerUp is not None
-				report = game.deal_current_player()
-				if (
-					(player.check_bust() or player.perfect())
-					and not game.multiplayer
-				):
-					BlackjackGames.remove(game)
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+			report, table = blackjack_hit(*result)
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -473,16 +942,10 @@ async def cmd_tablestart(ctx: misc.BotContext) -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
 	report = bucks.NoGameMsg.format(ctx.author.mention)
+	table = None
 	if result := bucks.player_in_game(BlackjackGames, ctx.author):
-		game, player = result
-		if game.owner is not player:
-			report = "You are not the owner of this table"
-		elif not game.ready_to_start():
-			report = "Not all players have made their bets"
-		else:
-			report = "Match started\n"
-			report += game.start_game()
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
+		report, table = blackjack_start(*result)
+	await send_blackjack_report(ctx, report, table)
 	return 1
 
 
@@ -493,6 +956,7 @@ async def cmd_tablejoin(
 ) -> int:
 	if misc.ctx_created_thread(ctx) or not ctx.guild:
 		return -1
+	table = None
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
 	else:
@@ -500,28 +964,11 @@ async def cmd_tablejoin(
 			ctx, target, BeardlessBot,
 		)):
 			return 0
-		if result := bucks.player_in_game(BlackjackGames, ctx.author):
-			report = bucks.FinMsg.format(ctx.author.mention)
-		elif result := bucks.player_in_game(BlackjackGames, join_target):
-			game, _ = result
-			if game.multiplayer:
-				if game.started:
-					game.add_player(ctx.author)
-					report = f"Joined {join_target.mention}'s blackjack game."
-				else:
-					report = (
-						f"Cannot join {join_target.mention}'s "
-						"blackjack game mid-round. "
-						"Please wait for the round to end."
-					)
-			else:
-				report = (
-					f"Can't join {join_target.mention}'s "
-					"singleplayer blackjack game."
-				)
+		if result := bucks.player_in_game(BlackjackGames, join_target):
+			report, table = blackjack_join(result[0], ctx.author)
 		else:
 			report = f"Player {join_target.mention} is not in a blackjack game"
-	await ctx.send(embed=misc.bb_embed("Beardless Bot Join", report))
+	await send_blackjack_report(ctx, report, table, "Beardless Bot Join")
 	# if channel := misc.get_log_channel(ctx.guild):
 	# 	await channel.send(embed=logs.log_mute(
 	# 		join_target, ctx.message, duration,
@@ -533,20 +980,30 @@ async def cmd_tablejoin(
 async def cmd_stay(ctx: misc.BotContext) -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
+	table = None
 	if "," in ctx.author.name:
 		report = bucks.CommaWarn.format(ctx.author.mention)
 	else:
 		report = bucks.NoGameMsg.format(ctx.author.mention)
 		if result := bucks.player_in_game(BlackjackGames, ctx.author):
-			game, player = result
-			if not game.started:
-				report = "Game has not started yet"
-			elif not game.is_turn(player):
-				report = f"It is not your turn {ctx.author.mention}"
-			else:
-				report = game.stay_current_player()
-				if not game.multiplayer:
-					BlackjackGames.remove(game)
+			report, table = blackjack_stay(*result)
+	await send_blackjack_report(ctx, report, table)
+	return 1
+
+
+@BeardlessBot.command(name="hint")
+async def cmd_hint(ctx: misc.BotContext) -> int:
+	if misc.ctx_created_thread(ctx):
+		return -1
+	report = bucks.NoGameMsg.format(ctx.author.mention)
+	if result := bucks.player_in_game(BlackjackGames, ctx.author):
+		game, player = result
+		if not game.started:
+			report = "Game has not started yet"
+		elif not game.is_turn(player):
+			report = f"It is not your turn {ctx.author.mention}"
+		else:
+			report = game.hint(player)
 	await ctx.send(embed=misc.bb_embed("Beardless Bot Blackjack", report))
 	return 1
 
@@ -826,7 +1283,9 @@ async def cmd_roll(
 ) -> int:
 	if misc.ctx_created_thread(ctx):
 		return -1
-	await ctx.send(embed=misc.roll_report(dice, ctx.author))
+	await ctx.send(embed=misc.roll_report(
+		dice, ctx.author, misc.new_rng(context=misc.rng_context(ctx)),
+	))
 	return 1
 
 
@@ -1145,8 +1604,13 @@ async def cmd_brawlclaim(ctx: misc.BotContext, url_or_id: str = "None") -> int:
 		else await brawl.get_brawl_id(BrawlKey, url_or_id)
 	)
 	if brawl_id is not None:
+		others = brawl.Claims.owners_of(brawl_id) - {ctx.author.id}
 		brawl.claim_profile(ctx.author.id, brawl_id)
 		report = "Profile claimed."
+		if others:
+			report += " Note that this profile is also claimed by {}.".format(
+				", ".join(f"<@{user_id}>" for user_id in sorted(others)),
+			)
 	else:
 		report = "Invalid profile URL/Brawlhalla ID! " + brawl.BadClaim
 	await ctx.send(embed=misc.bb_embed(
@@ -1155,6 +1619,20 @@ async def cmd_brawlclaim(ctx: misc.BotContext, url_or_id: str = "None") -> int:
 	return 1
 
 
+@BeardlessBot.command(name="whois")
+async def cmd_whois(ctx: misc.BotContext, brawl_id: str = "") -> int:
+	if misc.ctx_created_thread(ctx) or not BrawlKey:
+		return -1
+	if not brawl_id.isnumeric():
+		await ctx.send(embed=misc.bb_embed(
+			"Beardless Bot Brawlhalla Whois",
+			"Please do !whois followed by a Brawlhalla ID.",
+		))
+		return 0
+	await ctx.send(embed=brawl.whois(int(brawl_id)))
+	return 1
+
+
 @BeardlessBot.command(name="brawlrank")
 async def cmd_brawlrank(ctx: misc.BotContext, *, target: str = "") -> int:
 	if misc.ctx_created_thread(ctx) or not ctx.guild or not BrawlKey:
@@ -1186,11 +1664,30 @@ async def cmd_brawlstats(ctx: misc.BotContext, *, target: str = "") -> int:
 		return -1
 	stats_target: misc.TargetTypes | None = misc.get_target(ctx, target)
 	report = "Invalid target!"
+	legend: dict[str, str] | None = None
 	if isinstance(stats_target, str):
-		stats_target = misc.member_search(ctx.message, stats_target)
+		# A legend's exact name gets the author's stats for that legend.
+		# Otherwise, look for a member first, then for a misspelt legend.
+		# Names that merely contain the target don't count, so that a
+		# misspelt member isn't mistaken for some random legend.
+		name = stats_target.lower()
+		brawl.Legends.ensure_loaded()
+		member = None
+		if (
+			(legend := brawl.Legends.by_key.get(name)) is None
+			and (member := misc.member_search(ctx.message, name)) is None
+		):
+			legend = brawl.Legends.closest(name)
+		stats_target = member if legend is None else ctx.author
 	if stats_target:
 		try:
-			emb = await brawl.get_stats(stats_target, BrawlKey)
+			emb = (
+				await brawl.get_stats(stats_target, BrawlKey)
+				if legend is None
+				else await brawl.get_legend_stats(
+					stats_target, BrawlKey, legend["legend_name_key"],
+				)
+			)
 		except RequestError as e:
 			misc.log_exception(e, ctx)
 			report = brawl.RequestLimit
@@ -1226,6 +1723,51 @@ async def cmd_brawlclan(ctx: misc.BotContext, *, target: str = "") -> int:
 	return 0
 
 
+@BeardlessBot.command(name="brawlboard")
+async def cmd_brawlboard(ctx: misc.BotContext) -> int:
+	if misc.ctx_created_thread(ctx) or not ctx.guild or not BrawlKey:
+		return -1
+	try:
+		async with ctx.typing():
+			emb = await brawl.brawl_board(ctx.guild, BrawlKey)
+	except RequestError as e:
+		misc.log_exception(e, ctx)
+		await ctx.send(embed=misc.bb_embed(
+			"Beardless Bot Brawlhalla Leaderboard", brawl.RequestLimit,
+		))
+		return 0
+	await ctx.send(embed=emb)
+	return 1
+
+
+@BeardlessBot.command(name="brawlglory")
+async def cmd_brawlglory(ctx: misc.BotContext, *, target: str = "") -> int:
+	if misc.ctx_created_thread(ctx) or not ctx.guild or not BrawlKey:
+		return -1
+	glory_target: misc.TargetTypes | None = misc.get_target(ctx, target)
+	report = "Invalid target!"
+	if isinstance(glory_target, str) and glory_target.lower() != "server":
+		glory_target = misc.member_search(ctx.message, glory_target)
+	if glory_target:
+		try:
+			if isinstance(glory_target, str):
+				# !brawlglory server estimates glory for everyone at once
+				async with ctx.typing():
+					emb = await brawl.glory_board(ctx.guild, BrawlKey)
+			else:
+				emb = await brawl.get_glory(glory_target, BrawlKey)
+		except RequestError as e:
+			misc.log_exception(e, ctx)
+			report = brawl.RequestLimit
+		else:
+			await ctx.send(embed=emb)
+			return 1
+	await ctx.send(embed=misc.bb_embed(
+		"Beardless Bot Brawlhalla Glory", report,
+	))
+	return 0
+
+
 @BeardlessBot.command(name="brawllegend")
 async def cmd_brawllegend(ctx: misc.BotContext, legend: str = "") -> int:
 	if misc.ctx_created_thread(ctx) or not BrawlKey:
@@ -1383,12 +1925,40 @@ async def handle_messages(message: nextcord.Message) -> int:
 # Main:
 
 
+def use_brawl_api(env: dict[str, str | None]) -> None:
+	"""
+	Point BB at the Brawlhalla API named in .env, if any.
+
+	BRAWLAPIROOT and BRAWLQUOTAS point BB at a stand-in API, such as
+	brawlserver.py, for load tests; BRAWLQUOTAS looks like "180/900,10/1",
+	each quota's request limit and period in seconds.
+
+	Args:
+		env (dict[str, str | None]): The values in .env
+
+	"""
+	quotas: tuple[tuple[int, float], ...] | None = None
+	if (spec := env.get("BRAWLQUOTAS")) is not None:
+		try:
+			quotas = brawl.parse_quotas(spec)
+		except ValueError:
+			logger.warning(
+				"BRAWLQUOTAS must look like 180/900,10/1, not %r. Using the"
+				" default quotas.",
+				spec,
+			)
+	if (root := env.get("BRAWLAPIROOT")) or quotas is not None:
+		brawl.use_api(root or brawl.BrawlApiRoot, quotas)
+
+
 def launch() -> None:
 	"""
 	Launch Beardless Bot.
 
-	Pulls in the Brawlhalla API key and Discord token from .env. BB will still
-	run without a Brawlhalla API key, but not having a Discord token is fatal.
+	Pulls in the Brawlhalla API key, Discord token, and optional RNG seed,
+	blackjack turn timeout, and Brawlhalla API root and quotas from .env.
+	BB will still run without a Brawlhalla API key, but not having a
+	Discord token is fatal.
 
 	Note that commands.Bot.run() is blocking; you can't include any method
 	calls after that if you actually want them to fire.
@@ -1404,6 +1974,32 @@ def launch() -> None:
 			" commands will not be active.",
 		)
 
+	if (seed := env.get("RNGSEED")) is not None:
+		try:
+			misc.seed_rng(int(seed))
+		except ValueError:
+			logger.warning(
+				"RNGSEED must be an integer, not %r. Seeded RNG mode will"
+				" not be active.",
+				seed,
+			)
+		else:
+			logger.info("Seeded RNG mode enabled with master seed %s", seed)
+
+	use_brawl_api(env)
+
+	global TurnTimeout  # noqa: PLW0603
+	if (timeout := env.get("TURNTIMEOUT")) is not None:
+		if timeout.isdecimal() and int(timeout) > 0:
+			TurnTimeout = int(timeout)
+		else:
+			logger.warning(
+				"TURNTIMEOUT must be a positive whole number of seconds, not"
+				" %r. Using the default of %i seconds.",
+				timeout,
+				TurnTimeout,
+			)
+
 	try:
 		token = env["DISCORDTOKEN"]
 		assert isinstance(token, str)
@@ -26,7 +26,7 @@ import subprocess
 import sys
 import time
 from collections import deque
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterator
 from copy import copy
 from datetime import datetime
 from pathlib import Path
@@ -37,6 +37,7 @@ import aiofiles
 import dotenv
 import httpx
 import nextcord
+import numpy as np
 import pytest
 import requests
 from aiohttp import ClientWebSocketResponse
@@ -51,13 +52,17 @@ from nextcord.types import message as message_payloads
 from nextcord.types.embed import Embed as EmbedPayload
 from nextcord.types.role import Role as RolePayload
 from nextcord.types.user import User as UserPayload
+from nextcord.ui.view import ViewStore
 from pytest_httpx import HTTPXMock
 
 import Bot
 import brawl
+import brawlserver
 import bucks
+import cassette
 import logs
 import misc
+import simulator
 
 logger = logging.getLogger(__name__)
 
@@ -106,6 +111,26 @@ BrawlKey: str | None = os.environ.get("BRAWLKEY")
 MarkAsync = pytest.mark.asyncio(loop_scope="module")
 
 
+@pytest.fixture(autouse=True)
+def reset_brawl_api() -> None:
+	"""Keep Brawlhalla API cache and quota state from leaking between tests."""
+	brawl.ApiCache.clear()
+	brawl.ClanIds.clear()
+	brawl.Boards.clear()
+	brawl.ApiLimiter = misc.RateLimiter(brawl.ApiLimiter.quotas)
+	brawl.ApiFlights = misc.SingleFlight()
+
+
+@pytest.fixture(autouse=True)
+def http_disk_cache(tmp_path: Path) -> Iterator[misc.HttpCache]:
+	"""Give each test an empty on-disk HTTP cache of its own."""
+	cache = misc.HttpCache(tmp_path / "httpCache")
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("misc.HttpDiskCache", cache)
+		mp.setattr("brawl.HttpDiskCache", cache)
+		yield cache
+
+
 def response_ok(resp: httpx.Response) -> bool:
 	"""
 	Make sure a response has an ok exit code.
@@ -155,6 +180,11 @@ async def latest_message(
 	return h[-1]
 
 
+async def flush_tables() -> None:
+	"""Wait for every scheduled flush of a blackjack table to finish."""
+	await asyncio.gather(*Bot.TableFlushes.values())
+
+
 # TODO: Write generic MockState
 # https://github.com/LevBernstein/BeardlessBot/issues/48
 
@@ -200,6 +230,16 @@ class MockHTTPClient(nextcord.http.HTTPClient):
 			flags=0,
 		)
 
+	@override
+	async def send_typing(
+		self,
+		channel_id: nextcord.types.snowflake.Snowflake,
+		*,
+		auth: str | None = None,
+		retry_request: bool = True,
+	) -> None:
+		pass
+
 	@override
 	async def send_message(
 		self,
@@ -247,6 +287,23 @@ class MockHTTPClient(nextcord.http.HTTPClient):
 			components=components or [],
 		)
 
+	@override
+	async def edit_message(
+		self,
+		channel_id: nextcord.types.snowflake.Snowflake,
+		message_id: nextcord.types.snowflake.Snowflake,
+		auth: str | None = None,
+		retry_request: bool = True,
+		**fields: Any,
+	) -> message_payloads.Message:
+		payload = await self.send_message(
+			channel_id, fields.get("content"), embeds=fields.get("embeds"),
+		)
+		payload["id"] = message_id
+		payload["edited_timestamp"] = payload["timestamp"]
+		del payload["message_reference"]
+		return payload
+
 	@override
 	async def leave_guild(
 		self,
@@ -555,6 +612,7 @@ class MockChannel(nextcord.TextChannel):
 			self.user = user
 			self.last_message_id = message_number
 			self._messages: deque[nextcord.Message] = deque(messages or [])
+			self._view_store = ViewStore(self)
 
 		@override
 		def create_message(
@@ -1203,7 +1261,7 @@ class MockContext(misc.BotContext):
 		return msg
 
 
-class MockBot(commands.Bot):
+class MockBot(misc.BbBot):
 	"""Drop-in replacement for Bot to enable offline testing."""
 
 	class MockClientWebSocketResponse(ClientWebSocketResponse):
@@ -1384,7 +1442,7 @@ def test_full_type_checking_with_mypy_for_code_quality() -> None:
 		"--python-executable=" + sys.executable,
 		f"--python-version={sys.version_info.major}.{sys.version_info.minor}",
 	])
-	assert stdout == "Success: no issues found in 6 source files\n"
+	assert stdout == "Success: no issues found in 9 source files\n"
 	assert not stderr
 	assert exit_code == 0
 
@@ -3256,7 +3314,8 @@ async def test_animal_api_down_raises_animal_exception(
 		await misc.get_animal("rabbit")
 
 
-def test_get_frog_list_standard_layout(httpx_mock: HTTPXMock) -> None:
+@MarkAsync
+async def test_get_frog_list_standard_layout(httpx_mock: HTTPXMock) -> None:
 	httpx_mock.add_response(
 		url="https://github.com/a9-i/frog/tree/main/ImgSetOpt",
 		content=(
@@ -3265,12 +3324,13 @@ def test_get_frog_list_standard_layout(httpx_mock: HTTPXMock) -> None:
 		),
 	)
 
-	frogs = misc.get_frog_list()
+	frogs = await misc.get_frog_list()
 	assert len(frogs) == 1
 	assert frogs[0] == "0"
 
 
-def test_get_frog_list_alt_layout(httpx_mock: HTTPXMock) -> None:
+@MarkAsync
+async def test_get_frog_list_alt_layout(httpx_mock: HTTPXMock) -> None:
 	httpx_mock.add_response(
 		url="https://github.com/a9-i/frog/tree/main/ImgSetOpt",
 		content=(
@@ -3280,11 +3340,159 @@ def test_get_frog_list_alt_layout(httpx_mock: HTTPXMock) -> None:
 		),
 	)
 
-	frogs = misc.get_frog_list()
+	frogs = await misc.get_frog_list()
 	assert len(frogs) == 1
 	assert frogs[0] == "0\\"
 
 
+@MarkAsync
+async def test_http_cache_revalidates_with_etag(
+	httpx_mock: HTTPXMock, tmp_path: Path,
+) -> None:
+	url = "https://example.com/breeds"
+	parsed: list[int] = []
+
+	def parse(r: httpx.Response) -> list[str]:
+		parsed.append(r.status_code)
+		return list(r.json()["message"])
+
+	httpx_mock.add_response(
+		url=url,
+		json={"message": {"akita": [], "beagle": []}},
+		headers={"ETag": '"v1"'},
+	)
+	httpx_mock.add_response(
+		url=url,
+		status_code=304,
+		match_headers={"If-None-Match": '"v1"'},
+		is_reusable=True,
+	)
+	cache = misc.HttpCache(tmp_path)
+	async with httpx.AsyncClient() as client:
+		assert await cache.fetch(client, url, parse) == ["akita", "beagle"]
+		breeds = await cache.fetch(client, url, parse)
+		assert breeds == ["akita", "beagle"]
+		assert (cache.hits, cache.misses) == (1, 1)
+
+		# A new cache, as after a restart, revalidates what is on disk.
+		restarted = misc.HttpCache(tmp_path)
+		assert await restarted.fetch(client, url, parse) == breeds
+		assert restarted.hits == 1
+	validators = [
+		r.headers.get("If-None-Match") for r in httpx_mock.get_requests()
+	]
+	assert validators == [None, '"v1"', '"v1"']
+	assert parsed == [200]
+
+
+@MarkAsync
+async def test_get_dog_breeds_revalidates_cached_list(
+	httpx_mock: HTTPXMock, http_disk_cache: misc.HttpCache,
+) -> None:
+	url = "https://dog.ceo/api/breeds/list/all"
+	httpx_mock.add_response(
+		url=url,
+		json={"message": {"akita": [], "beagle": []}},
+		headers={"ETag": '"v1"'},
+	)
+	assert await misc.get_dog("breeds") == "Dog breeds: akita, beagle."
+	httpx_mock.add_response(
+		url=url, status_code=304, match_headers={"If-None-Match": '"v1"'},
+	)
+	assert await misc.get_dog("breeds") == "Dog breeds: akita, beagle."
+	assert http_disk_cache.hits == 1
+
+
+@MarkAsync
+async def test_get_frog_list_revalidates_cached_list(
+	httpx_mock: HTTPXMock, http_disk_cache: misc.HttpCache,
+) -> None:
+	url = "https://github.com/a9-i/frog/tree/main/ImgSetOpt"
+	modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+	httpx_mock.add_response(
+		url=url,
+		content=(
+			b"<!DOCTYPE html><html><script>{\"payload\":{\"codeViewTreeRoute\""
+			b":{\"tree\":{\"items\":[{\"name\":\"0\"}]}}}}</script></html>"
+		),
+		headers={"Last-Modified": modified},
+	)
+	assert await misc.get_frog_list() == ["0"]
+	httpx_mock.add_response(
+		url=url,
+		status_code=304,
+		match_headers={"If-Modified-Since": modified},
+	)
+	assert await misc.get_frog_list() == ["0"]
+	assert (http_disk_cache.hits, http_disk_cache.misses) == (1, 1)
+
+
+@MarkAsync
+async def test_get_frog_list_failure_does_not_raise(
+	httpx_mock: HTTPXMock, http_disk_cache: misc.HttpCache,
+) -> None:
+	url = "https://github.com/a9-i/frog/tree/main/ImgSetOpt"
+	httpx_mock.add_response(url=url, status_code=503)
+	assert await misc.get_frog_list() == []
+	httpx_mock.add_exception(httpx.ConnectError("offline"), url=url)
+	assert await misc.get_frog_list() == []
+
+	http_disk_cache.entries[url] = {
+		"key": url, "etag": '"v1"', "last_modified": None, "value": ["0"],
+	}
+	httpx_mock.add_response(url=url, status_code=503)
+	assert await misc.get_frog_list() == ["0"]
+	# A page whose layout has changed is no worse than a failed request.
+	httpx_mock.add_response(url=url, content=b"<html></html>")
+	assert await misc.get_frog_list() == ["0"]
+	httpx_mock.add_response(
+		url=url, content=b"<html><script>{\"payload\": {}}</script></html>",
+	)
+	assert await misc.get_frog_list() == ["0"]
+	httpx_mock.add_response(url=url, content=b"<html><script>{</script></html>")
+	assert await misc.get_frog_list() == ["0"]
+
+
+@MarkAsync
+async def test_get_animal_frog_without_frog_list(
+	httpx_mock: HTTPXMock,
+) -> None:
+	url = "https://github.com/a9-i/frog/tree/main/ImgSetOpt"
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("misc.FrogList", [])
+		httpx_mock.add_response(url=url, status_code=503)
+		with pytest.raises(misc.AnimalException):
+			await misc.get_animal("frog")
+		# The list is fetched by the first !frog that needs it, then kept.
+		httpx_mock.add_response(
+			url=url,
+			content=(
+				b"<html><script>{\"payload\":{\"codeViewTreeRoute\":"
+				b"{\"tree\":{\"items\":[{\"name\":\"0\"}]}}}}</script></html>"
+			),
+		)
+		assert await misc.get_animal("frog") == misc.FrogRootUrl + "0"
+		assert await misc.get_animal("frog") == misc.FrogRootUrl + "0"
+		assert misc.FrogList == ["0"]
+	assert len(httpx_mock.get_requests(url=url)) == 2
+
+
+@MarkAsync
+async def test_http_cache_skips_responses_without_validators(
+	httpx_mock: HTTPXMock, tmp_path: Path,
+) -> None:
+	httpx_mock.add_response(url="https://example.com/", json=[1])
+	cache = misc.HttpCache(tmp_path / "cache")
+	assert await cache.fetch(
+		misc.http_client("https://example.com/"),
+		"https://example.com/",
+		httpx.Response.json,
+	) == [1]
+	assert not cache.entries
+	assert not cache.root.exists()
+	assert cache.headers("https://example.com/") == {}
+
+
 @MarkAsync
 async def test_handle_messages() -> None:
 	u = MockMember()
@@ -3571,6 +3779,83 @@ def test_launch_no_dotenv(caplog: pytest.LogCaptureFixture) -> None:
 	)
 
 
+def test_launch_invalid_rng_seed_starts_unseeded(
+	caplog: pytest.LogCaptureFixture,
+) -> None:
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr(
+			"dotenv.dotenv_values",
+			lambda _: {"BRAWLKEY": "foo", "RNGSEED": "bar"},
+		)
+		Bot.launch()
+	assert misc.SeedSource is None
+	assert caplog.records[0].msg == (
+		"RNGSEED must be an integer, not %r. Seeded RNG mode will"
+		" not be active."
+	)
+	assert caplog.records[0].args == ("bar",)
+
+
+def test_launch_reads_turn_timeout(caplog: pytest.LogCaptureFixture) -> None:
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("Bot.TurnTimeout", 60)
+		mp.setattr(
+			"dotenv.dotenv_values",
+			lambda _: {"BRAWLKEY": "foo", "TURNTIMEOUT": "90"},
+		)
+		Bot.launch()
+		assert Bot.TurnTimeout == 90
+		mp.setattr(
+			"dotenv.dotenv_values",
+			lambda _: {"BRAWLKEY": "foo", "TURNTIMEOUT": "-5"},
+		)
+		Bot.launch()
+		assert Bot.TurnTimeout == 90
+	assert caplog.records[1].msg.startswith("TURNTIMEOUT must be a positive")
+	assert caplog.records[1].args == ("-5", 90)
+
+
+def test_launch_reads_brawl_api_root_and_quotas(
+	caplog: pytest.LogCaptureFixture,
+) -> None:
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.BrawlApiRoot", brawl.BrawlApiRoot)
+		mp.setattr("brawl.ApiLimiter", brawl.ApiLimiter)
+		mp.setattr(
+			"dotenv.dotenv_values",
+			lambda _: {
+				"BRAWLKEY": "foo",
+				"BRAWLAPIROOT": "http://127.0.0.1:8080",
+				"BRAWLQUOTAS": "30/60, 5/1",
+			},
+		)
+		Bot.launch()
+		assert brawl.BrawlApiRoot == "http://127.0.0.1:8080/"
+		assert brawl.ApiLimiter.quotas == ((30, 60.0), (5, 1.0))
+
+		limiter = brawl.ApiLimiter
+		mp.setattr(
+			"dotenv.dotenv_values",
+			lambda _: {"BRAWLKEY": "foo", "BRAWLQUOTAS": "lots"},
+		)
+		Bot.launch()
+		assert brawl.ApiLimiter is limiter
+	warnings = [
+		record for record in caplog.records
+		if record.msg.startswith("BRAWLQUOTAS must look like")
+	]
+	assert len(warnings) == 1
+	assert warnings[0].args == ("lots",)
+
+
+def test_parse_quotas() -> None:
+	assert brawl.parse_quotas("180/900,10/1") == ((180, 900.0), (10, 1.0))
+	assert brawl.parse_quotas("") == ()
+	for spec in ("10", "10/0", "-1/5", "a/b"):
+		with pytest.raises(ValueError, match="positive limit/period"):
+			brawl.parse_quotas(spec)
+
+
 def test_launch_invalid_discord_token_raises_discord_exception(
 	caplog: pytest.LogCaptureFixture,
 ) -> None:
@@ -3626,7 +3911,7 @@ async def test_cmd_brawl() -> None:
 	m = await latest_message(ctx)
 	assert m is not None
 	assert m.embeds[0].title == "Beardless Bot Brawlhalla Commands"
-	assert len(m.embeds[0].fields) == 6
+	assert len(m.embeds[0].fields) == 9
 
 	Bot.BrawlKey = None
 	assert (await Bot.cmd_brawl(ctx)) == 0
@@ -3637,38 +3922,121 @@ def test_fetch_brawl_id() -> None:
 	assert brawl.fetch_brawl_id(misc.BbId) is None
 
 
-def test_get_top_dps() -> None:
+def test_claim_store_reads_file_once(tmp_path: Path) -> None:
+	path = tmp_path / "claimedProfs.json"
+	path.write_text(json.dumps({"1": 10, "2": 20}), encoding="UTF-8")
+	claims = brawl.ClaimStore(path)
+	assert claims.get(1) == 10
+	path.unlink()
+	assert claims.get(2) == 20
+	assert claims.get(3) is None
+
+	claims.claim(3, 30)
+	claims.claim(1, 11)
+	assert not tmp_path.joinpath("claimedProfs.tmp").exists()
+	assert json.loads(path.read_text(encoding="UTF-8")) == {
+		"1": 11, "2": 20, "3": 30,
+	}
+	claims.reload()
+	assert claims.claims is None
+	assert claims.get(1) == 11
+
+
+@MarkAsync
+async def test_claim_store_writes_claims_in_background(tmp_path: Path) -> None:
+	path = tmp_path / "claimedProfs.json"
+	path.write_text(json.dumps({"1": 10}), encoding="UTF-8")
+	claims = brawl.ClaimStore(path)
+	writes: list[int] = []
+	save = claims.save
+
+	async def counted_save() -> None:
+		writes.append(claims.changes)
+		await save()
+
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr(claims, "save", counted_save)
+		mp.setattr(claims, "SaveDelay", 0.01)
+		claims.claim(2, 20)
+		claims.claim(3, 30)
+		# Claiming returns without touching the file.
+		assert json.loads(path.read_text(encoding="UTF-8")) == {"1": 10}
+		assert claims.saving is not None
+		await claims.saving
+		assert writes == [2]
+		assert json.loads(path.read_text(encoding="UTF-8")) == {
+			"1": 10, "2": 20, "3": 30,
+		}
+
+		claims.claim(1, 11)
+		await claims.flush()
+		assert writes == [2, 3]
+		assert claims.saving is None
+		await claims.flush()
+		assert writes == [2, 3]
+	assert json.loads(path.read_text(encoding="UTF-8"))["1"] == 11
+	assert not tmp_path.joinpath("claimedProfs.tmp").exists()
+
+
+@MarkAsync
+async def test_bb_bot_close_flushes_claims() -> None:
+	flushed: list[bool] = []
+
+	async def close(_: commands.Bot) -> None:
+		pass
+
+	async def flush() -> None:
+		flushed.append(True)
+
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("nextcord.ext.commands.Bot.close", close)
+		mp.setattr("misc.ShutdownHooks", [flush])
+		await MockBot(Bot.BeardlessBot).close()
+	assert flushed == [True]
+	assert brawl.flush_claims in misc.ShutdownHooks
+
+
+def test_claim_store_indexes_owners_by_brawl_id(tmp_path: Path) -> None:
+	path = tmp_path / "claimedProfs.json"
+	path.write_text(json.dumps({"1": 10, "2": 10, "3": 30}), encoding="UTF-8")
+	claims = brawl.ClaimStore(path)
+	assert claims.owners_of(10) == {1, 2}
+	assert claims.owners_of(20) == frozenset()
+
+	claims.claim(2, 30)
+	claims.claim(1, 20)
+	assert claims.owners_of(10) == frozenset()
+	assert 10 not in claims.owners
+	assert claims.owners_of(20) == {1}
+	assert claims.owners_of(30) == {2, 3}
+
+
+def test_legend_stats_view_top_dps() -> None:
 	payload: dict[str, str | int] = {
 		"matchtime": 3,
 		"legend_name_key": "sidra",
 		"damagedealt": "10",
 		"kos": 6,
 	}
-	top_dps = brawl.get_top_dps(payload)
-	assert len(top_dps) == 2
-	assert top_dps[0] == "Sidra"
-	assert top_dps[1] == 3.3
+	view = brawl.LegendStatsView([payload])
+	assert view.names == ("Sidra",)
+	assert view.dps == (3.3,)
 
 
-def test_get_top_ttk() -> None:
+def test_legend_stats_view_top_ttk() -> None:
 	payload: dict[str, str | int] = {
 		"matchtime": 3,
 		"legend_name_key": "sidra",
 		"damagedealt": "10",
 		"kos": 6,
 	}
-	top_ttk = brawl.get_top_ttk(payload)
-	assert len(top_ttk) == 2
-	assert top_ttk[0] == "Sidra"
-	assert top_ttk[1] == 0.5
+	view = brawl.LegendStatsView([payload])
+	assert view.names == ("Sidra",)
+	assert view.ttk == (0.5,)
 
 
 def test_get_top_legend() -> None:
-	legends: list[dict[str, str | int]] = [
-		{"legend_name_key": "sidra", "rating": 1397},
-		{"legend_name_key": "jhala", "rating": 1399},
-		{"legend_name_key": "xull", "rating": 1398},
-	]
+	legends = [("sidra", 1397), ("jhala", 1399), ("xull", 1398)]
 	top_legend = brawl.get_top_legend(legends)
 	assert top_legend is not None
 	assert len(top_legend) == 2
@@ -3676,10 +4044,37 @@ def test_get_top_legend() -> None:
 	assert top_legend[1] == 1399
 
 
+def test_ranked_parse_keeps_only_shown_fields() -> None:
+	r = brawl.Ranked.parse({
+		"name": "Foo",
+		"brawlhalla_id": 1,
+		"games": 3,
+		"wins": 2,
+		"legends": [
+			{"legend_name_key": "bodvar", "rating": 1400, "tier": "Gold 3"},
+			{"legend_name_key": "sidra", "rating": 1500, "tier": "Gold 5"},
+		],
+		"2v2": [
+			{"teamname": "Foo+Bar", "rating": 1700, "wins": 1, "games": 4},
+			{"teamname": "Foo+Baz", "rating": 1800},
+		],
+	})
+	assert r.win_rate == 66.7
+	assert r.legends == (("bodvar", 1400), ("sidra", 1500))
+	assert r.top_legend == ("sidra", 1500)
+	assert r.peak_team is not None
+	assert r.peak_team.teamname == "Foo+Baz"
+	assert r.teams[0].win_rate == 25.0
+	assert not hasattr(r, "__dict__")
+	assert not hasattr(r, "brawlhalla_id")
+
+	assert brawl.Ranked.parse({}) == brawl.Ranked()
+
+
 def test_get_twos_rank_no_teams_returns_unmodified_embed() -> None:
 	emb = misc.bb_embed("test embed", "test description")
 	assert len(emb.fields) == 0
-	new_emb = brawl.get_twos_rank(emb, {"2v2": []})
+	new_emb = brawl.get_twos_rank(emb, brawl.Ranked())
 	assert len(emb.fields) == 0
 	assert emb.title == new_emb.title
 	assert emb.description == new_emb.description
@@ -3708,6 +4103,60 @@ async def test_claim_profile() -> None:
 		Bot.BrawlKey = None
 
 
+@MarkAsync
+async def test_claim_profile_warns_about_other_claimants() -> None:
+	other_id = 46146200
+	others = brawl.Claims.owners_of(other_id)
+	assert others
+	ctx = MockContext(
+		Bot.BeardlessBot, author=MockMember(MockUser(user_id=Bot.OwnerId)),
+	)
+	Bot.BrawlKey = "Foo"
+	try:
+		assert (await Bot.cmd_brawlclaim(ctx, str(other_id))) == 1
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description == (
+			"Profile claimed. Note that this profile is also claimed by "
+			+ ", ".join(f"<@{user_id}>" for user_id in sorted(others))
+			+ "."
+		)
+		assert brawl.Claims.owners_of(other_id) == others | {Bot.OwnerId}
+		assert Bot.OwnerId not in brawl.Claims.owners_of(OwnerBrawlId)
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+		assert brawl.Claims.owners_of(other_id) == others
+		Bot.BrawlKey = None
+
+
+@MarkAsync
+async def test_cmd_whois() -> None:
+	ctx = MockContext(Bot.BeardlessBot)
+	assert (await Bot.cmd_whois(ctx, str(OwnerBrawlId))) == -1
+
+	Bot.BrawlKey = "Foo"
+	try:
+		assert (await Bot.cmd_whois(ctx, str(OwnerBrawlId))) == 1
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description is not None
+		assert f"<@{Bot.OwnerId}>" in m.embeds[0].description
+
+		assert (await Bot.cmd_whois(ctx, "1")) == 1
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description == "Nobody has claimed Brawl ID 1."
+
+		assert (await Bot.cmd_whois(ctx, "foo")) == 0
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description == (
+			"Please do !whois followed by a Brawlhalla ID."
+		)
+	finally:
+		Bot.BrawlKey = None
+
+
 @MarkAsync
 async def test_brawl_api_call_raises_httpx_exception_with_bad_status_code(
 	httpx_mock: HTTPXMock,
@@ -3723,92 +4172,692 @@ async def test_brawl_api_call_raises_httpx_exception_with_bad_status_code(
 
 
 @MarkAsync
-async def test_get_rank_1s_top_rating(
-	httpx_mock: HTTPXMock,
+async def test_pull_legends_skips_unchanged_list(
+	httpx_mock: HTTPXMock, tmp_path: Path,
 ) -> None:
+	url = "https://api.brawlhalla.com/legend/all/?api_key=foo"
+	legends = brawl.fetch_legends()[:1]
+	httpx_mock.add_response(url=url, json=legends, headers={"ETag": '"v1"'})
 	httpx_mock.add_response(
-		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
-		json={
-			"name": "Foo",
-			"region": "us-east-1",
-			"tier": "Gold 2",
-			"rating": 1540,
-			"peak_rating": 1577,
-			"wins": 2,
-			"games": 3,
-			"legends": [
-				{
-					"legend_id": 0,
-					"legend_name_key": "bodvar",
-					"rating": 1400,
-					"tier": "Gold 3",
-				},
-			],
-			"2v2": [],
-		},
+		url=url, status_code=304, match_headers={"If-None-Match": '"v1"'},
 	)
+	httpx_mock.add_response(url=url, status_code=500)
+	catalog = brawl.LegendCatalog(tmp_path / "legends.json")
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.Legends", catalog)
+		assert await brawl.pull_legends("foo")
+		assert catalog.legends == legends
+		catalog.path.unlink()
+		assert not await brawl.pull_legends("foo")
+		assert not catalog.path.exists()
+		with pytest.raises(httpx.RequestError, match="failed with 500"):
+			await brawl.pull_legends("foo")
+
+
+def test_ttl_cache_expires_and_evicts() -> None:
+	cache: misc.TtlCache[str, int] = misc.TtlCache(2)
+	cache.put("foo", 1, 10, 0)
+	cache.put("bar", 2, 1, 0)
+	assert cache.get("foo", 5) == 1
+	assert cache.get("bar", 5) is None
+	assert len(cache) == 1
+	assert (cache.hits, cache.misses) == (1, 1)
+
+	# foo was used more recently than bar, so bar is evicted first
+	cache.put("bar", 2, 10, 5)
+	assert cache.get("foo", 6) == 1
+	cache.put("baz", 3, 10, 6)
+	assert len(cache) == 2
+	assert cache.get("bar", 7) is None
+	assert cache.get("baz", 7) == 3
+
+	cache.put("foo", 4, 10, 7)
+	assert cache.lookup("foo", 8) == (4, 7)
+
+	cache.clear()
+	assert len(cache) == 0
+	assert (cache.hits, cache.misses) == (0, 0)
 
-	try:
-		brawl.claim_profile(Bot.OwnerId, 1)
-		emb = await brawl.get_rank(
-			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
-		)
-		assert emb.fields[0].name == "Ranked 1s"
-		assert emb.fields[0].value == (
-			"**Gold 2** (1540/1577 Peak)\n2 W / 1 L / 66.7% winrate"
-			"\nTop Legend: Bodvar, 1400 Elo"
-		)
-		assert hasattr(emb.color, "value")
-		assert emb.color is not None
-		assert emb.color.value == brawl.RankColors["Gold"]
-	finally:
-		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+@MarkAsync
+async def test_brawl_api_call_caches_by_route_and_id(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		json={"name": "Foo"},
+	)
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/2/stats?api_key=foo",
+		json={"name": "Bar"},
+	)
+	for _ in range(3):
+		assert await brawl.brawl_api_call(
+			"player/", "1/stats", "foo", ttl=brawl.StatsTTL,
+		) == {"name": "Foo"}
+	assert await brawl.brawl_api_call(
+		"player/", "2/stats", "foo", ttl=brawl.StatsTTL,
+	) == {"name": "Bar"}
+	assert len(httpx_mock.get_requests()) == 2
+	assert (brawl.ApiCache.hits, brawl.ApiCache.misses) == (2, 2)
 
 
 @MarkAsync
-async def test_get_rank_1s_top_rating_no_top_legend(
+async def test_brawl_api_call_swr_serves_stale_and_revalidates(
 	httpx_mock: HTTPXMock,
 ) -> None:
 	httpx_mock.add_response(
 		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
-		json={
-			"name": "Foo",
-			"region": "us-east-1",
-			"tier": "Gold 2",
-			"rating": 1540,
-			"peak_rating": 1577,
-			"wins": 2,
-			"games": 3,
-			"legends": [],
-			"2v2": [],
-		},
+		json={"rating": 1600},
 	)
-
-	try:
-		brawl.claim_profile(Bot.OwnerId, 1)
-		emb = await brawl.get_rank(
-			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
-		)
-		assert emb.fields[0].name == "Ranked 1s"
-		assert emb.fields[0].value == (
-			"**Gold 2** (1540/1577 Peak)\n2 W / 1 L / 66.7% winrate"
-		)
-		assert hasattr(emb.color, "value")
-		assert emb.color is not None
-		assert emb.color.value == brawl.RankColors["Gold"]
-	finally:
-		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+	key = "player/", "1/ranked"
+	ttl = brawl.RankedTTL + brawl.RankedStale
+	brawl.ApiCache.put(key, {"rating": 1500}, ttl, time.monotonic() - 120)
+	start = time.time()
+	r, fetched = await brawl.brawl_api_call_swr(
+		*key, "foo", brawl.RankedTTL, brawl.RankedStale,
+	)
+	assert r == {"rating": 1500}
+	assert fetched is not None
+	assert start - 121 < fetched < start - 119
+	assert len(brawl.Refreshes) == 1
+
+	await asyncio.gather(*brawl.Refreshes)
+	assert not brawl.Refreshes
+	r, fetched = await brawl.brawl_api_call_swr(
+		*key, "foo", brawl.RankedTTL, brawl.RankedStale,
+	)
+	assert r == {"rating": 1600}
+	assert fetched is None
+	assert len(httpx_mock.get_requests()) == 1
 
 
 @MarkAsync
-async def test_get_rank_2s_top_rating(httpx_mock: HTTPXMock) -> None:
+async def test_get_rank_marks_stale_data_with_as_of_footer(
+	httpx_mock: HTTPXMock,
+) -> None:
 	httpx_mock.add_response(
-		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
-		json={
-			"name": "Foo",
-			"region": "us-east-1",
-			"rating": 0,
-			"2v2": [
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo", json={},
+	)
+	brawl.ApiCache.put(
+		("player/", "1/ranked"),
+		brawl.Ranked(),
+		brawl.RankedTTL + brawl.RankedStale,
+		time.monotonic() - brawl.RankedTTL,
+	)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", lambda _: 1)
+		emb = await brawl.get_rank(MockMember(), "foo")
+	assert emb.footer.text is not None
+	assert emb.footer.text.startswith("Brawl ID 1, as of ")
+	await asyncio.gather(*brawl.Refreshes)
+
+
+@MarkAsync
+async def test_brawl_api_call_without_ttl_bypasses_cache(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/search?steamid=1&api_key=foo",
+		json={"brawlhalla_id": 1},
+		is_reusable=True,
+	)
+	for _ in range(2):
+		await brawl.brawl_api_call("search?steamid=", "1", "foo", "&")
+	assert len(httpx_mock.get_requests()) == 2
+	assert len(brawl.ApiCache) == 0
+
+
+async def acquire_in_order(
+	limiter: misc.RateLimiter, requests: list[tuple[int, int]],
+) -> list[int]:
+	"""
+	Queue requests on a drained limiter, and record the order they go in.
+
+	Args:
+		limiter (misc.RateLimiter): The limiter to queue on
+		requests (list[tuple[int, int]]): Each request's priority and key
+
+	Returns:
+		list[int]: The requests' indices, in the order they were released.
+
+	"""
+	released: list[int] = []
+
+	async def request(i: int, priority: int, key: int) -> None:
+		await limiter.acquire(priority, key)
+		released.append(i)
+
+	limiter.drain()
+	await asyncio.gather(*(
+		request(i, priority, key)
+		for i, (priority, key) in enumerate(requests)
+	))
+	return released
+
+
+@MarkAsync
+async def test_rate_limiter_serves_interactive_before_background() -> None:
+	limiter = misc.RateLimiter(((1, 0.01),))
+	assert await acquire_in_order(limiter, [
+		(misc.RateLimiter.Background, 0),
+		(misc.RateLimiter.Interactive, 0),
+		(misc.RateLimiter.Background, 0),
+		(misc.RateLimiter.Interactive, 0),
+	]) == [1, 3, 0, 2]
+
+
+@MarkAsync
+async def test_rate_limiter_queues_fairly_by_key() -> None:
+	limiter = misc.RateLimiter(((1, 0.01),))
+	assert await acquire_in_order(
+		limiter, [(0, 1), (0, 1), (0, 1), (0, 2), (0, 3), (0, 2)],
+	) == [0, 3, 4, 1, 5, 2]
+
+
+@MarkAsync
+async def test_rate_limiter_promotes_waiting_flight() -> None:
+	limiter = misc.RateLimiter(((1, 0.01),))
+	released: list[str] = []
+
+	async def request(name: str, flight: str | None = None) -> None:
+		await limiter.acquire(misc.RateLimiter.Background, flight=flight)
+		released.append(name)
+
+	limiter.drain()
+	first = asyncio.create_task(request("first"))
+	second = asyncio.create_task(request("second", "flight"))
+	await asyncio.sleep(0)
+	limiter.promote("elsewhere", misc.RateLimiter.Interactive)
+	limiter.promote("flight", misc.RateLimiter.Interactive)
+	await asyncio.gather(first, second)
+	assert released == ["second", "first"]
+	assert not limiter.flights
+
+
+@MarkAsync
+async def test_brawl_api_call_promotes_background_flight(
+	httpx_mock: HTTPXMock,
+) -> None:
+	for i in (1, 2):
+		httpx_mock.add_response(
+			url=f"https://api.brawlhalla.com/player/{i}/ranked?api_key=foo",
+			json={"name": f"Player {i}"},
+		)
+	brawl.ApiLimiter = misc.RateLimiter(((1, 0.01),))
+	brawl.ApiLimiter.drain()
+	background = [
+		asyncio.create_task(brawl.brawl_api_call(
+			"player/",
+			f"{i}/ranked",
+			"foo",
+			priority=misc.RateLimiter.Background,
+		))
+		for i in (2, 1)
+	]
+	for _ in range(2):
+		await asyncio.sleep(0)
+	assert len(brawl.ApiLimiter.waiters) == len(background)
+	# A user now asks for player 1, whose background refresh is queued
+	# behind player 2's; joining it moves it to the front of the queue.
+	assert await brawl.brawl_api_call(
+		"player/", "1/ranked", "foo",
+	) == {"name": "Player 1"}
+	await asyncio.gather(*background)
+	assert [str(r.url).split("/")[4] for r in httpx_mock.get_requests()] == [
+		"1", "2",
+	]
+	assert brawl.ApiFlights.coalesced == 1
+
+
+@MarkAsync
+async def test_rate_limiter_enforces_every_quota() -> None:
+	limiter = misc.RateLimiter(((3, 60), (2, 0.05)))
+	start = time.perf_counter()
+	for _ in range(3):
+		await limiter.acquire()
+	assert time.perf_counter() - start >= 0.02
+	assert limiter.tokens[0] < 1
+
+
+@MarkAsync
+async def test_rate_limiter_rejects_requests_once_queue_is_full() -> None:
+	limiter = misc.RateLimiter(((1, 60),), maxqueue=1)
+	limiter.drain()
+	waiter = asyncio.create_task(limiter.acquire())
+	await asyncio.sleep(0)
+	with pytest.raises(misc.RateLimitError):
+		await limiter.acquire()
+	waiter.cancel()
+	assert limiter.dispatcher is not None
+	limiter.dispatcher.cancel()
+
+
+@MarkAsync
+async def test_brawl_api_call_drains_limiter_when_rate_limited(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		status_code=429,
+	)
+	with pytest.raises(httpx.RequestError, match="Request failed with 429"):
+		await brawl.brawl_api_call("player/", "1/ranked", "foo")
+	assert brawl.ApiLimiter.tokens[-1] < 1
+
+
+@MarkAsync
+async def test_single_flight_shares_one_call_per_key() -> None:
+	flights: misc.SingleFlight[str, int] = misc.SingleFlight()
+	calls: list[str] = []
+
+	async def fetch(key: str) -> int:
+		calls.append(key)
+		n = len(calls)
+		await asyncio.sleep(0.01)
+		return n
+
+	results = await asyncio.gather(
+		*(flights.run("foo", lambda: fetch("foo")) for _ in range(3)),
+		flights.run("bar", lambda: fetch("bar")),
+	)
+	assert results == [1, 1, 1, 2]
+	assert calls == ["foo", "bar"]
+	assert flights.coalesced == 2
+	assert not flights.calls
+
+	# Once the first call is done, the next one is made afresh
+	assert await flights.run("foo", lambda: fetch("foo")) == 3
+
+
+@MarkAsync
+async def test_single_flight_survives_cancelled_caller() -> None:
+	flights: misc.SingleFlight[str, int] = misc.SingleFlight()
+
+	async def fetch() -> int:
+		await asyncio.sleep(0.01)
+		return 1
+
+	first = asyncio.create_task(flights.run("foo", fetch))
+	second = asyncio.create_task(flights.run("foo", fetch))
+	await asyncio.sleep(0)
+	first.cancel()
+	assert await second == 1
+	assert first.cancelled()
+
+
+@MarkAsync
+async def test_brawl_api_call_coalesces_concurrent_requests(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json={"name": "Foo"},
+	)
+	results = await asyncio.gather(*(
+		brawl.brawl_api_call(
+			"player/", "1/ranked", "foo", ttl=brawl.RankedTTL,
+		)
+		for _ in range(5)
+	))
+	assert results == [{"name": "Foo"}] * 5
+	assert len(httpx_mock.get_requests()) == 1
+	assert brawl.ApiFlights.coalesced == 4
+
+	# Later requests are answered by the cache, not another flight
+	assert await brawl.brawl_api_call(
+		"player/", "1/ranked", "foo", ttl=brawl.RankedTTL,
+	) == {"name": "Foo"}
+	assert brawl.ApiCache.hits == 1
+	assert brawl.ApiFlights.coalesced == 4
+
+
+@MarkAsync
+async def test_brawl_api_call_shares_failures_with_coalesced_requests(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		status_code=500,
+	)
+	results = await asyncio.gather(
+		*(brawl.brawl_api_call("player/", "1/stats", "foo") for _ in range(2)),
+		return_exceptions=True,
+	)
+	assert all(isinstance(r, httpx.RequestError) for r in results)
+	assert len(httpx_mock.get_requests()) == 1
+	assert not brawl.ApiFlights.calls
+
+
+@MarkAsync
+async def test_brawl_api_call_reuses_pooled_connection() -> None:
+	calls = 20
+	stub = brawlserver.BrawlStubServer(10, quotas=())
+	stats = stub.stats("1")
+	async with stub as root:
+		for _ in range(calls):
+			async with httpx.AsyncClient(timeout=10) as client:
+				r = await client.get(f"{root}player/1/stats?api_key=foo")
+				assert r.json() == stats
+		assert stub.connections == calls
+
+		stub.connections = 0
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.BrawlApiRoot", root)
+			mp.setattr("brawl.ApiLimiter", misc.RateLimiter(((calls, 1),)))
+			for _ in range(calls):
+				assert await brawl.brawl_api_call(
+					"player/", "1/stats", "foo",
+				) == stats
+			assert misc.HttpClients[root][1] is misc.http_client(root)
+			await misc.close_http_clients()
+		assert stub.connections == 1
+	assert root not in misc.HttpClients
+
+
+@MarkAsync
+async def test_brawl_stub_server_serves_bot_routes() -> None:
+	stub = brawlserver.BrawlStubServer(200, seed=1, quotas=())
+	async with stub as root:
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.BrawlApiRoot", root)
+			mp.setattr("brawl.ApiLimiter", misc.RateLimiter(((100, 1),)))
+			mp.setattr(
+				"steam.steamid.from_url",
+				lambda _: str(brawlserver.SteamIdBase + 7),
+			)
+			ranked = await brawl.brawl_api_call(
+				"player/", "7/ranked", "foo", parse=brawl.Ranked.parse,
+			)
+			stats = await brawl.brawl_api_call(
+				"player/", "7/stats", "foo", parse=brawl.PlayerStats.parse,
+			)
+			clan = await brawl.brawl_api_call(
+				"clan/", "1/", "foo", parse=brawl.Clan.parse,
+			)
+			legend = await brawl.brawl_api_call(
+				"legend/", "3/", "foo", parse=brawl.Legend.parse,
+			)
+			legends = await brawl.brawl_api_call("legend/", "all/", "foo")
+			unknown = await brawl.brawl_api_call(
+				"player/", "201/ranked", "foo", parse=brawl.Ranked.parse,
+			)
+			brawl_id = await brawl.get_brawl_id("foo", "steam url")
+			await misc.close_http_clients()
+	assert isinstance(ranked, brawl.Ranked)
+	assert ranked.name == "Player 7"
+	assert ranked.tier in brawl.RankColors
+	assert ranked.region.lower() in brawl.Regions
+	assert isinstance(stats, brawl.PlayerStats)
+	assert stats.clan_id == 1
+	assert stats.games == sum(stats.legends.games)
+	assert isinstance(clan, brawl.Clan)
+	roster = [member.brawl_id for member in clan.members]
+	assert 7 in roster
+	assert 3 not in roster
+	assert clan.members[0].rank == "Leader"
+	assert isinstance(legend, brawl.Legend)
+	assert legend.name_key == "bodvar"
+	assert legends == stub.legends
+	assert isinstance(unknown, brawl.Ranked)
+	assert not unknown.name
+	assert brawl_id == 7
+	assert stub.requests == 7
+
+	again = brawlserver.BrawlStubServer(200, seed=1)
+	assert again.ranked("7") == stub.ranked("7")
+	assert brawlserver.BrawlStubServer(200, seed=2).ranked("7") != (
+		stub.ranked("7")
+	)
+
+
+@MarkAsync
+async def test_brawl_stub_server_throttles_and_delays() -> None:
+	stub = brawlserver.BrawlStubServer(10, latency=0.02, quotas=((3, 60),))
+	assert stub.respond("/legend/all")[0] == 403
+	assert stub.respond("/player/1/rank?api_key=foo")[0] == 404
+	assert stub.respond("/search?steamid=bar&api_key=foo") == (200, [])
+	stub.calls.clear()
+	async with stub as root:
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.BrawlApiRoot", root)
+			limiter = misc.RateLimiter(((100, 1),))
+			mp.setattr("brawl.ApiLimiter", limiter)
+			start = time.perf_counter()
+			for brawl_id in range(1, 4):
+				await brawl.brawl_api_call(
+					"player/", f"{brawl_id}/stats", "foo",
+				)
+			assert time.perf_counter() - start >= 0.06
+			with pytest.raises(httpx.RequestError, match="429"):
+				await brawl.brawl_api_call("player/", "4/stats", "foo")
+			assert limiter.tokens == [0]
+			assert await brawl.brawl_api_call(
+				"player/", "4/stats", "bar",
+			) != {}
+			await misc.close_http_clients()
+	assert stub.throttled == 1
+	assert stub.requests == 5
+
+
+@MarkAsync
+async def test_brawl_stub_server_bench() -> None:
+	stub = brawlserver.BrawlStubServer(50, quotas=((5, 60),))
+	root, limiter = brawl.BrawlApiRoot, brawl.ApiLimiter
+	elapsed, latencies, failures = await brawlserver.bench(
+		stub, 20, concurrency=4, quotas=(),
+	)
+	assert elapsed > 0
+	assert len(latencies) == 20
+	# The bench's own limiter has no quotas, so the stand-in throttles.
+	assert failures == stub.throttled > 0
+	assert (brawl.BrawlApiRoot, brawl.ApiLimiter) == (root, limiter)
+	assert brawlserver.percentile([3, 1, 2], 0.5) == 2
+	assert brawlserver.percentile([3, 1, 2], 1) == 3
+
+
+@MarkAsync
+async def test_brawl_stub_server_rejects_malformed_requests() -> None:
+	stub = brawlserver.BrawlStubServer(10, quotas=())
+	async with stub as root:
+		port = int(root.rsplit(":", 1)[1].rstrip("/"))
+		for request in (b"garbage\r\n\r\n", b"GET /" + b"a" * 70000):
+			reader, writer = await asyncio.open_connection("127.0.0.1", port)
+			writer.write(request)
+			await writer.drain()
+			assert (await reader.readline()).startswith(b"HTTP/1.1 400 ")
+			writer.close()
+		async with httpx.AsyncClient() as client:
+			r = await client.get(f"{root}legend/all?api_key=foo")
+		assert r.json() == stub.legends
+	assert stub.requests == 3
+
+
+@MarkAsync
+async def test_cassette_records_then_replays_offline(tmp_path: Path) -> None:
+	path = tmp_path / "brawl.json"
+	stub = brawlserver.BrawlStubServer(10, quotas=())
+	stats = stub.stats("1")
+	async with stub as root:
+		legends = f"{root}legend/all?api_key=foo"
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.BrawlApiRoot", root)
+			with cassette.Cassette(path, "record") as tape:
+				assert await brawl.brawl_api_call(
+					"player/", "1/stats", "foo",
+				) == stats
+				r = await asyncio.to_thread(httpx.get, legends)
+				assert r.json() == stub.legends
+			await misc.close_http_clients()
+	assert len(tape.interactions) == 2
+	assert "api_key" not in path.read_text()
+	assert stub.connections == 2
+
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.BrawlApiRoot", root)
+		with cassette.Cassette(path) as tape:
+			for _ in range(3):
+				assert await brawl.brawl_api_call(
+					"player/", "1/stats", "bar",
+				) == stats
+			r = await asyncio.to_thread(httpx.get, legends)
+			assert r.json() == stub.legends
+			with pytest.raises(httpx.ConnectError):
+				await asyncio.to_thread(httpx.get, f"{root}legend/3")
+		await misc.close_http_clients()
+	assert tape.positions == {
+		f"GET {root}player/1/stats": 3, f"GET {root}legend/all": 1,
+	}
+	assert stub.connections == 2
+
+
+def test_cassette_injects_latency_and_errors(tmp_path: Path) -> None:
+	path = tmp_path / "cassette.json"
+	request = httpx.Request("GET", "https://example.com/?api_key=foo")
+	tape = cassette.Cassette(path, "record")
+	tape.record(request, httpx.Response(200), b'{"ok": true}')
+	tape.save()
+
+	with cassette.Cassette(path, latency=0.02, jitter=0.01, seed=1):
+		start = time.perf_counter()
+		assert httpx.get("https://example.com/").json() == {"ok": True}
+		assert time.perf_counter() - start >= 0.02
+
+	statuses: list[list[int]] = []
+	for _ in range(2):
+		with cassette.Cassette(path, error_rate=0.5, seed=3) as tape:
+			statuses.append([
+				httpx.get("https://example.com/").status_code
+				for _ in range(20)
+			])
+		assert statuses[-1].count(503) == tape.injected
+		assert 0 < tape.injected < 20
+	assert statuses[0] == statuses[1]
+
+	with (
+		cassette.Cassette(path, error_rate=1, error_status=None),
+		pytest.raises(httpx.ConnectError, match="Injected failure"),
+	):
+		httpx.get("https://example.com/")
+	with pytest.raises(FileNotFoundError):
+		cassette.Cassette(tmp_path / "missing.json").__enter__()
+
+
+@MarkAsync
+async def test_bb_bot_close_closes_http_clients() -> None:
+	closed: list[commands.Bot] = []
+
+	async def close(self: commands.Bot) -> None:
+		closed.append(self)
+
+	bot = MockBot(Bot.BeardlessBot)
+	client = misc.http_client("http://127.0.0.1/")
+	assert misc.http_client("http://127.0.0.1/") is client
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("nextcord.ext.commands.Bot.close", close)
+		await bot.close()
+	assert closed == [bot]
+	assert client.is_closed
+	assert not misc.HttpClients
+
+
+@MarkAsync
+async def test_http_client_http2(httpx_mock: HTTPXMock) -> None:
+	# http2=True needs the h2 package, which httpx[http2] in requirements.txt
+	# installs; without it, httpx raises ImportError here.
+	client = misc.http_client("https://example.org/", http2=True)
+	httpx_mock.add_response(url="https://example.org/", json=[1])
+	assert (await client.get("")).json() == [1]
+	await misc.close_http_clients()
+
+
+@MarkAsync
+async def test_get_rank_1s_top_rating(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json={
+			"name": "Foo",
+			"region": "us-east-1",
+			"tier": "Gold 2",
+			"rating": 1540,
+			"peak_rating": 1577,
+			"wins": 2,
+			"games": 3,
+			"legends": [
+				{
+					"legend_id": 0,
+					"legend_name_key": "bodvar",
+					"rating": 1400,
+					"tier": "Gold 3",
+				},
+			],
+			"2v2": [],
+		},
+	)
+
+	try:
+		brawl.claim_profile(Bot.OwnerId, 1)
+		emb = await brawl.get_rank(
+			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
+		)
+		assert emb.fields[0].name == "Ranked 1s"
+		assert emb.fields[0].value == (
+			"**Gold 2** (1540/1577 Peak)\n2 W / 1 L / 66.7% winrate"
+			"\nTop Legend: Bodvar, 1400 Elo"
+		)
+		assert hasattr(emb.color, "value")
+		assert emb.color is not None
+		assert emb.color.value == brawl.RankColors["Gold"]
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+
+@MarkAsync
+async def test_get_rank_1s_top_rating_no_top_legend(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json={
+			"name": "Foo",
+			"region": "us-east-1",
+			"tier": "Gold 2",
+			"rating": 1540,
+			"peak_rating": 1577,
+			"wins": 2,
+			"games": 3,
+			"legends": [],
+			"2v2": [],
+		},
+	)
+
+	try:
+		brawl.claim_profile(Bot.OwnerId, 1)
+		emb = await brawl.get_rank(
+			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
+		)
+		assert emb.fields[0].name == "Ranked 1s"
+		assert emb.fields[0].value == (
+			"**Gold 2** (1540/1577 Peak)\n2 W / 1 L / 66.7% winrate"
+		)
+		assert hasattr(emb.color, "value")
+		assert emb.color is not None
+		assert emb.color.value == brawl.RankColors["Gold"]
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+
+@MarkAsync
+async def test_get_rank_2s_top_rating(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json={
+			"name": "Foo",
+			"region": "us-east-1",
+			"rating": 0,
+			"2v2": [
 				{
 					"teamname": "Foo+Spam",
 					"tier": "Gold 2",
@@ -4124,68 +5173,621 @@ async def test_get_stats_no_legends(httpx_mock: HTTPXMock) -> None:
 
 
 @MarkAsync
-async def test_get_stats_no_clan_or_legends(httpx_mock: HTTPXMock) -> None:
-	httpx_mock.add_response(
-		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
-		json={
-			"brawlhalla_id": 1, "name": "test player", "games": 20, "wins": 20,
-		},
-	)
-	member = MockMember(MockUser(user_id=Bot.OwnerId))
-	try:
-		brawl.claim_profile(Bot.OwnerId, 1)
-		emb = await brawl.get_stats(member, "foo")
-		assert len(emb.fields) == 2
-		assert emb.fields[0].value == "test player"
-		assert emb.fields[1].value == (
-			"20 Wins / 0 Losses\n20 Games\n100.0% Winrate"
-		)
-	finally:
-		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+async def test_get_stats_no_clan_or_legends(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		json={
+			"brawlhalla_id": 1, "name": "test player", "games": 20, "wins": 20,
+		},
+	)
+	member = MockMember(MockUser(user_id=Bot.OwnerId))
+	try:
+		brawl.claim_profile(Bot.OwnerId, 1)
+		emb = await brawl.get_stats(member, "foo")
+		assert len(emb.fields) == 2
+		assert emb.fields[0].value == "test player"
+		assert emb.fields[1].value == (
+			"20 Wins / 0 Losses\n20 Games\n100.0% Winrate"
+		)
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+
+@MarkAsync
+async def test_get_stats_no_stats(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo", json={},
+	)
+	member = MockMember(MockUser(user_id=Bot.OwnerId))
+	try:
+		brawl.claim_profile(Bot.OwnerId, 1)
+		emb = await brawl.get_stats(member, "foo")
+		assert emb.description is not None
+		assert emb.description.startswith("This profile doesn't have stats")
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+
+StatsLegendsPayload: list[dict[str, str | int]] = [
+	{
+		"legend_id": 26,
+		"legend_name_key": "jhala",
+		"damagedealt": "24000",
+		"kos": 60,
+		"falls": 40,
+		"matchtime": 1200,
+		"games": 20,
+		"wins": 20,
+		"xp": 100,
+	},
+	{
+		"legend_id": 5,
+		"legend_name_key": "orion",
+		"damagedealt": "60",
+		"kos": 2,
+		"falls": 3,
+		"matchtime": 36,
+		"games": 1,
+		"wins": 0,
+		"xp": 5,
+	},
+	{"legend_id": 3, "legend_name_key": "bodvar", "games": 0, "xp": 0},
+]
+
+
+def test_legend_stats_view() -> None:
+	view = brawl.LegendStatsView(StatsLegendsPayload)
+	assert view.summary() == (
+		("Jhala", 100), ("Jhala", 100.0), ("Jhala", 20.0), ("Orion", 18.0),
+	)
+	assert view.row("orion") == 1
+	assert view.row("sidra") is None
+	assert view.winrate == (100.0, 0.0, None)
+	assert view.dps[2] is None
+	assert view.ttk[2] is None
+
+
+@MarkAsync
+async def test_brawl_api_call_caches_parsed_model(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		json={
+			"name": "test player",
+			"clan": {"clan_id": 2, "clan_name": "test clan"},
+			"legends": StatsLegendsPayload,
+		},
+	)
+	r = await brawl.brawl_api_call(
+		"player/",
+		"1/stats",
+		"foo",
+		ttl=brawl.StatsTTL,
+		parse=brawl.PlayerStats.parse,
+	)
+	assert isinstance(r, brawl.PlayerStats)
+	assert (r.name, r.clan_id, r.clan_name) == ("test player", 2, "test clan")
+	assert r.legends.names == ("Jhala", "Orion", "Bodvar")
+	assert brawl.ApiCache.get(("player/", "1/stats"), time.monotonic()) is r
+	assert await brawl.brawl_api_call(
+		"player/",
+		"1/stats",
+		"foo",
+		ttl=brawl.StatsTTL,
+		parse=brawl.PlayerStats.parse,
+	) is r
+	assert len(httpx_mock.get_requests()) == 1
+
+
+@MarkAsync
+async def test_get_legend_stats(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		json={"name": "test player", "legends": StatsLegendsPayload},
+		is_reusable=True,
+	)
+	member = MockMember(MockUser(user_id=10))
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", lambda _: 1)
+		emb = await brawl.get_legend_stats(member, "foo", "orion")
+		unplayed = await brawl.get_legend_stats(member, "foo", "bodvar")
+	assert emb.title == "Orion Stats for test player"
+	assert [(f.name, f.value) for f in emb.fields] == [
+		("W/L", "0 Wins / 1 Losses\n1 Games\n0.0% Winrate"),
+		(
+			"Combat",
+			"**KOs:** 2\n**Falls:** 3\n**Avg DPS:** 1.7\n**Avg TTK:** 18.0s",
+		),
+		("XP", "5"),
+	]
+	assert unplayed.description == "<@10> hasn't played Bodvar yet."
+
+
+@MarkAsync
+async def test_cmd_brawlstats_legend(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo",
+		json={"name": "test player", "legends": StatsLegendsPayload},
+	)
+	guild = MockGuild()
+	ctx = MockContext(Bot.BeardlessBot, MockMessage(guild=guild), guild=guild)
+	Bot.BrawlKey = "foo"
+	try:
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.fetch_brawl_id", lambda _: 1)
+			assert await Bot.cmd_brawlstats(ctx, target="Jhala") == 1
+			m = await latest_message(ctx)
+			assert m is not None
+			assert m.embeds[0].title == "Jhala Stats for test player"
+
+			assert await Bot.cmd_brawlstats(ctx, target="Jhla") == 1
+			m = await latest_message(ctx)
+			assert m is not None
+			assert m.embeds[0].title == "Jhala Stats for test player"
+	finally:
+		Bot.BrawlKey = None
+
+
+@MarkAsync
+async def test_cmd_brawlstats_unknown_member_is_invalid_target() -> None:
+	guild = MockGuild()
+	ctx = MockContext(Bot.BeardlessBot, MockMessage(guild=guild), guild=guild)
+	Bot.BrawlKey = "foo"
+	try:
+		# "a" is part of many legends' names, but names neither a legend
+		# nor a member; nor does a misspelt member name.
+		for target in ("a", "Nobdy Here"):
+			assert await Bot.cmd_brawlstats(ctx, target=target) == 0
+			m = await latest_message(ctx)
+			assert m is not None
+			assert m.embeds[0].description == "Invalid target!"
+	finally:
+		Bot.BrawlKey = None
+
+
+@MarkAsync
+async def test_get_clan_not_in_a_clan(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo", json={},
+	)
+	try:
+		brawl.claim_profile(Bot.OwnerId, 1)
+		clan = await brawl.get_clan(
+			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
+		)
+		assert clan.description == "You are not in a clan!"
+	finally:
+		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+
+
+@MarkAsync
+async def test_get_clan_uses_clan_id_remembered_from_stats(
+	httpx_mock: HTTPXMock,
+) -> None:
+	clan = {
+		"clan_id": 2,
+		"clan_name": "FooBar",
+		"clan_create_date": 18000,
+		"clan_lifetime_xp": 1257,
+		"clan": [{
+			"brawlhalla_id": 1,
+			"name": "Spam",
+			"rank": "Leader",
+			"xp": 1000,
+			"join_date": 18000,
+		}],
+	}
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/clan/2/?api_key=foo", json=clan,
+	)
+	brawl.remember_clan(1, brawl.PlayerStats(clan_id=2))
+	assert await brawl.fetch_clan(1, "foo") == brawl.Clan.parse(clan)
+	assert len(httpx_mock.get_requests()) == 1
+
+	brawl.remember_clan(1, brawl.PlayerStats())
+	assert brawl.ClanIds.get(1, time.monotonic()) is None
+
+
+@MarkAsync
+async def test_get_clan_refetches_stats_after_player_leaves_clan(
+	httpx_mock: HTTPXMock,
+) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/clan/2/?api_key=foo",
+		json={"clan_id": 2, "clan": [{"brawlhalla_id": 3}]},
+	)
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/stats?api_key=foo", json={},
+	)
+	brawl.remember_clan(1, brawl.PlayerStats(clan_id=2))
+	assert await brawl.fetch_clan(1, "foo") is None
+	assert len(httpx_mock.get_requests()) == 2
+	assert len(brawl.ClanIds) == 0
+
+
+@MarkAsync
+async def test_brawl_board_refreshes_only_stale_entries(
+	httpx_mock: HTTPXMock,
+) -> None:
+	ranked = {
+		1: {"games": 5, "rating": 1500, "2v2": [{"rating": 1700}]},
+		2: {"games": 5, "rating": 1800, "2v2": []},
+		3: {"games": 0, "rating": 750, "2v2": []},
+	}
+	for brawl_id, payload in ranked.items():
+		httpx_mock.add_response(
+			url=f"https://api.brawlhalla.com/player/{brawl_id}/ranked"
+			"?api_key=foo",
+			json=payload,
+			is_reusable=True,
+		)
+	members: list[nextcord.Member] = [
+		MockMember(MockUser(user_id=i)) for i in range(10, 15)
+	]
+	guild = MockGuild(members=members, guild_id=5)
+	claims = {10: 1, 11: 2, 12: 3, 13: 2}
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", claims.get)
+		emb = await brawl.brawl_board(guild, "foo")
+		assert len(httpx_mock.get_requests()) == 3
+		assert emb.title == "Brawlhalla Leaderboard for Test Guild"
+		assert emb.fields[0].name == "Ranked 1s"
+		assert emb.fields[0].value == (
+			"1. <@11> (1800 Elo)\n2. <@10> (1500 Elo)"
+		)
+		assert emb.fields[1].name == "Ranked 2s"
+		assert emb.fields[1].value == "1. <@10> (1700 Elo)"
+		assert emb.footer.text == "3 claimed profiles"
+
+		await brawl.brawl_board(guild, "foo")
+		assert len(httpx_mock.get_requests()) == 3
+
+		brawl.ApiCache.clear()
+		brawl.Boards[5][1] = (time.monotonic() - brawl.BoardTTL, 1500, 1700)
+		del claims[12]
+		await brawl.brawl_board(guild, "foo")
+		assert len(httpx_mock.get_requests()) == 4
+		assert set(brawl.Boards[5]) == {1, 2}
+
+		# Ranked data kept only to be served stale by !rank is refetched,
+		# and the board is stamped with when its data was fetched.
+		old = time.monotonic() - brawl.RankedTTL - 1
+		brawl.ApiCache.put(
+			("player/", "2/ranked"),
+			brawl.Ranked.parse(ranked[2]),
+			brawl.RankedTTL + brawl.RankedStale,
+			old,
+		)
+		brawl.Boards[5][2] = (time.monotonic() - brawl.BoardTTL, 1800, 0)
+		await brawl.brawl_board(guild, "foo")
+		assert len(httpx_mock.get_requests()) == 5
+		assert brawl.Boards[5][2][0] > old + brawl.RankedTTL
+
+		brawl.ApiCache.put(
+			("player/", "2/ranked"),
+			brawl.Ranked.parse(ranked[2]),
+			brawl.RankedTTL + brawl.RankedStale,
+			fresh := time.monotonic() - 1,
+		)
+		brawl.Boards[5][2] = (time.monotonic() - brawl.BoardTTL, 1800, 0)
+		await brawl.brawl_board(guild, "foo")
+		assert len(httpx_mock.get_requests()) == 5
+		assert brawl.Boards[5][2][0] == fresh
+
+
+@MarkAsync
+async def test_brawl_board_with_no_ranked_players() -> None:
+	emb = await brawl.brawl_board(MockGuild(), "foo")
+	assert not emb.fields
+	assert emb.description == (
+		"Nobody in this server who has claimed a profile"
+		" has played ranked yet this season."
+	)
+
+
+@MarkAsync
+async def test_cmd_brawlboard_request_limit(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		status_code=429,
+	)
+	ctx = MockContext(
+		Bot.BeardlessBot,
+		guild=MockGuild(members=[MockMember(MockUser(user_id=10))]),
+	)
+	assert await Bot.cmd_brawlboard(ctx) == -1
+
+	Bot.BrawlKey = "foo"
+	try:
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.fetch_brawl_id", {10: 1}.get)
+			assert await Bot.cmd_brawlboard(ctx) == 0
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description == brawl.RequestLimit
+	finally:
+		Bot.BrawlKey = None
+
+
+@MarkAsync
+async def test_brawl_board_deadline_shows_cached_and_pending() -> None:
+	release = asyncio.Event()
+	calls: list[str] = []
+
+	async def slow_call(
+		route: str, arg: str, *_: object, **__: object,
+	) -> brawl.Ranked:
+		assert route == "player/"
+		calls.append(arg)
+		await release.wait()
+		return brawl.Ranked.parse({"games": 5, "rating": 1600, "2v2": []})
+
+	members: list[nextcord.Member] = [
+		MockMember(MockUser(user_id=i)) for i in (10, 11, 12)
+	]
+	guild = MockGuild(members=members, guild_id=6)
+	stale = time.monotonic() - brawl.BoardTTL
+	brawl.Boards[6] = {1: (stale, 1500, 0)}
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", {10: 1, 11: 2}.get)
+		mp.setattr("brawl.brawl_api_call", slow_call)
+		mp.setattr("brawl.BoardDeadline", 0.01)
+		emb = await brawl.brawl_board(guild, "foo")
+		assert sorted(calls) == ["1/ranked", "2/ranked"]
+		assert emb.fields[0].value == "1. <@10> (1500 Elo)"
+		assert emb.footer.text == "2 claimed profiles, 2 pending"
+		assert len(brawl.Refreshes) == 2
+
+		release.set()
+		await asyncio.gather(*brawl.Refreshes)
+		assert not brawl.Refreshes
+
+		mp.setattr("brawl.fetch_brawl_id", {11: 2}.get)
+		brawl.Boards[6] = {}
+		release.clear()
+		emb = await brawl.brawl_board(guild, "foo")
+		assert not emb.fields
+		assert emb.description == brawl.StillFetchingMsg
+		assert emb.footer.text == "1 claimed profiles, 1 pending"
+		release.set()
+		await asyncio.gather(*brawl.Refreshes)
+
+
+def test_estimate_glory() -> None:
+	glory = brawl.estimate_glory(
+		np.array([100, 200, 5, 3]),
+		np.array([120, 250, 9, 10]),
+		np.array([1500, 2800, 1300, 1100]),
+	)
+	assert glory.tolist() == [4298, 8341, 0, 310]
+
+
+def test_elo_reset() -> None:
+	assert brawl.elo_reset(np.array([1200, 1400, 2000, 2600])).tolist() == [
+		1200, 1400, 1742, 1880,
+	]
+
+
+def test_season_totals() -> None:
+	assert brawl.season_totals(
+		brawl.Ranked.parse({"games": 0, "wins": 0, "2v2": []}),
+	) == (0, 0, 0)
+	assert brawl.season_totals(brawl.Ranked.parse({
+		"games": 30,
+		"wins": 20,
+		"peak_rating": 1900,
+		"2v2": [{"games": 10, "wins": 5, "peak_rating": 2000}],
+	})) == (25, 40, 2000)
+
+
+RankedGloryPayload: dict[str, Any] = {
+	"games": 30,
+	"wins": 20,
+	"rating": 1800,
+	"peak_rating": 1900,
+	"2v2": [{
+		"teamname": "Foo+Bar",
+		"games": 10,
+		"wins": 5,
+		"rating": 1300,
+		"peak_rating": 1350,
+	}],
+}
+
+
+@MarkAsync
+async def test_get_glory(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json=RankedGloryPayload,
+	)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", lambda _: 1)
+		emb = await brawl.get_glory(MockMember(), "foo")
+	assert emb.description == (
+		"Estimated glory: **4441**\n25 wins in 40 games, peak rating 1900"
+	)
+	assert [(f.name, f.value) for f in emb.fields] == [
+		("1v1", "1800 → 1666 Elo"), ("Foo+Bar", "1300 → 1300 Elo"),
+	]
+
+
+@MarkAsync
+async def test_glory_board(httpx_mock: HTTPXMock) -> None:
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json={"games": 3, "wins": 3, "rating": 1000, "peak_rating": 1000},
+	)
+	httpx_mock.add_response(
+		url="https://api.brawlhalla.com/player/2/ranked?api_key=foo",
+		json=RankedGloryPayload,
+	)
+	members: list[nextcord.Member] = [
+		MockMember(MockUser(user_id=i)) for i in (10, 11)
+	]
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", {10: 1, 11: 2}.get)
+		emb = await brawl.glory_board(MockGuild(members=members), "foo")
+	assert emb.title == "Brawlhalla Glory Estimates for Test Guild"
+	assert emb.description == (
+		"1. <@11> (4441 glory, 1800 → 1666 Elo)"
+	)
+	assert emb.footer.text == "2 claimed profiles"
+
+
+@MarkAsync
+async def test_glory_board_deadline(httpx_mock: HTTPXMock) -> None:
+	release = asyncio.Event()
 
+	async def slow_call(
+		route: str, arg: str, *_: object, **__: object,
+	) -> brawl.Ranked:
+		assert (route, arg) == ("player/", "2/ranked")
+		await release.wait()
+		return brawl.Ranked.parse(RankedGloryPayload)
 
-@MarkAsync
-async def test_get_stats_no_stats(httpx_mock: HTTPXMock) -> None:
 	httpx_mock.add_response(
-		url="https://api.brawlhalla.com/player/1/stats?api_key=foo", json={},
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json=RankedGloryPayload,
 	)
-	member = MockMember(MockUser(user_id=Bot.OwnerId))
-	try:
-		brawl.claim_profile(Bot.OwnerId, 1)
-		emb = await brawl.get_stats(member, "foo")
-		assert emb.description is not None
-		assert emb.description.startswith("This profile doesn't have stats")
-	finally:
-		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+	await brawl.brawl_api_call(
+		"player/",
+		"1/ranked",
+		"foo",
+		ttl=brawl.RankedTTL + brawl.RankedStale,
+		parse=brawl.Ranked.parse,
+	)
+	members: list[nextcord.Member] = [
+		MockMember(MockUser(user_id=i)) for i in (10, 11)
+	]
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.fetch_brawl_id", {10: 1, 11: 2}.get)
+		mp.setattr("brawl.brawl_api_call", slow_call)
+		mp.setattr("brawl.BoardDeadline", 0.01)
+		emb = await brawl.glory_board(MockGuild(members=members), "foo")
+		assert emb.description == (
+			"1. <@10> (4441 glory, 1800 → 1666 Elo)"
+		)
+		assert emb.footer.text == "2 claimed profiles, 1 pending"
+
+		mp.setattr("brawl.fetch_brawl_id", {11: 2}.get)
+		emb = await brawl.glory_board(MockGuild(members=members), "foo")
+		assert emb.description == brawl.StillFetchingMsg
+		release.set()
+		await asyncio.gather(*brawl.Refreshes)
 
 
 @MarkAsync
-async def test_get_clan_not_in_a_clan(httpx_mock: HTTPXMock) -> None:
+async def test_cmd_brawlglory_server(httpx_mock: HTTPXMock) -> None:
 	httpx_mock.add_response(
-		url="https://api.brawlhalla.com/player/1/stats?api_key=foo", json={},
+		url="https://api.brawlhalla.com/player/1/ranked?api_key=foo",
+		json=RankedGloryPayload,
+	)
+	ctx = MockContext(
+		Bot.BeardlessBot,
+		guild=MockGuild(members=[MockMember(MockUser(user_id=10))]),
 	)
+	Bot.BrawlKey = "foo"
 	try:
-		brawl.claim_profile(Bot.OwnerId, 1)
-		clan = await brawl.get_clan(
-			MockMember(MockUser(user_id=Bot.OwnerId)), "foo",
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("brawl.fetch_brawl_id", {10: 1}.get)
+			assert await Bot.cmd_brawlglory(ctx, target="server") == 1
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.embeds[0].description == (
+			"1. <@10> (4441 glory, 1800 → 1666 Elo)"
 		)
-		assert clan.description == "You are not in a clan!"
 	finally:
-		brawl.claim_profile(Bot.OwnerId, OwnerBrawlId)
+		Bot.BrawlKey = None
 
 
-def test_get_brawl_data(httpx_mock: HTTPXMock) -> None:
-	brawl_data_content = (
-		b'<script /><script /><script /><script>{"body": "{\\"data\\":'
-		b' {\\"weapons\\": {\\"nodes\\": [{\\"name\\":'
-		b' \\"cannon\\"}]}}}"}</script>'
-	)
+BrawlDataContent = (
+	b'<script /><script /><script /><script>{"body": "{\\"data\\":'
+	b' {\\"weapons\\": {\\"nodes\\": [{\\"name\\":'
+	b' \\"cannon\\"}]}}}"}</script>'
+)
+
+
+@MarkAsync
+async def test_get_brawl_data(
+	httpx_mock: HTTPXMock, http_disk_cache: misc.HttpCache,
+) -> None:
 	httpx_mock.add_response(
-		url="https://www.brawlhalla.com/legends", content=brawl_data_content,
+		url=brawl.BrawlDataUrl,
+		content=BrawlDataContent,
+		headers={"ETag": '"v1"'},
 	)
-	data = brawl.get_brawl_data()
+	data = await brawl.get_brawl_data()
 	assert len(data["weapons"]["nodes"]) == 1
 	assert data["weapons"]["nodes"][0]["name"] == "cannon"
+	# brawlData.json is the only copy kept on disk.
+	assert not http_disk_cache.entries
+	assert not http_disk_cache.root.exists()
+
+	httpx_mock.add_response(url=brawl.BrawlDataUrl, status_code=503)
+	with pytest.raises(httpx.RequestError, match="site data"):
+		await brawl.get_brawl_data()
+
+
+@MarkAsync
+async def test_refresh_brawl_data_uses_disk_cache(
+	httpx_mock: HTTPXMock, tmp_path: Path,
+) -> None:
+	cache = tmp_path / "brawlData.json"
+	assert brawl.load_brawl_data(cache) == ({}, 0.0)
+	cache.write_text("{not json", encoding="UTF-8")
+	assert brawl.load_brawl_data(cache) == ({}, 0.0)
+
+	httpx_mock.add_response(url=brawl.BrawlDataUrl, content=BrawlDataContent)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.BrawlDataCache", cache)
+		mp.setattr("brawl.Data", {})
+		mp.setattr("brawl.DataFetched", 0.0)
+		assert await brawl.refresh_brawl_data()
+		data, fetched = brawl.load_brawl_data(cache)
+		assert data == brawl.Data
+		assert data["weapons"]["nodes"][0]["name"] == "cannon"
+		assert fetched == brawl.DataFetched
+		assert time.time() - fetched < 60
+		assert not tmp_path.joinpath("brawlData.tmp").exists()
+
+		# Fresh cache: no request is made.
+		assert not await brawl.refresh_brawl_data()
+
+		mp.setattr("brawl.DataFetched", fetched - brawl.BrawlDataTTL)
+		httpx_mock.add_exception(httpx.ConnectError("offline"))
+		assert not await brawl.refresh_brawl_data()
+		assert brawl.Data == data
+
+
+@MarkAsync
+async def test_refresh_brawl_data_survives_failed_cache_write(
+	httpx_mock: HTTPXMock, tmp_path: Path, caplog: pytest.LogCaptureFixture,
+) -> None:
+	httpx_mock.add_response(url=brawl.BrawlDataUrl, content=BrawlDataContent)
+	with pytest.MonkeyPatch.context() as mp:
+		# The cache's directory doesn't exist, so writing it fails.
+		mp.setattr("brawl.BrawlDataCache", tmp_path / "missing" / "data.json")
+		mp.setattr("brawl.Data", {})
+		mp.setattr("brawl.DataFetched", 0.0)
+		assert await brawl.refresh_brawl_data()
+		assert brawl.Data["weapons"]["nodes"][0]["name"] == "cannon"
+	assert caplog.records[-1].msg == "Failed to cache Brawlhalla site data!"
+
+
+@MarkAsync
+async def test_random_brawl_weapon_without_site_data() -> None:
+	async def fail_refresh() -> bool:
+		return False
+
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.Data", {})
+		mp.setattr("brawl.refresh_brawl_data", fail_refresh)
+		weapon = await brawl.random_brawl("weapon")
+		assert brawl.get_legend_picture("bodvar") is None
+	assert weapon.title == "Brawlhalla Randomizer"
+	assert weapon.description == brawl.NoSiteData
 
 
 @MarkAsync
@@ -4208,6 +5810,38 @@ async def test_random_brawl_weapon() -> None:
 	assert weapon.thumbnail.url == "foo.bar"
 
 
+def test_brawl_icons_are_reindexed_when_data_changes() -> None:
+	def site_data(url: str) -> brawl.BrawlData:
+		return {
+			"legends": {
+				"nodes": [{
+					"slug": "red-raptor",
+					"legendFields": {"icon": {"sourceUrl": url}},
+				}],
+			},
+			"weapons": {
+				"nodes": [{
+					"name": "Scythe",
+					"weaponFields": {"icon": {"sourceUrl": url}},
+				}],
+			},
+		}
+
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("brawl.Data", site_data("foo.bar"))
+		icons = brawl.brawl_icons()
+		assert icons == (
+			{"red-raptor": "foo.bar"}, {"Scythe": "foo.bar"}, ("Scythe",),
+		)
+		assert brawl.brawl_icons() is icons
+		assert brawl.get_legend_picture("redraptor") == "foo.bar"
+		assert brawl.get_weapon_picture("Scythe") == "foo.bar"
+
+		mp.setattr("brawl.Data", site_data("baz.bar"))
+		assert brawl.get_weapon_picture("Scythe") == "baz.bar"
+	assert brawl.index_brawl_data({}) == ({}, {}, ())
+
+
 @MarkAsync
 async def test_random_brawl_legend_no_brawl_key() -> None:
 	with pytest.MonkeyPatch.context() as mp:
@@ -4217,6 +5851,28 @@ async def test_random_brawl_legend_no_brawl_key() -> None:
 	assert legend.description == "Your legend is Bodvar."
 
 
+def test_legend_catalog_finds_misspelt_legends() -> None:
+	legends = brawl.LegendCatalog(Path("resources/legends.json"))
+	assert not legends.loaded
+	bodvar = legends.find("bodvar")
+	assert bodvar is not None
+	assert legends.loaded
+	assert legends.by_id[int(bodvar["legend_id"])] is bodvar
+	assert legends.find("bodvr") is bodvar
+	assert legends.find("vraxx") is legends.by_key["lord vraxx"]
+	assert legends.find("sentinl") is legends.by_key["sentinel"]
+	assert legends.find("invalidname") is None
+	assert legends.find("a") is not None
+	assert legends.closest("a") is None
+	assert legends.closest("bodvr") is bodvar
+	assert legends.names[0] == "Bodvar"
+
+	legends.load([{"legend_id": "1", "legend_name_key": "foo bar"}])
+	assert legends.names == ("Foo Bar",)
+	assert legends.find("fooo bar") is legends.by_id[1]
+	assert legends.find("bodvar") is None
+
+
 @MarkAsync
 async def test_random_brawl_invalid() -> None:
 	legend = await brawl.random_brawl("invalidrandom")
@@ -4557,3 +6213,521 @@ You did not blackjack, you lose.
 
 Round ended.\
 """
+
+
+def test_timing_wheel_expires_keys_after_deadline() -> None:
+	wheel: bucks.TimingWheel[str] = bucks.TimingWheel(0, tick=1, slots=4)
+	wheel.schedule("foo", 2, 0)
+	wheel.schedule("bar", 9, 0)
+	assert len(wheel) == 2
+	assert wheel.advance(1) == []
+	assert wheel.advance(2) == ["foo"]
+	assert len(wheel) == 1
+
+	# bar shares a slot with foo, but is two rotations further out
+	assert wheel.advance(8) == []
+	assert wheel.advance(100) == ["bar"]
+	assert len(wheel) == 0
+
+
+def test_timing_wheel_reschedule_and_cancel() -> None:
+	wheel: bucks.TimingWheel[str] = bucks.TimingWheel(0, tick=1, slots=4)
+	wheel.schedule("foo", 2, 0)
+	wheel.schedule("foo", 5, 1)
+	assert len(wheel) == 1
+	assert wheel.advance(5) == []
+	assert wheel.advance(6) == ["foo"]
+
+	wheel.schedule("bar", 1, 6)
+	wheel.cancel("bar")
+	wheel.cancel("bar")
+	assert wheel.advance(10) == []
+
+	# Deadlines in the past fire on the next advance
+	wheel.schedule("baz", -5, 10)
+	assert wheel.advance(11) == ["baz"]
+
+
+def test_blackjack_expire_settles_round_in_progress() -> None:
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)  # for deck draws
+		mp.setattr("random.choice", operator.itemgetter(0))
+		mp.setattr("bucks.write_money", lambda *_, **__: None)
+		game = make_blackjack_multiplayer_with_unique_user_id(2)
+		assert game.expire() == (
+			"This game of blackjack was closed due to inactivity.\n"
+		)
+
+		game.deck = [10, 7, 3, 4, 10, 9]
+		game.start_game()
+		report = game.expire()
+	assert "<@1111> you stayed." in report
+	assert "<@2222> you stayed." in report
+	assert report.endswith("Round ended!")
+	assert game.round_over()
+
+
+@MarkAsync
+async def test_reap_idle_games() -> None:
+	Bot.BlackjackGames = []
+	ctx = MockContext(Bot.BeardlessBot, guild=MockGuild())
+	game = bucks.BlackjackGame(MockMember(), multiplayer=True)
+	stale_game = bucks.BlackjackGame(MockMember(), multiplayer=True)
+	Bot.add_game(game, ctx.channel)
+	Bot.add_game(stale_game, ctx.channel)
+	Bot.remove_game(stale_game)
+	Bot.IdleGames.schedule(stale_game, 0, time.monotonic())
+	Bot.touch_game(game)
+	assert len(Bot.BlackjackGames) == 1
+
+	assert await Bot.reap_idle_games(time.monotonic()) == 0
+	assert len(Bot.BlackjackGames) == 1
+	assert await Bot.reap_idle_games(
+		time.monotonic() + Bot.IdleGameTimeout + Bot.IdleGameTick,
+	) == 1
+	assert len(Bot.BlackjackGames) == 0
+	assert len(Bot.IdleGames) == 0
+	m = await latest_message(ctx)
+	assert m is not None
+	assert m.embeds[0].description == (
+		"This game of blackjack was closed due to inactivity.\n"
+	)
+
+
+@MarkAsync
+async def test_expire_turns_stays_afk_player() -> None:
+	Bot.BlackjackGames = []
+	ctx = MockContext(Bot.BeardlessBot, guild=MockGuild())
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)  # for deck draws
+		mp.setattr("random.choice", operator.itemgetter(0))
+		mp.setattr("bucks.write_money", lambda *_, **__: None)
+		game = make_blackjack_multiplayer_with_unique_user_id(2)
+		Bot.add_game(game, ctx.channel)
+		Bot.touch_game(game)
+		assert len(Bot.TurnTimers) == 0
+
+		game.deck = [10, 7, 3, 4, 10, 9]
+		game.start_game()
+		Bot.touch_game(game)
+		assert len(Bot.TurnTimers) == 1
+		now = time.monotonic()
+		assert await Bot.expire_turns(now) == 0
+
+		late = now + Bot.TurnTimeout + Bot.IdleGameTick
+		assert await Bot.expire_turns(late) == 1
+		assert game.turn_idx == 1
+		assert len(Bot.TurnTimers) == 1
+		assert game.status is not None
+		assert game.status.embeds[0].description is not None
+		assert game.status.embeds[0].description.startswith(
+			"<@1111>, you ran out of time.\n<@1111> you stayed.",
+		)
+		m = await latest_message(ctx)
+		assert m is not None
+		assert m.content == f"{game.players[1].name.mention}, it is your turn."
+
+		assert await Bot.expire_turns(
+			late + Bot.TurnTimeout + Bot.IdleGameTick,
+		) == 1
+	assert not game.started
+	assert len(Bot.TurnTimers) == 0
+	Bot.remove_game(game)
+	assert len(Bot.IdleGames) == 0
+
+
+def test_simulator_rules_match_blackjack_game() -> None:
+	rules = simulator.RuleSet()
+	assert rules.goal == bucks.BlackjackGame.Goal
+	assert rules.dealer_soft_goal == bucks.BlackjackGame.DealerSoftGoal
+	assert rules.ace_val == bucks.BlackjackGame.AceVal
+	assert rules.card_vals == bucks.BlackjackGame.CardVals
+	assert rules.decks == bucks.BlackjackGame.NumOfDecksInMatch
+	assert rules.ace_drop == 10
+
+
+def test_threshold_policy() -> None:
+	policy = simulator.threshold_policy(15)
+	assert policy.shape == (22, 2, 12)
+	assert policy[14].all()
+	assert not policy[15:].any()
+
+
+def test_simulate_is_reproducible_with_seed() -> None:
+	result = simulator.simulate(5000, seed=7, batch_size=2000)
+	assert result == simulator.simulate(5000, seed=7, batch_size=2000)
+	assert result.hands == 5000
+	assert 0 < result.push_rate < 1
+	assert result.standard_error > 0
+
+
+def test_simulate_shoe_of_tens_always_pushes() -> None:
+	result = simulator.simulate(
+		1000, simulator.RuleSet(card_vals=(10,)), seed=1,
+	)
+	assert result.house_edge == 0
+	assert result.variance == 0
+	assert result.push_rate == 1
+	assert result.dealer_blackjack_rate == 0
+
+
+def test_simulate_house_edge_favors_house() -> None:
+	# A small seeded run, checked against the edge a 2,000,000-hand run
+	# converges to, give or take four standard errors.
+	result = simulator.simulate(20000, seed=0)
+	assert abs(result.house_edge - 0.058) < 4 * result.standard_error
+	assert result.variance > 0.8
+	assert 0.03 < result.dealer_blackjack_rate < 0.07
+	assert result.player_bust_rate > result.dealer_bust_rate
+
+
+def test_blackjack_hints_match_rules() -> None:
+	# The shipped table must be regenerated whenever the rules change:
+	# python3 simulator.py --write-hints
+	policy = simulator.basic_strategy()
+	assert bucks.BlackjackHints
+	for (total, soft, up), hit in bucks.BlackjackHints.items():
+		assert policy[total, int(soft), up] == hit
+
+
+def test_blackjack_hint() -> None:
+	m = MockMember()
+	game = bucks.BlackjackGame(m, multiplayer=False)
+	player = game.players[0]
+	game.dealerUp = 10
+	player.hand = [10, 6]
+	assert game.hint(player) == (
+		"With a hard 16 against the dealer's 10, basic"
+		f" strategy says you should stay, {m.mention}."
+	)
+	game.dealerUp = 7
+	assert game.hint(player).endswith(f"you should hit, {m.mention}.")
+	player.hand = [11, 7]
+	game.dealerUp = 9
+	assert game.hint(player).startswith("With a soft 18 against")
+	assert "you should hit" in game.hint(player)
+	player.hand = [1, 10, 7]
+	assert game.hint(player).startswith("With a hard 18 against")
+	assert "you should stay" in game.hint(player)
+	player.hand = [5, 6]
+	assert game.hint(player).startswith("With a hard 11 against")
+
+
+@MarkAsync
+async def test_cmd_hint() -> None:
+	Bot.BlackjackGames = []
+	m = MockMember()
+	ctx = MockContext(Bot.BeardlessBot, author=m, guild=MockGuild())
+	assert await Bot.cmd_hint(ctx) == 1
+	msg = await latest_message(ctx)
+	assert msg is not None
+	assert msg.embeds[0].description == bucks.NoGameMsg.format(m.mention)
+
+	game = bucks.BlackjackGame(m, multiplayer=False)
+	game.dealerUp = 6
+	game.players[0].hand = [10, 3]
+	Bot.BlackjackGames = [game]
+	assert await Bot.cmd_hint(ctx) == 1
+	msg = await latest_message(ctx)
+	assert msg is not None
+	emb = msg.embeds[0]
+	assert emb.description == game.hint(game.players[0])
+	assert "you should stay" in emb.description
+
+
+def test_bb_random_seeded_is_replayable() -> None:
+	first, second = misc.BbRandom(42), misc.BbRandom(42)
+	draws = [first.flip() for _ in range(200)], first.roll(6, 150)
+	assert draws == ([second.flip() for _ in range(200)], second.roll(6, 150))
+	assert set(draws[0]) == {0, 1}
+	assert set(draws[1]) == {1, 2, 3, 4, 5, 6}
+	assert first.randint(1, 10**9) == second.randint(1, 10**9)
+	assert first.choice(range(10**9)) == second.choice(range(10**9))
+	assert first.roll(20, 0) == []
+	assert misc.BbRandom(43).roll(6, 150) != misc.BbRandom(42).roll(6, 150)
+
+
+def test_bb_random_unseeded_defers_to_random() -> None:
+	rng = misc.BbRandom()
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda _, y: y)
+		mp.setattr("random.choice", operator.itemgetter(1))
+		assert rng.flip() == 1
+		assert rng.roll(8, 3) == [8, 8, 8]
+		assert rng.randint(3, 5) == 5
+		assert rng.choice("abc") == "b"
+
+
+def test_seeded_rng_mode_replays_blackjack(
+	caplog: pytest.LogCaptureFixture,
+) -> None:
+	caplog.set_level(logging.INFO)
+	m = MockMember()
+	misc.seed_rng(7)
+	try:
+		games = [
+			bucks.BlackjackGame(m, multiplayer=False) for _ in range(2)
+		]
+	finally:
+		misc.seed_rng(None)
+	seeds = [game.seed for game in games]
+	assert None not in seeds
+	assert seeds[0] != seeds[1]
+	assert seeds == [game.rng.seed for game in games]
+	assert caplog.records[0].getMessage() == (
+		f"Seeded RNG with {seeds[0]}; Blackjack game: {games[0].game_id}"
+	)
+
+	replay = bucks.BlackjackGame(
+		m, multiplayer=False, rng=misc.new_rng(seeds[0]),
+	)
+	assert replay.message == games[0].message
+	assert replay.deck == games[0].deck
+	assert replay.deal_top_card() == games[0].deal_top_card()
+	assert misc.new_rng().seed is None
+
+
+@MarkAsync
+async def test_seeded_rng_mode_logs_command_context(
+	caplog: pytest.LogCaptureFixture,
+) -> None:
+	caplog.set_level(logging.INFO)
+	Bot.BlackjackGames = []
+	ctx = MockContext(Bot.BeardlessBot, invoked_with="tablenew")
+	misc.seed_rng(7)
+	try:
+		with pytest.MonkeyPatch.context() as mp:
+			mp.setattr("Bot.TableEditDelay", 0)
+			assert await Bot.cmd_tablenew(ctx) == 1
+			await flush_tables()
+	finally:
+		misc.seed_rng(None)
+	game = Bot.BlackjackGames[0]
+	assert caplog.records[0].getMessage() == (
+		f"Seeded RNG with {game.seed}; Blackjack game: {game.game_id};"
+		f" Command: tablenew; Author: {ctx.author} ({ctx.author.id});"
+		f" Channel: {ctx.channel} ({ctx.channel.id})"
+	)
+	Bot.remove_game(game)
+
+
+def test_blackjack_table_status() -> None:
+	owner, guest = MockMember(MockUser(user_id=1111)), MockMember(
+		MockUser(user_id=2222),
+	)
+	game = bucks.BlackjackGame(owner, multiplayer=True)
+	game.add_player(guest)
+	game.players[1].bet = 25
+	assert game.table_status() == (
+		"Waiting for the owner to start the round.\n"
+		"<@1111>: bet 10 (owner)\n<@2222>: bet 25"
+	)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)
+		game.start_game()
+	assert game.table_status() == (
+		"The dealer is showing 2.\n"
+		"<@1111>: bet 10, cards 4, 5 for a total of 9 (owner) (to act)\n"
+		"<@2222>: bet 25, cards 6, 7 for a total of 13"
+	)
+
+
+@MarkAsync
+async def test_update_table_coalesces_reports() -> None:
+	Bot.BlackjackGames = []
+	ctx = MockContext(Bot.BeardlessBot, guild=MockGuild())
+	game = bucks.BlackjackGame(MockMember(), multiplayer=True)
+	Bot.add_game(game, ctx.channel)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("Bot.TableEditDelay", 0.01)
+		for i in range(5):
+			Bot.update_table(game, f"Report {i}\n")
+		# Queuing returns at once; the flush happens TableEditDelay later.
+		assert game.status is None
+		assert len(Bot.TableFlushes) == 1
+		await flush_tables()
+		assert len([m async for m in ctx.history()]) == 1
+		assert game.status is not None
+		assert game.status.edited_at is None
+		emb = game.status.embeds[0]
+		assert emb.description == "\n".join(f"Report {i}" for i in range(5))
+		assert emb.fields[0].value == game.table_status()
+
+		Bot.update_table(game, "Report 5")
+		Bot.update_table(game, "Report 6")
+		await flush_tables()
+		assert len([m async for m in ctx.history()]) == 1
+		assert game.status.edited_at is not None
+		assert game.status.embeds[0].description == "Report 5\nReport 6"
+	assert not Bot.TableFlushes
+	assert not Bot.TableUpdates
+	Bot.remove_game(game)
+
+
+@MarkAsync
+async def test_multiplayer_commands_report_to_table() -> None:
+	Bot.BlackjackGames = []
+	ctx = MockContext(Bot.BeardlessBot, guild=MockGuild())
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("Bot.TableEditDelay", 0)
+		assert await Bot.cmd_tablenew(ctx) == 1
+		await flush_tables()
+	game = Bot.BlackjackGames[0]
+	assert game.status is not None
+	assert game.status.embeds[0].description == (
+		"Multiplayer Blackjack game created!"
+	)
+	assert game.status.embeds[0].fields[0].name == "Table"
+	assert len([m async for m in ctx.history()]) == 1
+
+	assert await Bot.cmd_tablenew(ctx) == 1
+	m = await latest_message(ctx)
+	assert m is not None
+	assert m.embeds[0].description == bucks.FinMsg.format(ctx.author.mention)
+	assert len([m async for m in ctx.history()]) == 2
+	Bot.remove_game(game)
+
+
+@MarkAsync
+async def test_flush_table_mentions_player_to_act() -> None:
+	Bot.BlackjackGames = []
+	channel = MockChannel()
+	owner = MockMember(MockUser(user_id=1111))
+	game = bucks.BlackjackGame(owner, multiplayer=True)
+	game.add_player(MockMember(MockUser(user_id=2222)))
+	Bot.add_game(game, channel)
+
+	async def flush(report: str) -> list[str]:
+		Bot.TableUpdates[game] = [report]
+		await Bot.flush_table(game)
+		return [m.content async for m in channel.history()][1:]
+
+	assert await flush("Created") == []
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)
+		game.start_game()
+	assert await flush("Started") == ["<@1111>, it is your turn."]
+	# The status message is edited in place without a new mention until
+	# the turn passes to someone else.
+	assert await flush("Still thinking") == ["<@1111>, it is your turn."]
+	game.stay_current_player()
+	assert await flush("Stayed") == [
+		"<@1111>, it is your turn.", "<@2222>, it is your turn.",
+	]
+	assert game.pinged is game.players[1]
+	Bot.remove_game(game)
+
+
+@MarkAsync
+async def test_blackjack_controls() -> None:
+	game = bucks.BlackjackGame(MockMember(), multiplayer=True)
+	view = Bot.blackjack_controls(game)
+	buttons = [b for b in view.children if isinstance(b, nextcord.ui.Button)]
+	assert [button.custom_id for button in buttons] == [
+		f"blackjack:{action}:{game.game_id}"
+		for action in ("hit", "stay", "join", "start")
+	]
+	assert view.timeout is None
+	assert not view.prevent_update
+
+	solo = bucks.BlackjackGame(MockMember(), multiplayer=False)
+	assert solo.game_id != game.game_id
+	assert len(Bot.blackjack_controls(solo).children) == 2
+	# Ids start from the process's start time, so a restarted bot's games
+	# are all numbered after every game from before the restart.
+	assert 0 < solo.game_id // 10**6 <= time.time_ns() // 10**6
+
+
+def test_press_button_routes_to_game() -> None:
+	Bot.BlackjackGames = []
+	owner = MockMember(MockUser(user_id=1111))
+	guest = MockMember(MockUser(user_id=2222))
+	game = bucks.BlackjackGame(owner, multiplayer=True)
+	Bot.add_game(game, MockChannel())
+	button = f"blackjack:{{}}:{game.game_id}".format
+
+	assert Bot.press_button("help:hit:1", owner) is None
+	assert Bot.press_button(f"blackjack:fold:{game.game_id}", owner) is None
+	assert Bot.press_button("blackjack:hit:0", owner) == (
+		"This game of blackjack is over.", None,
+	)
+	# A button left over from the first game of a previous run of the bot
+	assert Bot.press_button("blackjack:hit:1", owner) == (
+		"This game of blackjack is over.", None,
+	)
+	assert Bot.press_button(button("hit"), guest) == (
+		"You are not playing in this game, <@2222>.", None,
+	)
+	assert Bot.press_button(button("join"), guest) == (
+		"<@2222> joined <@1111>'s blackjack game.", game,
+	)
+	assert Bot.press_button(button("join"), guest) == (
+		bucks.FinMsg.format("<@2222>"), None,
+	)
+	assert Bot.press_button(button("start"), guest) == (
+		"You are not the owner of this table", None,
+	)
+	assert Bot.press_button(button("hit"), owner) == (
+		"Game has not started yet", None,
+	)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)
+		report, table = Bot.press_button(  # type: ignore[misc]
+			button("start"), owner,
+		)
+		assert report.startswith("Match started\n")
+		assert table is game
+		assert Bot.press_button(button("start"), owner) == (
+			"The round has already started", None,
+		)
+		assert Bot.press_button(button("hit"), guest) == (
+			"It is not your turn <@2222>", None,
+		)
+		report, table = Bot.press_button(  # type: ignore[misc]
+			button("hit"), owner,
+		)
+		assert report.startswith("<@1111> you were dealt an 8")
+		assert table is game
+		report, _ = Bot.press_button(  # type: ignore[misc]
+			button("stay"), owner,
+		)
+		assert report == "<@1111> you stayed.\n<@2222>, it is not your turn.\n"
+		assert game.is_turn(game.players[1])
+	Bot.remove_game(game)
+	assert Bot.press_button(button("stay"), guest) == (
+		"This game of blackjack is over.", None,
+	)
+
+
+def test_blackjack_join_and_start_only_between_rounds() -> None:
+	Bot.BlackjackGames = []
+	owner = MockMember(MockUser(user_id=1111))
+	guest = MockMember(MockUser(user_id=2222))
+	late = MockMember(MockUser(user_id=3333))
+	game = bucks.BlackjackGame(owner, multiplayer=True)
+	Bot.add_game(game, MockChannel())
+	assert Bot.blackjack_join(game, guest) == (
+		"<@2222> joined <@1111>'s blackjack game.", game,
+	)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr("random.randint", lambda x, _: x)
+		report, table = Bot.blackjack_start(game, game.players[0])
+	assert report.startswith("Match started\n")
+	assert table is game
+	assert Bot.blackjack_start(game, game.players[0]) == (
+		"The round has already started", None,
+	)
+	assert Bot.blackjack_join(game, late) == (
+		"Cannot join <@1111>'s blackjack game mid-round."
+		" Please wait for the round to end.",
+		None,
+	)
+	assert len(game.players) == 2
+	Bot.remove_game(game)
+
+	solo = bucks.BlackjackGame(owner, multiplayer=False)
+	Bot.add_game(solo, MockChannel())
+	assert Bot.blackjack_start(solo, solo.players[0]) == (
+		"The round has already started", None,
+	)
+	Bot.remove_game(solo)
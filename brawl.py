@@ -1,18 +1,100 @@
 """Beardless Bot Brawlhalla methods."""
 
+import asyncio
 import json
+import logging
 import random
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from time import monotonic, time
+from typing import Any, Final, Self
 
 import aiofiles
 import httpx
+import numpy as np
+import numpy.typing as npt
 from bs4 import BeautifulSoup
-from nextcord import Colour, Embed, Member, User
+from nextcord import Colour, Embed, Guild, Member, User
 from steam import steamid
 
-from misc import BbColor, Ok, TimeZone, bb_embed, fetch_avatar
+from misc import (
+	BbColor,
+	HttpDiskCache,
+	MaxEmbedFields,
+	Ok,
+	RateLimiter,
+	ShutdownHooks,
+	SingleFlight,
+	TimeZone,
+	TtlCache,
+	bb_embed,
+	fetch_avatar,
+	http_client,
+)
+
+logger = logging.getLogger(__name__)
+
+# Legend and weapon icons scraped from the Brawlhalla site. The scrape is
+# cached on disk, and only redone once the cache is BrawlDataTTL seconds old.
+BrawlSiteRoot = "https://www.brawlhalla.com/"
+BrawlDataUrl = BrawlSiteRoot + "legends"
+BrawlDataCache = Path("resources/brawlData.json")
+BrawlDataTTL: Final[int] = 86400
+
+# Every Brawlhalla API request goes through one pooled client for this root.
+BrawlApiRoot = "https://api.brawlhalla.com/"
+
+# Rank, stats, legend, and clan responses are parsed into response models as
+# they arrive, and only the models are cached; other routes stay raw JSON.
+type ApiJson = dict[str, Any] | list[dict[str, Any]]
+type ApiModel = Ranked | PlayerStats | Legend | Clan
+type ApiResponse = ApiJson | ApiModel
+
+# Brawlhalla API responses are cached by route and id, for as long as the data
+# behind each route tends to stay the same. ApiCache.hits and ApiCache.misses
+# count how often the cache saves a request.
+RankedTTL: Final[int] = 60
+StatsTTL: Final[int] = 300
+ClanTTL: Final[int] = 600
+LegendTTL: Final[int] = 86400
+
+# Rank and stats responses are served stale for a while after their TTL runs
+# out, so users get an answer at once while a fresh copy is fetched in the
+# background. They only expire outright after the TTL plus this window.
+RankedStale: Final[int] = 900
+StatsStale: Final[int] = 3600
+Refreshes: set[asyncio.Task[Any]] = set()
+
+# Each guild's leaderboard maps the Brawlhalla ids of its claimed members to
+# when their ranked data was fetched and their best 1v1 and 2v2 Elo. Only the
+# entries older than BoardTTL are refetched, BoardConcurrency at a time.
+BoardTTL: Final[int] = 900
+BoardConcurrency: Final[int] = 8
+BoardSize: Final[int] = 10
+# Board commands answer after at most BoardDeadline seconds, showing cached
+# ratings for anyone whose fetch is still running.
+BoardDeadline: Final[int] = 10
+Boards: dict[int, dict[int, tuple[float, int, int]]] = {}
+ApiCache: TtlCache[tuple[str, str], ApiResponse] = TtlCache(512)
+
+# The clan id of each player whose stats have been fetched, so that !brawlclan
+# can usually go straight to the clan route. A player who has since left the
+# clan is caught by checking the clan's roster.
+ClanIdTTL: Final[int] = 86400
+ClanIds: TtlCache[int, int] = TtlCache(4096)
+
+# Every uncached Brawlhalla API request waits its turn in ApiLimiter, which
+# follows the API's published quotas of 180 requests per 15 minutes and 10
+# requests per second. Bursts queue up instead of tripping the hard limit.
+ApiLimiter = RateLimiter(((180, 900), (10, 1)))
+TooManyRequests: Final[int] = 429
+
+# Identical requests made while one is already in flight share its response.
+# ApiFlights.coalesced counts the requests this saves. A flight still waiting
+# in ApiLimiter is promoted to the priority of its most urgent caller.
+ApiFlights: SingleFlight[tuple[str, str], ApiResponse] = SingleFlight()
 
 BadClaim = (
 	"Please do !brawlclaim followed by the URL of your steam profile."
@@ -35,6 +117,16 @@ RequestLimit = (
 
 UnclaimedMsg = "{} needs to claim their profile first! " + BadClaim
 
+StillFetchingMsg = (
+	"I'm still fetching ratings for this server."
+	" Please try again in a moment."
+)
+
+NoSiteData = (
+	"I couldn't load weapon data from brawlhalla.com."
+	" Please try again later."
+)
+
 ThumbBase = (
 	"https://static.wikia.nocookie.net/brawlhalla_gamepedia/images/"
 	"{}/Banner_Rank_{}.png/revision/latest/scale-to-width-down/{}"
@@ -71,10 +163,25 @@ Regions = (
 )
 
 
-def get_brawl_data() -> dict[
+IntArray = npt.NDArray[np.int64]
+
+# Glory is estimated with the formulas used by BrawlDB's gerard3, see:
+# https://github.com/BrawlDB/gerard3/blob/master/src/utils/glory.js
+# Glory from a player's best rating is piecewise linear between these points,
+# then rises by half a point per Elo past the last one. Glory from wins is
+# linear up to GloryWinsCutoff wins, then grows logarithmically.
+GloryMinGames: Final[int] = 10
+GloryWinsCutoff: Final[int] = 150
+GloryRatings = np.array([1200, 1286, 1390, 1680, 2000, 2300, 2700])
+GloryFromRating = np.array([250, 1000, 1870, 3000, 4370, 4800, 5000])
+EloResetFloor: Final[int] = 1400
+
+type BrawlData = dict[
 	str, dict[str, list[dict[str, str | dict[str, str | dict[str, str]]]]],
-]:
-	r = httpx.get("https://www.brawlhalla.com/legends", timeout=10)
+]
+
+
+def parse_brawl_data(r: httpx.Response) -> BrawlData:
 	soup = BeautifulSoup(r.content.decode("utf-8"), "html.parser")
 	brawl_dict = json.loads(
 		json.loads(soup.find_all("script")[3].contents[0])["body"],
@@ -83,15 +190,538 @@ def get_brawl_data() -> dict[
 	return brawl_dict
 
 
-Data = get_brawl_data()
+async def get_brawl_data() -> BrawlData:
+	# BrawlDataCache is the only copy kept on disk; see refresh_brawl_data.
+	r = await http_client(BrawlSiteRoot).get(BrawlDataUrl)
+	if r.status_code != Ok:
+		msg = "Failed to fetch Brawlhalla site data"
+		raise httpx.RequestError(msg)
+	return parse_brawl_data(r)
+
+
+def load_brawl_data(path: Path = BrawlDataCache) -> tuple[BrawlData, float]:
+	"""
+	Read the Brawlhalla site data cached on disk, without touching the network.
+
+	Args:
+		path (Path): The cache file (default is BrawlDataCache)
+
+	Returns:
+		tuple[BrawlData, float]: The cached data and the Unix time it was
+		fetched at; if there is no readable cache, empty data fetched at 0.
+
+	"""
+	try:
+		with path.open("r", encoding="UTF-8") as f:
+			cache = json.load(f)
+		data, fetched = cache["data"], cache["fetched"]
+	except (OSError, ValueError, KeyError, TypeError):
+		return {}, 0.0
+	assert isinstance(data, dict)
+	assert isinstance(fetched, int | float)
+	return data, float(fetched)
+
+
+async def refresh_brawl_data(*, force: bool = False) -> bool:
+	"""
+	Re-scrape the Brawlhalla site data if the cached copy is missing or old.
+
+	On success, Data is replaced and the cache file is rewritten atomically,
+	so a crash mid-write never leaves a corrupt cache behind. On failure,
+	whatever data was already loaded stays in use. If the cache file can't
+	be written, the new data is still used, just not persisted.
+
+	Args:
+		force (bool): Whether to scrape even if the cache is still fresh
+			(default is False)
+
+	Returns:
+		bool: Whether the data was refreshed.
+
+	"""
+	global Data, DataFetched
+	if not force and Data and time() - DataFetched < BrawlDataTTL:
+		return False
+	try:
+		data = await get_brawl_data()
+	except (httpx.HTTPError, ValueError, LookupError, AssertionError):
+		logger.warning("Failed to refresh Brawlhalla site data!")
+		return False
+	Data, DataFetched = data, time()
+	temp = BrawlDataCache.with_suffix(".tmp")
+	try:
+		async with aiofiles.open(temp, "w", encoding="UTF-8") as f:
+			await f.write(json.dumps({"fetched": DataFetched, "data": Data}))
+		temp.replace(BrawlDataCache)
+	except OSError:
+		logger.exception("Failed to cache Brawlhalla site data!")
+	return True
+
+
+Data, DataFetched = load_brawl_data()
+
+
+def brawl_win_rate(wins: int, games: int) -> float:
+	if games == 0:
+		return 0.0
+	return round(wins / games * 100, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class RankedTeam:
+	"""
+	One of a player's 2v2 teams, from a player/{id}/ranked response.
+
+	Attributes:
+		teamname (str): The team's players' names, joined by a plus sign
+		tier (str): The team's ranked tier
+		rating (int): The team's Elo
+		peak_rating (int): The team's best Elo this season
+		wins (int): The team's ranked wins this season
+		games (int): The team's ranked games this season
+		win_rate (float): The team's win percentage, computed once
+
+	"""
+
+	teamname: str = ""
+	tier: str = ""
+	rating: int = 0
+	peak_rating: int = 0
+	wins: int = 0
+	games: int = 0
+	win_rate: float = field(init=False)
+
+	def __post_init__(self) -> None:
+		"""Compute the win rate once, at parse time."""
+		object.__setattr__(
+			self, "win_rate", brawl_win_rate(self.wins, self.games),
+		)
 
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse one entry of a ranked response's 2v2 list.
+
+		Args:
+			j (dict[str, Any]): The entry
+
+		Returns:
+			RankedTeam: The team.
+
+		"""
+		return cls(
+			j.get("teamname", ""),
+			j.get("tier", ""),
+			j.get("rating", 0),
+			j.get("peak_rating", 0),
+			j.get("wins", 0),
+			j.get("games", 0),
+		)
 
-def brawl_win_rate(j: dict[str, str | int]) -> float:
-	assert isinstance(j["wins"], int)
-	assert isinstance(j["games"], int)
-	if j["games"] == 0:
-		return 0.0
-	return round(j["wins"] / j["games"] * 100, 1)
+
+@dataclass(frozen=True, slots=True)
+class Ranked:
+	"""
+	A player/{id}/ranked response, keeping only what the bot shows.
+
+	A player who has never played ranked comes back as an empty response,
+	which parses to a Ranked with no games and no teams.
+
+	Attributes:
+		name (str): The player's name
+		region (str): The player's ranked region
+		tier (str): The player's 1v1 ranked tier
+		rating (int): The player's 1v1 Elo
+		peak_rating (int): The player's best 1v1 Elo this season
+		wins (int): The player's 1v1 ranked wins this season
+		games (int): The player's 1v1 ranked games this season
+		legends (tuple[tuple[str, int], ...]): Each legend's name key and
+			1v1 Elo
+		teams (tuple[RankedTeam, ...]): The player's 2v2 teams
+		win_rate (float): The player's 1v1 win percentage, computed once
+		top_legend (tuple[str, int] | None): The name key and Elo of the
+			player's highest-rated legend, computed once
+		peak_team (RankedTeam | None): The player's highest-rated 2v2 team,
+			computed once
+
+	"""
+
+	name: str = ""
+	region: str = ""
+	tier: str = ""
+	rating: int = 0
+	peak_rating: int = 0
+	wins: int = 0
+	games: int = 0
+	legends: tuple[tuple[str, int], ...] = ()
+	teams: tuple[RankedTeam, ...] = ()
+	win_rate: float = field(init=False)
+	top_legend: tuple[str, int] | None = field(init=False)
+	peak_team: RankedTeam | None = field(init=False)
+
+	def __post_init__(self) -> None:
+		"""Compute the derived values once, at parse time."""
+		object.__setattr__(
+			self, "win_rate", brawl_win_rate(self.wins, self.games),
+		)
+		object.__setattr__(self, "top_legend", get_top_legend(self.legends))
+		object.__setattr__(self, "peak_team", max(
+			self.teams, key=lambda team: team.rating, default=None,
+		))
+
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse a player/{id}/ranked response.
+
+		Args:
+			j (dict[str, Any]): The response
+
+		Returns:
+			Ranked: The player's ranked data.
+
+		"""
+		return cls(
+			j.get("name", ""),
+			j.get("region", ""),
+			j.get("tier", ""),
+			j.get("rating", 0),
+			j.get("peak_rating", 0),
+			j.get("wins", 0),
+			j.get("games", 0),
+			tuple(
+				(legend["legend_name_key"], legend["rating"])
+				for legend in j.get("legends", [])
+			),
+			tuple(RankedTeam.parse(team) for team in j.get("2v2", [])),
+		)
+
+
+class LegendStatsView:
+	"""
+	A player's per-legend stats, parsed once into columns.
+
+	Every derived stat is computed once, when the view is built, so the
+	summary and any single legend's stats are read straight off the columns.
+	Stats that cannot be computed, such as the win rate of a legend with no
+	games, are None.
+
+	Attributes:
+		names (tuple[str, ...]): Each legend's title-cased name
+		index (dict[str, int]): Each legend's row, by name key
+		xp (tuple[int, ...]): Each legend's xp
+		games (tuple[int, ...]): Each legend's games played
+		wins (tuple[int, ...]): Each legend's games won
+		kos (tuple[int, ...]): Each legend's knockouts
+		falls (tuple[int, ...]): Each legend's falls
+		damage (tuple[int, ...]): Each legend's damage dealt
+		matchtime (tuple[int, ...]): Each legend's seconds played
+		winrate (tuple[float | None, ...]): Each legend's win percentage
+		dps (tuple[float | None, ...]): Each legend's average damage per
+			second
+		ttk (tuple[float | None, ...]): Each legend's average seconds per
+			knockout
+
+	Methods:
+		summary():
+			Returns the most played legend and the legends with the highest
+			win rate, highest DPS, and lowest TTK.
+		row(name):
+			Returns the row of a legend, or None.
+
+	"""
+
+	__slots__ = (
+		"damage",
+		"dps",
+		"falls",
+		"games",
+		"index",
+		"kos",
+		"matchtime",
+		"names",
+		"ttk",
+		"winrate",
+		"wins",
+		"xp",
+	)
+
+	def __init__(self, legends: list[dict[str, str | int]]) -> None:
+		"""
+		Create a new LegendStatsView instance.
+
+		Args:
+			legends (list[dict[str, str | int]]): The legends list from a
+				player/{id}/stats response
+
+		"""
+		self.names = tuple(
+			str(legend["legend_name_key"]).title() for legend in legends
+		)
+		self.index = {
+			str(legend["legend_name_key"]): i
+			for i, legend in enumerate(legends)
+		}
+
+		def column(key: str) -> tuple[int, ...]:
+			return tuple(int(legend.get(key, 0)) for legend in legends)
+
+		self.xp = column("xp")
+		self.games = column("games")
+		self.wins = column("wins")
+		self.kos = column("kos")
+		self.falls = column("falls")
+		self.damage = column("damagedealt")
+		self.matchtime = column("matchtime")
+		self.winrate = tuple(
+			round(wins / games * 100, 1) if games else None
+			for wins, games in zip(self.wins, self.games, strict=True)
+		)
+		self.dps = tuple(
+			round(damage / matchtime, 1) if matchtime else None
+			for damage, matchtime in zip(
+				self.damage, self.matchtime, strict=True,
+			)
+		)
+		self.ttk = tuple(
+			round(matchtime / kos, 1) if matchtime and kos else None
+			for matchtime, kos in zip(self.matchtime, self.kos, strict=True)
+		)
+
+	def summary(self) -> tuple[tuple[str, float | int] | None, ...]:
+		"""
+		Find the player's standout legends.
+
+		Ties go to whichever legend comes first.
+
+		Returns:
+			tuple[tuple[str, float | int] | None, ...]: The name and stat of
+			the most played legend, and of the legends with the highest win
+			rate, highest DPS, and lowest TTK; each None if no legend has
+			that stat.
+
+		"""
+
+		def best(
+			col: Sequence[float | None], *, lowest: bool = False,
+		) -> tuple[str, float | int] | None:
+			rows = [(stat, i) for i, stat in enumerate(col) if stat is not None]
+			if not rows:
+				return None
+			stat, i = (min if lowest else max)(rows, key=lambda row: row[0])
+			return self.names[i], stat
+
+		return (
+			best(tuple(xp or None for xp in self.xp)),
+			best(self.winrate),
+			best(self.dps),
+			best(self.ttk, lowest=True),
+		)
+
+	def row(self, name: str) -> int | None:
+		"""
+		Find the row of a legend.
+
+		Args:
+			name (str): The legend's name key
+
+		Returns:
+			int | None: The legend's row, or None if it has no stats.
+
+		"""
+		return self.index.get(name)
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerStats:
+	"""
+	A player/{id}/stats response, keeping only what the bot shows.
+
+	A player with no stats comes back as an empty response, which parses to
+	a PlayerStats with no name.
+
+	Attributes:
+		name (str): The player's name
+		wins (int): The player's wins across every mode
+		games (int): The player's games across every mode
+		clan_id (int | None): The id of the player's clan, if any
+		clan_name (str): The name of the player's clan, if any
+		legends (LegendStatsView): The player's per-legend stats
+		win_rate (float): The player's win percentage, computed once
+
+	"""
+
+	name: str = ""
+	wins: int = 0
+	games: int = 0
+	clan_id: int | None = None
+	clan_name: str = ""
+	legends: LegendStatsView = field(
+		default_factory=lambda: LegendStatsView([]),
+	)
+	win_rate: float = field(init=False)
+
+	def __post_init__(self) -> None:
+		"""Compute the win rate once, at parse time."""
+		object.__setattr__(
+			self, "win_rate", brawl_win_rate(self.wins, self.games),
+		)
+
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse a player/{id}/stats response.
+
+		Args:
+			j (dict[str, Any]): The response
+
+		Returns:
+			PlayerStats: The player's stats.
+
+		"""
+		clan = j.get("clan", {})
+		return cls(
+			j.get("name", ""),
+			j.get("wins", 0),
+			j.get("games", 0),
+			clan.get("clan_id"),
+			clan.get("clan_name", ""),
+			LegendStatsView(j.get("legends", [])),
+		)
+
+
+@dataclass(frozen=True, slots=True)
+class Legend:
+	"""
+	A legend/{id} response, keeping only what the bot shows.
+
+	Attributes:
+		name_key (str): The legend's name key
+		bio_name (str): The legend's name
+		bio_aka (str): The legend's epithet
+		bio_text (str): The legend's backstory
+		quotes (tuple[tuple[str, str], ...]): The legend's two quotes, each
+			with its attribution
+		weapons (tuple[str, str]): The legend's two weapons
+		stats (tuple[str, str, str, str]): The legend's strength, dexterity,
+			defense, and speed
+
+	"""
+
+	name_key: str
+	bio_name: str
+	bio_aka: str
+	bio_text: str
+	quotes: tuple[tuple[str, str], ...]
+	weapons: tuple[str, str]
+	stats: tuple[str, str, str, str]
+
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse a legend/{id} response.
+
+		Args:
+			j (dict[str, Any]): The response
+
+		Returns:
+			Legend: The legend.
+
+		"""
+		return cls(
+			j["legend_name_key"],
+			j["bio_name"],
+			j["bio_aka"],
+			j["bio_text"],
+			(
+				(j["bio_quote"], j["bio_quote_about_attrib"]),
+				(j["bio_quote_from"], j["bio_quote_from_attrib"]),
+			),
+			(j["weapon_one"], j["weapon_two"]),
+			(j["strength"], j["dexterity"], j["defense"], j["speed"]),
+		)
+
+
+@dataclass(frozen=True, slots=True)
+class ClanMember:
+	"""
+	One member of a clan, from a clan/{id} response.
+
+	Attributes:
+		brawl_id (int | None): The member's Brawlhalla id
+		name (str): The member's name
+		rank (str): The member's rank in the clan
+		xp (int): The xp the member has earned for the clan
+		join_date (int): When the member joined, in Unix time
+
+	"""
+
+	brawl_id: int | None = None
+	name: str = ""
+	rank: str = ""
+	xp: int = 0
+	join_date: int = 0
+
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse one entry of a clan response's member list.
+
+		Args:
+			j (dict[str, Any]): The entry
+
+		Returns:
+			ClanMember: The member.
+
+		"""
+		return cls(
+			j.get("brawlhalla_id"),
+			j.get("name", ""),
+			j.get("rank", ""),
+			j.get("xp", 0),
+			j.get("join_date", 0),
+		)
+
+
+@dataclass(frozen=True, slots=True)
+class Clan:
+	"""
+	A clan/{id} response, keeping only what the bot shows.
+
+	Attributes:
+		clan_id (int): The clan's id
+		name (str): The clan's name
+		create_date (int): When the clan was created, in Unix time
+		lifetime_xp (int): The xp the clan has earned
+		members (tuple[ClanMember, ...]): The clan's members
+
+	"""
+
+	clan_id: int = 0
+	name: str = ""
+	create_date: int = 0
+	lifetime_xp: int = 0
+	members: tuple[ClanMember, ...] = ()
+
+	@classmethod
+	def parse(cls, j: dict[str, Any]) -> Self:
+		"""
+		Parse a clan/{id} response.
+
+		Args:
+			j (dict[str, Any]): The response
+
+		Returns:
+			Clan: The clan.
+
+		"""
+		return cls(
+			j.get("clan_id", 0),
+			j.get("clan_name", ""),
+			j.get("clan_create_date", 0),
+			j.get("clan_lifetime_xp", 0),
+			tuple(ClanMember.parse(member) for member in j.get("clan", [])),
+		)
 
 
 def ping_msg(target: str, h: int, m: int, s: int) -> str:
@@ -107,9 +737,8 @@ def ping_msg(target: str, h: int, m: int, s: int) -> str:
 
 async def random_brawl(ran_type: str, brawl_key: str | None = None) -> Embed:
 	if ran_type == "legend":
-		legends = tuple(
-			legend["legend_name_key"].title() for legend in fetch_legends()
-		)
+		Legends.ensure_loaded()
+		legends = Legends.names
 		if brawl_key:
 			emb = await legend_info(brawl_key, random.choice(legends).lower())
 			assert isinstance(emb, Embed)
@@ -118,8 +747,11 @@ async def random_brawl(ran_type: str, brawl_key: str | None = None) -> Embed:
 			"Random Legend", f"Your legend is {random.choice(legends)}.",
 		)
 	if ran_type == "weapon":
-		weapon = random.choice([i["name"] for i in Data["weapons"]["nodes"]])
-		assert isinstance(weapon, str)
+		if not Data:
+			await refresh_brawl_data()
+		if not (weapons := brawl_icons()[2]):
+			return bb_embed("Brawlhalla Randomizer", NoSiteData)
+		weapon = random.choice(weapons)
 		return bb_embed(
 			"Random Weapon", f"Your weapon is {weapon}.",
 		).set_thumbnail(get_weapon_picture(weapon))
@@ -128,41 +760,624 @@ async def random_brawl(ran_type: str, brawl_key: str | None = None) -> Embed:
 	)
 
 
+class ClaimStore:
+	"""
+	Claimed Brawlhalla profiles, read from disk once and kept in memory.
+
+	Claims are indexed both ways: by Discord id, and by Brawlhalla id, since
+	several Discord users may claim the same profile. Lookups never touch
+	the disk. New claims are written out by a background task SaveDelay
+	seconds after the first of them, so a burst of claims costs one write,
+	and the command making a claim never waits on the disk. Writes go
+	through a temp file, so a crash mid-write never leaves a corrupt file
+	behind. Claims still waiting to be written are flushed on shutdown.
+
+	Attributes:
+		SaveDelay (float): How long after a claim to write the file, in
+			seconds
+		path (Path): The JSON file mapping Discord ids to Brawlhalla ids
+		claims (dict[int, int] | None): Each Discord id's Brawlhalla id, or
+			None until the file is first read
+		owners (dict[int, set[int]]): The Discord ids that have claimed
+			each Brawlhalla id
+		changes (int): How many claims have been made
+		saved (int): How many of those claims the file holds
+		saving (asyncio.Task[None] | None): The task that will write the
+			rest
+
+	Methods:
+		get(user_id):
+			Returns the Brawlhalla id claimed by user_id, or None.
+		owners_of(brawl_id):
+			Returns the Discord ids that have claimed brawl_id.
+		claim(user_id, brawl_id):
+			Records the claim, and schedules a write to persist it.
+		save_later():
+			Writes the file after SaveDelay, until it holds every claim.
+		snapshot():
+			Serializes the claims for write.
+		write(changes, text):
+			Writes a snapshot to the file.
+		save():
+			Writes every claim to the file now, off the event loop.
+		flush():
+			Writes any claims not yet written, without waiting.
+		reload():
+			Drops the in-memory claims, so the next use rereads the file.
+
+	"""
+
+	SaveDelay: Final[float] = 1.0
+
+	def __init__(self, path: Path) -> None:
+		"""
+		Create a new ClaimStore instance, without reading the file yet.
+
+		Args:
+			path (Path): The JSON file mapping Discord ids to Brawlhalla ids
+
+		"""
+		self.path = path
+		self.claims: dict[int, int] | None = None
+		self.owners: dict[int, set[int]] = {}
+		self.changes = 0
+		self.saved = 0
+		self.saving: asyncio.Task[None] | None = None
+
+	def load(self) -> dict[int, int]:
+		"""
+		Get the in-memory claims, reading the file if it has not been yet.
+
+		Returns:
+			dict[int, int]: Each Discord id's Brawlhalla id.
+
+		"""
+		if self.claims is None:
+			with self.path.open("r", encoding="UTF-8") as f:
+				profs = json.load(f)
+			assert isinstance(profs, dict)
+			self.claims = {int(key): value for key, value in profs.items()}
+			self.owners = {}
+			for user_id, brawl_id in self.claims.items():
+				self.owners.setdefault(brawl_id, set()).add(user_id)
+		return self.claims
+
+	def get(self, user_id: int) -> int | None:
+		"""
+		Look up the Brawlhalla id a Discord user has claimed.
+
+		Args:
+			user_id (int): The Discord user's id
+
+		Returns:
+			int | None: The claimed Brawlhalla id, or None if there is none.
+
+		"""
+		return self.load().get(user_id)
+
+	def owners_of(self, brawl_id: int) -> frozenset[int]:
+		"""
+		Look up the Discord users who have claimed a Brawlhalla id.
+
+		Args:
+			brawl_id (int): The Brawlhalla id
+
+		Returns:
+			frozenset[int]: The claimants' Discord ids.
+
+		"""
+		self.load()
+		return frozenset(self.owners.get(brawl_id, ()))
+
+	def claim(self, user_id: int, brawl_id: int) -> None:
+		"""
+		Record a claim, replacing any earlier one, and schedule a write.
+
+		Outside an event loop, there is nothing to run the write later, so
+		the file is written before returning instead.
+
+		Args:
+			user_id (int): The claiming Discord user's id
+			brawl_id (int): The claimed Brawlhalla id
+
+		"""
+		claims = self.load()
+		if (old := claims.get(user_id)) is not None:
+			self.owners[old].discard(user_id)
+			if not self.owners[old]:
+				del self.owners[old]
+		claims[user_id] = brawl_id
+		self.owners.setdefault(brawl_id, set()).add(user_id)
+		self.changes += 1
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			self.write(*self.snapshot())
+			return
+		if self.saving is None or self.saving.done():
+			self.saving = loop.create_task(self.save_later())
+
+	async def save_later(self) -> None:
+		"""Write the file SaveDelay seconds from now, until it is current."""
+		while self.saved < self.changes:
+			await asyncio.sleep(self.SaveDelay)
+			await self.save()
+
+	def snapshot(self) -> tuple[int, str]:
+		"""Serialize the claims, along with how many claims they include."""
+		profs = {str(key): value for key, value in self.load().items()}
+		return self.changes, json.dumps(profs, indent=4)
+
+	def write(self, changes: int, text: str) -> None:
+		"""Write a snapshot of the claims to the file, through a temp file."""
+		temp = self.path.with_suffix(".tmp")
+		with temp.open("w", encoding="UTF-8") as f:
+			f.write(text)
+		temp.replace(self.path)
+		self.saved = max(self.saved, changes)
+
+	async def save(self) -> None:
+		"""Write every claim to the file, from a worker thread."""
+		try:
+			await asyncio.to_thread(self.write, *self.snapshot())
+		except OSError:
+			logger.exception("Failed to save claimed Brawlhalla profiles!")
+
+	async def flush(self) -> None:
+		"""Write any claims not yet written, without waiting for SaveDelay."""
+		if self.saving is not None:
+			self.saving.cancel()
+			self.saving = None
+		if self.saved < self.changes:
+			await self.save()
+
+	def reload(self) -> None:
+		"""Drop the in-memory claims, so that the file is reread."""
+		self.claims = None
+		self.owners = {}
+
+
+Claims = ClaimStore(Path("resources/claimedProfs.json"))
+
+
+async def flush_claims() -> None:
+	await Claims.flush()
+
+
+ShutdownHooks.append(flush_claims)
+
+
 def claim_profile(user_id: int, brawl_id: int) -> None:
-	with Path("resources/claimedProfs.json").open("r", encoding="UTF-8") as f:
-		profs = json.load(f)
-	profs[str(user_id)] = brawl_id
-	with Path("resources/claimedProfs.json").open("w", encoding="UTF-8") as g:
-		json.dump(profs, g, indent=4)
+	Claims.claim(user_id, brawl_id)
 
 
 def fetch_brawl_id(user_id: int) -> int | None:
-	with Path("resources/claimedProfs.json").open("r", encoding="UTF-8") as f:
-		for key, value in json.load(f).items():
-			if key == str(user_id):
-				assert isinstance(value, int)
-				return value
-	return None
+	return Claims.get(user_id)
+
+
+def whois(brawl_id: int) -> Embed:
+	if not (owners := Claims.owners_of(brawl_id)):
+		return bb_embed(
+			"Beardless Bot Brawlhalla Whois",
+			f"Nobody has claimed Brawl ID {brawl_id}.",
+		)
+	return bb_embed(
+		"Beardless Bot Brawlhalla Whois",
+		f"Brawl ID {brawl_id} is claimed by "
+		+ ", ".join(f"<@{user_id}>" for user_id in sorted(owners))
+		+ ".",
+	)
+
+
+def trigrams(text: str) -> set[str]:
+	padded = f"  {text} "
+	return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LegendCatalog:
+	"""
+	The legends in resources/legends.json, read once and indexed.
+
+	Legends are indexed by id and by name key. Names are also indexed by
+	their trigrams, so that a misspelt name like "bodvr" still finds its
+	legend.
+
+	Attributes:
+		MinSimilarity (float): The lowest Dice coefficient between the
+			trigrams of a query and a name for the name to match
+		path (Path): The JSON file listing every legend
+		legends (list[dict[str, str]]): Every legend, in file order
+		by_id (dict[int, dict[str, str]]): Each legend, by legend id
+		by_key (dict[str, dict[str, str]]): Each legend, by name key
+		names (tuple[str, ...]): Every legend's name key, title-cased
+		index (dict[str, set[str]]): The name keys containing each trigram
+		sizes (dict[str, int]): How many trigrams each name key has
+		loaded (bool): Whether the file has been read
+
+	Methods:
+		find(name):
+			Returns the legend best matching name, or None.
+		closest(name):
+			Returns the legend whose name key is most similar to name, if
+			it is similar enough, or None.
+		load(legends):
+			Indexes a new list of legends.
+		reload():
+			Drops the indexes, so the next use rereads the file.
+
+	"""
+
+	MinSimilarity: Final[float] = 0.5
+
+	def __init__(self, path: Path) -> None:
+		"""
+		Create a new LegendCatalog instance, without reading the file yet.
+
+		Args:
+			path (Path): The JSON file listing every legend
+
+		"""
+		self.path = path
+		self.reload()
+
+	def reload(self) -> None:
+		"""Drop the indexes, so that the file is reread on next use."""
+		self.legends: list[dict[str, str]] = []
+		self.by_id: dict[int, dict[str, str]] = {}
+		self.by_key: dict[str, dict[str, str]] = {}
+		self.names: tuple[str, ...] = ()
+		self.index: dict[str, set[str]] = {}
+		self.sizes: dict[str, int] = {}
+		self.loaded = False
+
+	def ensure_loaded(self) -> None:
+		"""Read and index the file, if that has not been done yet."""
+		if not self.loaded:
+			with self.path.open("r", encoding="UTF-8") as f:
+				legends = json.load(f)
+			assert isinstance(legends, list)
+			self.load(legends)
+
+	def load(self, legends: list[dict[str, str]]) -> None:
+		"""
+		Replace the catalog with a new list of legends.
+
+		Args:
+			legends (list[dict[str, str]]): Every legend, as returned by
+				the legend/all/ route
+
+		"""
+		self.legends = legends
+		self.by_id = {int(legend["legend_id"]): legend for legend in legends}
+		self.by_key = {legend["legend_name_key"]: legend for legend in legends}
+		self.names = tuple(key.title() for key in self.by_key)
+		self.index = {}
+		self.sizes = {}
+		for key in self.by_key:
+			grams = trigrams(key)
+			self.sizes[key] = len(grams)
+			for trigram in grams:
+				self.index.setdefault(trigram, set()).add(key)
+		self.loaded = True
+
+	def find(self, name: str) -> dict[str, str] | None:
+		"""
+		Find the legend best matching a name.
+
+		An exact name key wins; failing that, the first name key containing
+		name; failing that, the name key sharing the most trigrams with
+		name, if it is similar enough.
+
+		Args:
+			name (str): The lowercase name to look for
+
+		Returns:
+			dict[str, str] | None: The legend, or None if nothing matched.
+
+		"""
+		self.ensure_loaded()
+		if (legend := self.by_key.get(name)) is not None:
+			return legend
+		for key, legend in self.by_key.items():
+			if name in key:
+				return legend
+		return self.closest(name)
+
+	def closest(self, name: str) -> dict[str, str] | None:
+		"""
+		Find the legend whose name key shares the most trigrams with name.
+
+		Unlike find, a short query that happens to be part of a name key,
+		such as "a", matches nothing.
+
+		Args:
+			name (str): The lowercase name to look for
+
+		Returns:
+			dict[str, str] | None: The legend, or None if no name key is at
+			least MinSimilarity similar to name.
+
+		"""
+		self.ensure_loaded()
+		query = trigrams(name)
+		shared: dict[str, int] = {}
+		for trigram in query:
+			for key in self.index.get(trigram, ()):
+				shared[key] = shared.get(key, 0) + 1
+		best: str | None = None
+		similarity = self.MinSimilarity
+		for key, common in shared.items():
+			# Dice coefficient between the two names' trigram sets
+			score = 2 * common / (len(query) + self.sizes[key])
+			if score >= similarity:
+				best, similarity = key, score
+		return None if best is None else self.by_key[best]
+
+
+Legends = LegendCatalog(Path("resources/legends.json"))
 
 
 def fetch_legends() -> list[dict[str, str]]:
-	with Path("resources/legends.json").open("r", encoding="UTF-8") as f:
-		legends = json.load(f)
-	assert isinstance(legends, list)
-	return legends
-
-
-async def brawl_api_call(
-	route: str, arg: str | int, brawl_key: str, amp: str = "?",
-) -> dict[str, Any] | list[dict[str, str | int]]:
-	url = f"https://api.brawlhalla.com/{route}{arg}{amp}api_key={brawl_key}"
-	async with httpx.AsyncClient(timeout=10) as client:
-		r = await client.get(url)
-	if r.status_code != Ok:
-		raise httpx.RequestError("Request failed with " + str(r.status_code))
-	j = r.json()
-	assert isinstance(j, dict | list)
-	return j
+	Legends.ensure_loaded()
+	return Legends.legends
+
+
+def parse_quotas(spec: str) -> tuple[tuple[int, float], ...]:
+	"""
+	Parse a comma-separated list of quotas, such as "180/900,10/1".
+
+	Args:
+		spec (str): Each quota as limit/period, the period in seconds; if
+			blank, there are no quotas
+
+	Returns:
+		tuple[tuple[int, float], ...]: Each quota's limit and period.
+
+	Raises:
+		ValueError: If a quota is not a positive limit and period.
+
+	"""
+	quotas: list[tuple[int, float]] = []
+	for part in filter(None, spec.replace(" ", "").split(",")):
+		limit, _, period = part.partition("/")
+		msg = f"Quota must be a positive limit/period, not {part!r}"
+		try:
+			quota = int(limit), float(period)
+		except ValueError as e:
+			raise ValueError(msg) from e
+		if quota[0] <= 0 or quota[1] <= 0:
+			raise ValueError(msg)
+		quotas.append(quota)
+	return tuple(quotas)
+
+
+def use_api(
+	root: str, quotas: Sequence[tuple[int, float]] | None = None,
+) -> None:
+	"""
+	Point brawl_api_call at another Brawlhalla API, such as brawlserver.py.
+
+	Responses cached from the old root are dropped.
+
+	Args:
+		root (str): The API's root URL
+		quotas (Sequence[tuple[int, float]] | None): The quotas ApiLimiter
+			should follow instead, or () for none; if None, they are left
+			alone (default is None)
+
+	"""
+	global BrawlApiRoot, ApiLimiter  # noqa: PLW0603
+	BrawlApiRoot = root if root.endswith("/") else root + "/"
+	if quotas is not None:
+		ApiLimiter = RateLimiter(quotas)
+	ApiCache.clear()
+	logger.info(
+		"Using the Brawlhalla API at %s, with quotas %s",
+		BrawlApiRoot,
+		ApiLimiter.quotas,
+	)
+
+
+async def api_request(  # noqa: PLR0913
+	route: str,
+	arg: str | int,
+	brawl_key: str,
+	amp: str = "?",
+	priority: int = RateLimiter.Interactive,
+	guild: int | None = None,
+	headers: dict[str, str] | None = None,
+) -> httpx.Response:
+	"""
+	Send one request to the Brawlhalla API, once ApiLimiter allows it.
+
+	Args:
+		route (str): The API route, up to the id
+		arg (str | int): The id, plus anything after it in the route
+		brawl_key (str): The Brawlhalla API key
+		amp (str): The separator before the API key (default is "?")
+		priority (int): The request's priority in ApiLimiter
+			(default is RateLimiter.Interactive)
+		guild (int | None): The id of the guild the request is for
+			(default is None)
+		headers (dict[str, str] | None): Extra request headers, such as
+			conditional ones (default is None)
+
+	Returns:
+		httpx.Response: The response, whatever its status.
+
+	Raises:
+		httpx.RequestError: If the request fails, or if too many requests
+			are already waiting in ApiLimiter.
+
+	"""
+	await ApiLimiter.acquire(priority, guild, (route, str(arg)))
+	r = await http_client(BrawlApiRoot).get(
+		f"{route}{arg}{amp}api_key={brawl_key}", headers=headers,
+	)
+	if r.status_code == TooManyRequests:
+		# The quota was spent elsewhere; stop sending until it refills.
+		ApiLimiter.drain()
+	return r
+
+
+async def brawl_api_call(  # noqa: PLR0913
+	route: str,
+	arg: str | int,
+	brawl_key: str,
+	amp: str = "?",
+	ttl: float = 0,
+	priority: int = RateLimiter.Interactive,
+	guild: int | None = None,
+	*,
+	refresh: bool = False,
+	parse: Callable[[dict[str, Any]], ApiModel] | None = None,
+) -> ApiResponse:
+	"""
+	Call the Brawlhalla API, answering from ApiCache where possible.
+
+	Requests the cache cannot answer wait their turn in ApiLimiter, unless
+	an identical request is already in flight, in which case they share its
+	response through ApiFlights; an interactive caller that joins a flight
+	queued at background priority promotes it. If parse is given, the
+	response is parsed into a response model once, as it arrives, and only
+	the model is cached.
+
+	Args:
+		route (str): The API route, up to the id
+		arg (str | int): The id, plus anything after it in the route
+		brawl_key (str): The Brawlhalla API key
+		amp (str): The separator before the API key (default is "?")
+		ttl (float): How long to cache the response, in seconds; if 0, the
+			cache is bypassed entirely (default is 0)
+		priority (int): The request's priority in ApiLimiter
+			(default is RateLimiter.Interactive)
+		guild (int | None): The id of the guild the request is for, so that
+			ApiLimiter can share the quota fairly (default is None)
+		refresh (bool): Whether to skip looking in ApiCache, though the
+			response is still cached (default is False)
+		parse (Callable[[dict[str, Any]], ApiModel] | None): The response
+			model's parse method, such as Ranked.parse; if None, the JSON
+			response is returned as is (default is None)
+
+	Returns:
+		ApiResponse: The JSON response, or the model parsed from it.
+
+	Raises:
+		httpx.RequestError: If the request fails, or if too many requests
+			are already waiting in ApiLimiter.
+
+	"""
+	key = route, str(arg)
+	if (
+		ttl > 0
+		and not refresh
+		and (cached := ApiCache.get(key, monotonic())) is not None
+	):
+		return cached
+
+	async def fetch() -> ApiResponse:
+		r = await api_request(route, arg, brawl_key, amp, priority, guild)
+		j = r.json() if r.status_code == Ok else None
+		if j is None:
+			raise httpx.RequestError(
+				"Request failed with " + str(r.status_code),
+			)
+		assert isinstance(j, dict | list)
+		if parse is not None:
+			assert isinstance(j, dict)
+			j = parse(j)
+		if ttl > 0:
+			ApiCache.put(key, j, ttl, monotonic())
+		return j
+
+	if key in ApiFlights.calls:
+		ApiLimiter.promote(key, priority)
+	return await ApiFlights.run(key, fetch)
+
+
+async def brawl_api_call_swr(  # noqa: PLR0913
+	route: str,
+	arg: str | int,
+	brawl_key: str,
+	ttl: float,
+	stale: float,
+	guild: int | None = None,
+	*,
+	parse: Callable[[dict[str, Any]], ApiModel] | None = None,
+) -> tuple[ApiResponse, float | None]:
+	"""
+	Call the Brawlhalla API, serving stale responses while revalidating.
+
+	A response younger than ttl is served as is. One older than ttl, but
+	younger than ttl + stale, is served at once, while a background task
+	fetches a fresh copy at RateLimiter.Background priority.
+
+	Args:
+		route (str): The API route, up to the id
+		arg (str | int): The id, plus anything after it in the route
+		brawl_key (str): The Brawlhalla API key
+		ttl (float): How long a response stays fresh, in seconds
+		stale (float): How much longer a response may be served stale, in
+			seconds
+		guild (int | None): The id of the guild the request is for
+			(default is None)
+		parse (Callable[[dict[str, Any]], ApiModel] | None): The response
+			model's parse method; if None, the JSON response is returned as
+			is (default is None)
+
+	Returns:
+		tuple[ApiResponse, float | None]: The response, and if it is
+		stale, the Unix time it was fetched.
+
+	"""
+	key = route, str(arg)
+	now = monotonic()
+	if (hit := ApiCache.lookup(key, now)) is None:
+		return await brawl_api_call(
+			route,
+			arg,
+			brawl_key,
+			ttl=ttl + stale,
+			guild=guild,
+			refresh=True,
+			parse=parse,
+		), None
+	j, stored = hit
+	if now - stored < ttl:
+		return j, None
+	if key not in ApiFlights.calls:
+		task = asyncio.create_task(brawl_api_call(
+			route,
+			arg,
+			brawl_key,
+			ttl=ttl + stale,
+			priority=RateLimiter.Background,
+			guild=guild,
+			refresh=True,
+			parse=parse,
+		))
+		Refreshes.add(task)
+		task.add_done_callback(finish_refresh)
+	return j, time() - (now - stored)
+
+
+def finish_refresh(task: asyncio.Task[Any]) -> None:
+	Refreshes.discard(task)
+	if not task.cancelled() and (e := task.exception()) is not None:
+		logger.warning("Background Brawlhalla API refresh failed: %s", e)
+
+
+def as_of(brawl_id: int, fetched: float | None) -> str:
+	footer = f"Brawl ID {brawl_id}"
+	if fetched is not None:
+		footer += datetime.fromtimestamp(fetched, TimeZone).strftime(
+			", as of %m/%d %H:%M",
+		)
+	return footer
+
+
+def guild_id(target: Member | User) -> int | None:
+	return target.guild.id if isinstance(target, Member) else None
 
 
 async def get_brawl_id(brawl_key: str, url: str) -> int | None:
@@ -181,132 +1396,185 @@ async def get_brawl_id(brawl_key: str, url: str) -> int | None:
 	return brawl_id
 
 
-async def pull_legends(brawl_key: str) -> None:
-	# run whenever a new legend is released
-	async with aiofiles.open(
-		"resources/legends.json", "w", encoding="UTF-8",
-	) as f:
-		j = await brawl_api_call("legend/", "all/", brawl_key)
-		assert isinstance(j, list)
+async def pull_legends(brawl_key: str) -> bool:
+	"""
+	Update the legend list, if it has changed since the last pull.
+
+	Run whenever a new legend is released. The request is conditional on
+	the copy in HttpDiskCache, so an unchanged list costs a 304.
+
+	Args:
+		brawl_key (str): The Brawlhalla API key
+
+	Returns:
+		bool: Whether the list had changed.
+
+	Raises:
+		httpx.RequestError: If the request fails.
+
+	"""
+	# The API key is left out of the key the response is stored under.
+	disk_key = f"{BrawlApiRoot}legend/all/"
+	r = await api_request(
+		"legend/", "all/", brawl_key, headers=HttpDiskCache.headers(disk_key),
+	)
+	resolved = HttpDiskCache.resolve(disk_key, r, lambda r: r.json())
+	if resolved is None:
+		raise httpx.RequestError("Request failed with " + str(r.status_code))
+	j, modified = resolved
+	assert isinstance(j, list)
+	if not modified:
+		return False
+	async with aiofiles.open(Legends.path, "w", encoding="UTF-8") as f:
 		await f.write(json.dumps(j, indent=4))
+	Legends.load(j)
+	return True
+
+
+type BrawlIcons = tuple[dict[str, str], dict[str, str], tuple[str, ...]]
+
+
+def index_brawl_data(data: BrawlData) -> BrawlIcons:
+	"""
+	Index the legend and weapon icons in the Brawlhalla site data.
+
+	Args:
+		data (BrawlData): The site data, as scraped by get_brawl_data
+
+	Returns:
+		BrawlIcons: Each legend's icon URL by slug, each weapon's icon URL
+		by name, and every weapon's name.
+
+	"""
+	legend_icons: dict[str, str] = {}
+	for legend in data.get("legends", {}).get("nodes", []):
+		assert isinstance(legend["slug"], str)
+		assert isinstance(legend["legendFields"], dict)
+		icon = legend["legendFields"]["icon"]
+		assert isinstance(icon, dict)
+		legend_icons[legend["slug"]] = icon["sourceUrl"]
+	weapon_icons: dict[str, str] = {}
+	for weapon in data.get("weapons", {}).get("nodes", []):
+		assert isinstance(weapon["name"], str)
+		assert isinstance(weapon["weaponFields"], dict)
+		icon = weapon["weaponFields"]["icon"]
+		assert isinstance(icon, dict)
+		weapon_icons[weapon["name"]] = icon["sourceUrl"]
+	return legend_icons, weapon_icons, tuple(weapon_icons)
+
+
+# The icon indexes for Data, rebuilt only once Data has been replaced.
+IconIndex: tuple[BrawlData, BrawlIcons] | None = None
+
+
+def brawl_icons() -> BrawlIcons:
+	global IconIndex  # noqa: PLW0603
+	if IconIndex is None or IconIndex[0] is not Data:
+		IconIndex = Data, index_brawl_data(Data)
+	return IconIndex[1]
 
 
-def get_legend_picture(legend_name: str) -> str:
+def get_legend_picture(legend_name: str) -> str | None:
 	if legend_name == "redraptor":
 		legend_name = "red-raptor"
-	legend = [i for i in Data["legends"]["nodes"] if i["slug"] == legend_name]
-	assert isinstance(legend[0]["legendFields"], dict)
-	icon = legend[0]["legendFields"]["icon"]
-	assert isinstance(icon, dict)
-	return icon["sourceUrl"]
+	return brawl_icons()[0].get(legend_name)
 
 
-def get_weapon_picture(weapon_name: str) -> str:
-	weapon = [i for i in Data["weapons"]["nodes"] if i["name"] == weapon_name]
-	assert isinstance(weapon[0]["weaponFields"], dict)
-	icon = weapon[0]["weaponFields"]["icon"]
-	assert isinstance(icon, dict)
-	return icon["sourceUrl"]
+def get_weapon_picture(weapon_name: str) -> str | None:
+	return brawl_icons()[1].get(weapon_name)
 
 
 async def legend_info(brawl_key: str, legend_name: str) -> Embed | None:
+	if not Data:
+		await refresh_brawl_data()
 	if legend_name == "hugin":
 		legend_name = "munin"
-	for legend in fetch_legends():
-		assert isinstance(legend["legend_name_key"], str)
-		if legend_name in legend["legend_name_key"]:
-			r = await brawl_api_call(
-				"legend/", str(legend["legend_id"]) + "/", brawl_key,
-			)
-			assert isinstance(r, dict)
-
-			def clean_quote(quote: str, attrib: str) -> str:
-				return "{}  *{}*".format(
-					quote, attrib.replace("\"", ""),
-				).replace("\\n", " ").replace("* ", "*").replace(" *", "*")
-
-			bio = "\n\n".join((
-				r["bio_text"].replace("\n", "\n\n"),
-				"**Quotes**",
-				clean_quote(r["bio_quote"], r["bio_quote_about_attrib"]),
-				clean_quote(r["bio_quote_from"], r["bio_quote_from_attrib"]),
-			))
-			emb = (
-				bb_embed(r["bio_name"] + ", " + r["bio_aka"], bio)
-				.add_field(
-					name="Weapons",
-					value=(r["weapon_one"] + ", " + r["weapon_two"])
-					.replace("Fist", "Gauntlet")
-					.replace("Pistol", "Blasters"),
-				)
-				.add_field(
-					name="Stats",
-					value=(
-						f"{r["strength"]} Str, {r["dexterity"]} Dex,"
-						f" {r["defense"]} Def, {r["speed"]} Spd"
-					),
-				)
-			)
-			return emb.set_thumbnail(
-				url=get_legend_picture(r["legend_name_key"].replace(" ", "-")),
-			)
-	return None
+	if (legend := Legends.find(legend_name)) is None:
+		return None
+	r = await brawl_api_call(
+		"legend/",
+		str(legend["legend_id"]) + "/",
+		brawl_key,
+		ttl=LegendTTL,
+		parse=Legend.parse,
+	)
+	assert isinstance(r, Legend)
+
+	def clean_quote(quote: str, attrib: str) -> str:
+		return "{}  *{}*".format(
+			quote, attrib.replace("\"", ""),
+		).replace("\\n", " ").replace("* ", "*").replace(" *", "*")
+
+	bio = "\n\n".join((
+		r.bio_text.replace("\n", "\n\n"),
+		"**Quotes**",
+		*(clean_quote(*quote) for quote in r.quotes),
+	))
+	emb = (
+		bb_embed(r.bio_name + ", " + r.bio_aka, bio)
+		.add_field(
+			name="Weapons",
+			value=", ".join(r.weapons)
+			.replace("Fist", "Gauntlet")
+			.replace("Pistol", "Blasters"),
+		)
+		.add_field(
+			name="Stats",
+			value="{} Str, {} Dex, {} Def, {} Spd".format(*r.stats),
+		)
+	)
+	return emb.set_thumbnail(
+		url=get_legend_picture(r.name_key.replace(" ", "-")),
+	)
 
 
 def get_top_legend(
-	legends: list[dict[str, str | int]],
+	legends: Iterable[tuple[str, int]],
 ) -> tuple[str, int] | None:
 	top_legend = None
 	for legend in legends:
-		assert isinstance(legend["rating"], int)
-		if not top_legend or top_legend[1] < legend["rating"]:
-			assert isinstance(legend["legend_name_key"], str)
-			top_legend = legend["legend_name_key"], legend["rating"]
+		if not top_legend or top_legend[1] < legend[1]:
+			top_legend = legend
 	return top_legend
 
 
-def get_ones_rank(emb: Embed, r: dict[str, Any]) -> Embed:
+def get_ones_rank(emb: Embed, r: Ranked) -> Embed:
 	emb_val = (
-		f"**{r["tier"]}** ({r["rating"]}/{r["peak_rating"]} Peak)\n{r["wins"]}"
-		f" W / {r["games"] - r["wins"]} L / {brawl_win_rate(r)}% winrate"
+		f"**{r.tier}** ({r.rating}/{r.peak_rating} Peak)\n{r.wins}"
+		f" W / {r.games - r.wins} L / {r.win_rate}% winrate"
 	)
-	if (top_legend := get_top_legend(r["legends"])) is not None:
+	if r.top_legend is not None:
 		emb_val += (
-			f"\nTop Legend: {top_legend[0].title()}, {top_legend[1]} Elo"
+			f"\nTop Legend: {r.top_legend[0].title()}, {r.top_legend[1]} Elo"
 		)
 	emb.add_field(name="Ranked 1s", value=emb_val)
 	for thumb in RankedThumbnails:  # pragma: no branch
-		if thumb[1] in r["tier"]:
+		if thumb[1] in r.tier:
 			emb.colour = Colour(RankColors[thumb[1]])
 			emb.set_thumbnail(ThumbBase.format(*thumb))
 			break
 	return emb
 
 
-def get_twos_rank(emb: Embed, r: dict[str, Any]) -> Embed:
-	peak_team = None
-	for team in r["2v2"]:
-		# Find highest-Elo 2s pairing
-		if not peak_team or peak_team["rating"] < team["rating"]:
-			peak_team = team
-	if peak_team:
+def get_twos_rank(emb: Embed, r: Ranked) -> Embed:
+	if (peak_team := r.peak_team) is not None:
 		emb.add_field(
 			name="Ranked 2s",
 			value=(
-				f"**{peak_team["teamname"]}\n"
-				f"{peak_team["tier"]}** ({peak_team["rating"]} /"
-				f" {peak_team["peak_rating"]} Peak)\n{peak_team["wins"]}"
-				f" W / {peak_team["games"] - peak_team["wins"]} L /"
-				f" {brawl_win_rate(peak_team)}% winrate"
+				f"**{peak_team.teamname}\n"
+				f"{peak_team.tier}** ({peak_team.rating} /"
+				f" {peak_team.peak_rating} Peak)\n{peak_team.wins}"
+				f" W / {peak_team.games - peak_team.wins} L /"
+				f" {peak_team.win_rate}% winrate"
 			),
 		)
 		if (
 			(emb.colour and emb.colour.value == BbColor)
-			or peak_team["rating"] > r["rating"]
+			or peak_team.rating > r.rating
 		):
 			# Higher 2s Elo than 1s Elo
 			for thumb in RankedThumbnails:  # pragma: no branch
-				if thumb[1] in peak_team["tier"]:
+				if thumb[1] in peak_team.tier:
 					emb.colour = Colour(RankColors[thumb[1]])
 					emb.set_thumbnail(ThumbBase.format(*thumb))
 					break
@@ -319,78 +1587,394 @@ async def get_rank(target: Member | User, brawl_key: str) -> Embed:
 			"Beardless Bot Brawlhalla Rank",
 			UnclaimedMsg.format(target.mention),
 		)
-	r = await brawl_api_call("player/", str(brawl_id) + "/ranked", brawl_key)
-	assert isinstance(r, dict)
-	if not r or (
-		("games" in r and r["games"] == 0)
-		and ("2v2" in r and len(r["2v2"]) == 0)
-	):
+	r, fetched = await brawl_api_call_swr(
+		"player/",
+		str(brawl_id) + "/ranked",
+		brawl_key,
+		RankedTTL,
+		RankedStale,
+		guild_id(target),
+		parse=Ranked.parse,
+	)
+	assert isinstance(r, Ranked)
+	if r.games == 0 and not r.teams:
 		return bb_embed(
 			"Beardless Bot Brawlhalla Rank",
 			"You haven't played ranked yet this season.",
-		).set_footer(text=f"Brawl ID {brawl_id}").set_author(
+		).set_footer(text=as_of(brawl_id, fetched)).set_author(
 			name=target.name, icon_url=fetch_avatar(target),
 		)
-	emb = bb_embed(f"{r["name"]}, {r["region"]}").set_footer(
-		text=f"Brawl ID {brawl_id}",
+	emb = bb_embed(f"{r.name}, {r.region}").set_footer(
+		text=as_of(brawl_id, fetched),
 	).set_author(name=target.name, icon_url=fetch_avatar(target))
-	if "games" in r and r["games"] != 0:
+	if r.games != 0:
 		emb = get_ones_rank(emb, r)
-	if "2v2" in r and len(r["2v2"]) != 0:
+	if r.teams:
 		emb = get_twos_rank(emb, r)
 	return emb
 
 
-def get_most_used(legend: dict[str, str | int]) -> tuple[str, int]:
-	assert isinstance(legend["legend_name_key"], str)
-	assert isinstance(legend["xp"], int)
-	return legend["legend_name_key"].title(), legend["xp"]
+def peak_ratings(r: Ranked) -> tuple[int, int]:
+	ones = r.rating if r.games != 0 else 0
+	twos = r.peak_team.rating if r.peak_team is not None else 0
+	return ones, twos
+
+
+def claimed_members(guild: Guild) -> dict[int, int]:
+	return {
+		member.id: brawl_id
+		for member in guild.members
+		if (brawl_id := fetch_brawl_id(member.id)) is not None
+	}
+
+
+async def fetch_ranked_many(
+	brawl_ids: Iterable[int], brawl_key: str, guild: Guild,
+) -> tuple[dict[int, tuple[float, Ranked]], list[Exception], int]:
+	"""
+	Fetch many players' ranked data at once, for one guild.
+
+	Cached data is only reused while it is fresh, that is, younger than
+	RankedTTL; ApiCache also keeps stale entries for brawl_api_call_swr.
+	Requests go out concurrently, but never more than BoardConcurrency at
+	once, and are queued fairly against other guilds in ApiLimiter.
+
+	Fetches still running after BoardDeadline seconds are left to finish
+	in the background, filling ApiCache for next time; until then, the
+	stale cached data for those players is returned, if there is any.
+
+	Args:
+		brawl_ids (Iterable[int]): The players' Brawlhalla ids
+		brawl_key (str): The Brawlhalla API key
+		guild (Guild): The guild the data is for
+
+	Returns:
+		tuple[dict[int, tuple[float, Ranked]], list[Exception], int]: Each
+		player's ranked data and the monotonic time it was fetched, by
+		Brawlhalla id; every failed fetch's exception; and how many
+		fetches were still pending at the deadline.
+
+	"""
+	semaphore = asyncio.Semaphore(BoardConcurrency)
+
+	async def fetch(brawl_id: int) -> tuple[float, Ranked]:
+		route = "player/", str(brawl_id) + "/ranked"
+		hit = ApiCache.lookup(route, now := monotonic())
+		if hit is not None and now - hit[1] < RankedTTL:
+			r, stored = hit
+		else:
+			async with semaphore:
+				r = await brawl_api_call(
+					*route,
+					brawl_key,
+					ttl=RankedTTL + RankedStale,
+					guild=guild.id,
+					refresh=True,
+					parse=Ranked.parse,
+				)
+			stored = monotonic()
+		assert isinstance(r, Ranked)
+		return stored, r
+
+	tasks = {
+		asyncio.create_task(fetch(brawl_id)): brawl_id
+		for brawl_id in set(brawl_ids)
+	}
+	ranked: dict[int, tuple[float, Ranked]] = {}
+	failures: list[Exception] = []
+	if not tasks:
+		return ranked, failures, 0
+	done, pending = await asyncio.wait(tasks, timeout=BoardDeadline)
+	for task in done:
+		if isinstance(e := task.exception(), Exception):
+			failures.append(e)
+		else:
+			ranked[tasks[task]] = task.result()
+	now = monotonic()
+	for task in pending:
+		Refreshes.add(task)
+		task.add_done_callback(finish_refresh)
+		route = "player/", str(tasks[task]) + "/ranked"
+		if (hit := ApiCache.lookup(route, now)) is not None:
+			assert isinstance(hit[0], Ranked)
+			ranked[tasks[task]] = hit[1], hit[0]
+	if failures:
+		logger.warning(
+			"Failed to fetch %i of %i ranked profiles for %s",
+			len(failures),
+			len(tasks),
+			guild.name,
+		)
+	if pending:
+		logger.info(
+			"%i of %i ranked profiles for %s still pending after %is",
+			len(pending),
+			len(tasks),
+			guild.name,
+			BoardDeadline,
+		)
+	return ranked, failures, len(pending)
+
+
+async def refresh_board(
+	guild: Guild, brawl_key: str,
+) -> tuple[dict[int, int], dict[int, tuple[float, int, int]], int]:
+	"""
+	Bring a guild's leaderboard up to date.
+
+	Only members whose ratings are missing or older than BoardTTL are
+	fetched, concurrently but never more than BoardConcurrency at once, and
+	queued fairly against other guilds in ApiLimiter. A member whose fetch
+	fails, or is still pending after BoardDeadline, keeps their previous
+	entry, if they have one.
+
+	Args:
+		guild (Guild): The guild whose leaderboard to refresh
+		brawl_key (str): The Brawlhalla API key
+
+	Returns:
+		tuple[dict[int, int], dict[int, tuple[float, int, int]], int]: Each
+		claimed member's Brawlhalla id, by Discord id; the leaderboard; and
+		how many members' ratings are still being fetched.
+
+	Raises:
+		httpx.RequestError: If no ratings could be fetched at all.
+
+	"""
+	claimed = claimed_members(guild)
+	board = Boards.setdefault(guild.id, {})
+	for brawl_id in board.keys() - set(claimed.values()):
+		del board[brawl_id]
+	now = monotonic()
+	stale = {
+		brawl_id
+		for brawl_id in claimed.values()
+		if brawl_id not in board or now - board[brawl_id][0] >= BoardTTL
+	}
+	ranked, failures, pending = await fetch_ranked_many(
+		stale, brawl_key, guild,
+	)
+	for brawl_id, (stored, r) in ranked.items():
+		if brawl_id not in board or stored > board[brawl_id][0]:
+			board[brawl_id] = (stored, *peak_ratings(r))
+	if failures and not board and not pending:
+		raise failures[0]
+	return claimed, board, pending
+
+
+def pending_footer(profiles: int, pending: int) -> str:
+	footer = f"{profiles} claimed profiles"
+	if pending:
+		footer += f", {pending} pending"
+	return footer
+
+
+async def brawl_board(guild: Guild, brawl_key: str) -> Embed:
+	claimed, board, pending = await refresh_board(guild, brawl_key)
+	owners: dict[int, int] = {}
+	for user_id, brawl_id in claimed.items():
+		owners.setdefault(brawl_id, user_id)
+	emb = bb_embed(f"Brawlhalla Leaderboard for {guild.name}")
+	for i, name in enumerate(("Ranked 1s", "Ranked 2s"), 1):
+		ranked = sorted(
+			(
+				(entry[i], brawl_id)
+				for brawl_id, entry in board.items()
+				if entry[i] > 0
+			),
+			reverse=True,
+		)[:BoardSize]
+		if ranked:
+			emb.add_field(name=name, value="\n".join(
+				f"{place}. <@{owners[brawl_id]}> ({rating} Elo)"
+				for place, (rating, brawl_id) in enumerate(ranked, 1)
+			))
+	if not emb.fields:
+		emb.description = StillFetchingMsg if pending else (
+			"Nobody in this server who has claimed a profile"
+			" has played ranked yet this season."
+		)
+	return emb.set_footer(text=pending_footer(len(owners), pending))
+
 
+def season_totals(r: Ranked) -> tuple[int, int, int]:
+	"""
+	Total up a player's ranked season across 1v1 and every 2v2 team.
 
-def get_top_dps(legend: dict[str, str | int]) -> tuple[str, float]:
-	assert isinstance(legend["matchtime"], int)
-	assert isinstance(legend["legend_name_key"], str)
-	dps = round(int(legend["damagedealt"]) / legend["matchtime"], 1)
-	return legend["legend_name_key"].title(), dps
+	Args:
+		r (Ranked): The player's ranked data
 
+	Returns:
+		tuple[int, int, int]: The player's total wins, total games, and
+		best peak rating.
 
-def get_top_ttk(legend: dict[str, str | int]) -> tuple[str, float]:
-	assert isinstance(legend["kos"], int)
-	assert isinstance(legend["matchtime"], int)
-	assert isinstance(legend["legend_name_key"], str)
-	return (
-		legend["legend_name_key"].title(),
-		round(legend["matchtime"] / legend["kos"], 1),
+	"""
+	games = r.games + sum(team.games for team in r.teams)
+	wins = r.wins + sum(team.wins for team in r.teams)
+	peaks = [team.peak_rating for team in r.teams]
+	if r.games != 0:
+		peaks.append(r.peak_rating)
+	return wins, games, max(peaks, default=0)
+
+
+def estimate_glory(
+	wins: IntArray, games: IntArray, peaks: IntArray,
+) -> IntArray:
+	"""
+	Estimate the glory each of many players will earn at season's end.
+
+	Players with fewer than GloryMinGames ranked games earn no glory.
+
+	Args:
+		wins (IntArray): Each player's total ranked wins
+		games (IntArray): Each player's total ranked games
+		peaks (IntArray): Each player's best peak rating
+
+	Returns:
+		IntArray: Each player's estimated glory.
+
+	"""
+	from_wins = np.where(
+		wins <= GloryWinsCutoff,
+		20 * wins,
+		np.floor(450 * np.log10(2 * np.maximum(wins, 1)) ** 2 + 245),
+	)
+	from_rating = np.floor(
+		np.interp(peaks, GloryRatings, GloryFromRating)
+		+ np.maximum(peaks - GloryRatings[-1], 0) / 2,
 	)
+	glory = np.where(games >= GloryMinGames, from_wins + from_rating, 0)
+	return glory.astype(np.int64)
+
+
+def elo_reset(ratings: IntArray) -> IntArray:
+	"""
+	Estimate where each of many ratings will be reset to next season.
+
+	Ratings below EloResetFloor are left alone; higher ones are squashed
+	toward it, the more so the higher they are.
+
+	Args:
+		ratings (IntArray): The ratings to reset
+
+	Returns:
+		IntArray: Each rating after the reset.
+
+	"""
+	above = np.maximum(ratings, EloResetFloor)
+	reset = np.floor(
+		EloResetFloor
+		+ (above - EloResetFloor) / (3 - (3000 - above) / 800),
+	)
+	return np.where(ratings >= EloResetFloor, reset, ratings).astype(np.int64)
+
+
+async def get_glory(target: Member | User, brawl_key: str) -> Embed:
+	if not (brawl_id := fetch_brawl_id(target.id)):
+		return bb_embed(
+			"Beardless Bot Brawlhalla Glory",
+			UnclaimedMsg.format(target.mention),
+		)
+	r, fetched = await brawl_api_call_swr(
+		"player/",
+		str(brawl_id) + "/ranked",
+		brawl_key,
+		RankedTTL,
+		RankedStale,
+		guild_id(target),
+		parse=Ranked.parse,
+	)
+	assert isinstance(r, Ranked)
+	emb = bb_embed("Beardless Bot Brawlhalla Glory").set_footer(
+		text=as_of(brawl_id, fetched),
+	).set_author(name=target.name, icon_url=fetch_avatar(target))
+	wins, games, peak = season_totals(r)
+	glory = estimate_glory(
+		np.array([wins]), np.array([games]), np.array([peak]),
+	)[0]
+	if games < GloryMinGames:
+		emb.description = (
+			f"You need {GloryMinGames - games} more ranked games"
+			" this season to earn glory."
+		)
+	else:
+		emb.description = (
+			f"Estimated glory: **{glory}**\n{wins} wins in {games} games,"
+			f" peak rating {peak}"
+		)
+	names = ["1v1"] if r.games != 0 else []
+	ratings = [r.rating] if names else []
+	for team in r.teams[:MaxEmbedFields - 1]:
+		names.append(team.teamname)
+		ratings.append(team.rating)
+	for name, rating, reset in zip(
+		names, ratings, elo_reset(np.array(ratings, dtype=np.int64)),
+		strict=True,
+	):
+		emb.add_field(name=name, value=f"{rating} → {reset} Elo")
+	return emb
+
+
+async def glory_board(guild: Guild, brawl_key: str) -> Embed:
+	"""
+	Estimate the glory of every claimed member of a guild at once.
+
+	Every member's ranked data is fetched concurrently, then the estimates
+	for the whole guild, and where each member's best current rating will
+	be reset to next season, are computed in one pass over NumPy arrays.
+	Members whose fetch is still pending after BoardDeadline are shown
+	from cached data, if there is any.
+
+	Args:
+		guild (Guild): The guild to estimate glory for
+		brawl_key (str): The Brawlhalla API key
+
+	Returns:
+		Embed: The BoardSize members estimated to earn the most glory.
+
+	Raises:
+		httpx.RequestError: If no ranked data could be fetched at all.
+
+	"""
+	owners: dict[int, int] = {}
+	for user_id, brawl_id in claimed_members(guild).items():
+		owners.setdefault(brawl_id, user_id)
+	ranked, failures, pending = await fetch_ranked_many(
+		owners, brawl_key, guild,
+	)
+	if failures and not ranked and not pending:
+		raise failures[0]
+	brawl_ids = np.fromiter(ranked, dtype=np.int64, count=len(ranked))
+	totals = np.array(
+		[season_totals(r) for _, r in ranked.values()], dtype=np.int64,
+	).reshape(-1, 3)
+	glory = estimate_glory(totals[:, 0], totals[:, 1], totals[:, 2])
+	ratings = np.array(
+		[max(peak_ratings(r)) for _, r in ranked.values()], dtype=np.int64,
+	)
+	resets = elo_reset(ratings)
+	order = np.argsort(-glory, kind="stable")[:BoardSize]
+	emb = bb_embed(f"Brawlhalla Glory Estimates for {guild.name}")
+	if lines := [
+		f"{place}. <@{owners[int(brawl_ids[i])]}> ({glory[i]} glory,"
+		f" {ratings[i]} → {resets[i]} Elo)"
+		for place, i in enumerate(order[glory[order] > 0], 1)
+	]:
+		emb.description = "\n".join(lines)
+	elif pending:
+		emb.description = StillFetchingMsg
+	else:
+		emb.description = (
+			"Nobody in this server who has claimed a profile"
+			f" has played {GloryMinGames} ranked games yet this season."
+		)
+	return emb.set_footer(text=pending_footer(len(owners), pending))
 
 
 def get_top_legend_stats(
 	legends: list[dict[str, str | int]],
 ) -> tuple[tuple[str, float | int] | None, ...]:
-	most_used: tuple[str, int] | None = None
-	top_winrate: tuple[str, float] | None = None
-	top_dps: tuple[str, float] | None = None
-	lowest_ttk: tuple[str, float] | None = None
-	for legend in legends:
-		assert isinstance(legend["legend_name_key"], str)
-		if legend.get("xp", 0) != 0 and (
-			most_used is None or most_used[1] < get_most_used(legend)[1]
-		):
-			most_used = get_most_used(legend)
-		if legend.get("games", 0) != 0 and (
-			top_winrate is None or top_winrate[1] < brawl_win_rate(legend)
-		):
-			top_winrate = (
-				legend["legend_name_key"].title(), brawl_win_rate(legend),
-			)
-		if legend.get("matchtime", 0) != 0:
-			if top_dps is None or top_dps[1] < get_top_dps(legend)[1]:
-				top_dps = get_top_dps(legend)
-			if legend.get("kos", 0) != 0 and (
-				lowest_ttk is None or lowest_ttk[1] > get_top_ttk(legend)[1]
-			):
-				lowest_ttk = get_top_ttk(legend)
-	return most_used, top_winrate, top_dps, lowest_ttk
+	return LegendStatsView(legends).summary()
 
 
 async def get_stats(target: Member | User, brawl_key: str) -> Embed:
@@ -399,28 +1983,33 @@ async def get_stats(target: Member | User, brawl_key: str) -> Embed:
 			"Beardless Bot Brawlhalla Stats",
 			UnclaimedMsg.format(target.mention),
 		)
-	if not (r := await brawl_api_call(
-		"player/", str(brawl_id) + "/stats", brawl_key,
-	)):
+	r, fetched = await brawl_api_call_swr(
+		"player/",
+		str(brawl_id) + "/stats",
+		brawl_key,
+		StatsTTL,
+		StatsStale,
+		guild_id(target),
+		parse=PlayerStats.parse,
+	)
+	assert isinstance(r, PlayerStats)
+	if not r.name:
 		no_stats = (
 			"This profile doesn't have stats associated with it."
 			" Please make sure you've claimed the correct profile."
 		)
 		return bb_embed("Beardless Bot Brawlhalla Stats", no_stats)
-	assert isinstance(r, dict)
 	win_loss = (
-		f"{r["wins"]} Wins / {r["games"] - r["wins"]} Losses"
-		f"\n{r["games"]} Games\n{brawl_win_rate(r)}% Winrate"
+		f"{r.wins} Wins / {r.games - r.wins} Losses"
+		f"\n{r.games} Games\n{r.win_rate}% Winrate"
 	)
-	emb = bb_embed("Brawlhalla Stats for " + r["name"]).set_footer(
-		text=f"Brawl ID {brawl_id}",
-	).add_field(name="Name", value=r["name"]).add_field(
+	emb = bb_embed("Brawlhalla Stats for " + r.name).set_footer(
+		text=as_of(brawl_id, fetched),
+	).add_field(name="Name", value=r.name).add_field(
 		name="Overall W/L", value=win_loss,
 	).set_author(name=target.name, icon_url=fetch_avatar(target))
-	if "legends" in r:
-		most_used, top_winrate, top_dps, lowest_ttk = get_top_legend_stats(
-			r["legends"],
-		)
+	if r.legends.names:
+		most_used, top_winrate, top_dps, lowest_ttk = r.legends.summary()
 		if all((most_used, top_winrate, top_dps, lowest_ttk)):
 			assert isinstance(most_used, tuple)
 			assert isinstance(top_winrate, tuple)
@@ -435,47 +2024,149 @@ async def get_stats(target: Member | User, brawl_key: str) -> Embed:
 					f"** {lowest_ttk[0]}, {lowest_ttk[1]}s"
 				),
 			)
-	if "clan" in r:
-		val = f"{r["clan"]["clan_name"]}\nClan ID {r["clan"]["clan_id"]}"
-		emb.add_field(name="Clan", value=val)
+	remember_clan(brawl_id, r)
+	if r.clan_id is not None:
+		emb.add_field(name="Clan", value=f"{r.clan_name}\nClan ID {r.clan_id}")
 	return emb
 
 
+async def get_legend_stats(
+	target: Member | User, brawl_key: str, legend_name: str,
+) -> Embed:
+	if not (brawl_id := fetch_brawl_id(target.id)):
+		return bb_embed(
+			"Beardless Bot Brawlhalla Stats",
+			UnclaimedMsg.format(target.mention),
+		)
+	r, fetched = await brawl_api_call_swr(
+		"player/",
+		str(brawl_id) + "/stats",
+		brawl_key,
+		StatsTTL,
+		StatsStale,
+		guild_id(target),
+		parse=PlayerStats.parse,
+	)
+	assert isinstance(r, PlayerStats)
+	view = r.legends
+	if (i := view.row(legend_name)) is None or not view.games[i]:
+		return bb_embed(
+			"Beardless Bot Brawlhalla Stats",
+			f"{target.mention} hasn't played {legend_name.title()} yet.",
+		)
+
+	def stat(value: float | None, unit: str = "") -> str:
+		return "N/A" if value is None else f"{value}{unit}"
+
+	return bb_embed(f"{view.names[i]} Stats for {r.name}").add_field(
+		name="W/L",
+		value=(
+			f"{view.wins[i]} Wins / {view.games[i] - view.wins[i]} Losses"
+			f"\n{view.games[i]} Games\n{stat(view.winrate[i], "%")} Winrate"
+		),
+	).add_field(
+		name="Combat",
+		value=(
+			f"**KOs:** {view.kos[i]}\n**Falls:** {view.falls[i]}"
+			f"\n**Avg DPS:** {stat(view.dps[i])}"
+			f"\n**Avg TTK:** {stat(view.ttk[i], "s")}"
+		),
+	).add_field(name="XP", value=str(view.xp[i])).set_footer(
+		text=as_of(brawl_id, fetched),
+	).set_author(name=target.name, icon_url=fetch_avatar(target))
+
+
+def remember_clan(brawl_id: int, stats: PlayerStats) -> None:
+	if stats.clan_id is not None:
+		ClanIds.put(brawl_id, stats.clan_id, ClanIdTTL, monotonic())
+	else:
+		ClanIds.discard(brawl_id)
+
+
+async def fetch_clan(
+	brawl_id: int, brawl_key: str, guild: int | None = None,
+) -> Clan | None:
+	"""
+	Fetch the clan a player is in.
+
+	If the player's clan id is known from an earlier stats lookup, this
+	takes one API call. Otherwise, or if the clan's roster shows that the
+	player has left it, the player's stats are fetched first to find it.
+
+	Args:
+		brawl_id (int): The player's Brawlhalla id
+		brawl_key (str): The Brawlhalla API key
+		guild (int | None): The id of the guild the lookup is for
+			(default is None)
+
+	Returns:
+		Clan | None: The clan, or None if the player has none.
+
+	"""
+	if (clan_id := ClanIds.get(brawl_id, monotonic())) is not None:
+		clan = await brawl_api_call(
+			"clan/",
+			str(clan_id) + "/",
+			brawl_key,
+			ttl=ClanTTL,
+			guild=guild,
+			parse=Clan.parse,
+		)
+		assert isinstance(clan, Clan)
+		roster = [
+			member.brawl_id
+			for member in clan.members
+			if member.brawl_id is not None
+		]
+		if not roster or brawl_id in roster:
+			return clan
+	r, _ = await brawl_api_call_swr(
+		"player/",
+		str(brawl_id) + "/stats",
+		brawl_key,
+		StatsTTL,
+		StatsStale,
+		guild,
+		parse=PlayerStats.parse,
+	)
+	assert isinstance(r, PlayerStats)
+	remember_clan(brawl_id, r)
+	if r.clan_id is None:
+		return None
+	clan = await brawl_api_call(
+		"clan/",
+		str(r.clan_id) + "/",
+		brawl_key,
+		ttl=ClanTTL,
+		guild=guild,
+		parse=Clan.parse,
+	)
+	assert isinstance(clan, Clan)
+	return clan
+
+
 async def get_clan(target: Member | User, brawl_key: str) -> Embed:
 	if not (brawl_id := fetch_brawl_id(target.id)):
 		return bb_embed(
 			"Beardless Bot Brawlhalla Clan",
 			UnclaimedMsg.format(target.mention),
 		)
-	# Takes two API calls: one to get clan ID from player stats,
-	# one to get clan from clan ID. As a result, this command is very slow.
-	# TODO: Try to find a way around this.
-	# https://github.com/LevBernstein/BeardlessBot/issues/14
-	r = await brawl_api_call("player/", str(brawl_id) + "/stats", brawl_key)
-	assert isinstance(r, dict)
-	if "clan" not in r:
+	if (r := await fetch_clan(brawl_id, brawl_key, guild_id(target))) is None:
 		return bb_embed(
 			"Beardless Bot Brawlhalla Clan", "You are not in a clan!",
 		)
-	r = await brawl_api_call(
-		"clan/", str(r["clan"]["clan_id"]) + "/", brawl_key,
-	)
-	assert isinstance(r, dict)
+	created = str(datetime.fromtimestamp(r.create_date, TimeZone))[:-9]
 	emb = bb_embed(
-		r["clan_name"],
-		"**Clan Created:** {}\n**Experience:** {}\n**Members:** {}".format(
-			str(datetime.fromtimestamp(r["clan_create_date"], TimeZone))[:-9],
-			r["clan_lifetime_xp"],
-			len(r["clan"]),
-		),
-	).set_footer(text=f"Clan ID {r["clan_id"]}")
-	for i in range(min(len(r["clan"]), 9)):
-		member = r["clan"][i]
+		r.name,
+		f"**Clan Created:** {created}\n**Experience:** {r.lifetime_xp}"
+		f"\n**Members:** {len(r.members)}",
+	).set_footer(text=f"Clan ID {r.clan_id}")
+	for member in r.members[:9]:
 		val = (
-			f"{member["rank"]} ({member["xp"]} xp)\nJoined "
-			+ str(datetime.fromtimestamp(member["join_date"], TimeZone))[:-9]
+			f"{member.rank} ({member.xp} xp)\nJoined "
+			+ str(datetime.fromtimestamp(member.join_date, TimeZone))[:-9]
 		)
-		emb.add_field(name=member["name"], value=val)
+		emb.add_field(name=member.name, value=val)
 	return emb
 
 
@@ -487,8 +2178,19 @@ def brawl_commands() -> Embed:
 			"Claims a Brawlhalla account, allowing the other commands.",
 		),
 		("!brawlrank", "Displays a user's ranked information."),
-		("!brawlstats", "Displays a user's general stats."),
+		(
+			"!brawlstats",
+			"Displays a user's general stats, or with a legend's name,"
+			" your stats for that legend.",
+		),
 		("!brawlclan", "Displays a user's clan information."),
+		("!brawlboard", "Ranks this server's claimed players by Elo."),
+		(
+			"!brawlglory",
+			"Estimates a user's, or with !brawlglory server, everyone's"
+			" end-of-season glory and Elo reset.",
+		),
+		("!whois", "Finds who has claimed a Brawlhalla ID."),
 		("!brawllegend", "Displays lore and stats for a legend."),
 		(
 			"!random legend/weapon",
@@ -498,11 +2200,3 @@ def brawl_commands() -> Embed:
 	for command, description in comms:
 		emb.add_field(name=command, value=description)
 	return emb
-
-
-# TODO: implement leaderboard, glory
-# https://github.com/LevBernstein/BeardlessBot/issues/15
-# https://github.com/LevBernstein/BeardlessBot/issues/17
-# See: https://github.com/BrawlDB/gerard3/blob/master/src/utils/glory.js
-
-# TODO: brawlstats command for specific legend
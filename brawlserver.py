@@ -0,0 +1,664 @@
+"""
+Beardless Bot Brawlhalla API stand-in server.
+
+Serves the Brawlhalla API routes the bot calls from a local port, backed by
+synthetic players generated on demand from a seed, so that the Brawl
+commands can be load tested for throughput and tail latency without an API
+key or the real API's quota. Each player's ranked, stats, and clan data are
+derived from the seed and their id alone, so any number of players can be
+served without storing them, and every run sees the same ones. Per-key
+quotas answer with 429 once spent, like the real API, and an optional
+delay stands in for the round trip to it.
+
+Run `python3 brawlserver.py --help` for usage, then set BRAWLAPIROOT in
+.env to the root URL it logs, or pass --bench to measure brawl_api_call's
+throughput and latency against it in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+from collections import defaultdict, deque
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from time import monotonic
+from typing import Any, Final
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+import brawl
+from brawl import ApiLimiter, Regions
+from misc import close_http_clients
+
+logger = logging.getLogger(__name__)
+
+type Payload = dict[str, Any] | list[dict[str, Any]]
+
+# Steam ids of individual accounts are offset from their account numbers by
+# this; the stand-in gives player N the Steam account number N.
+SteamIdBase: Final[int] = 76561197960265728
+ClanSize: Final[int] = 50
+# One player in ClanlessEvery is not in a clan.
+ClanlessEvery: Final[int] = 3
+# Each tier's lowest rating, from highest to lowest.
+Tiers: Final[tuple[tuple[str, int], ...]] = (
+	("Diamond", 2000),
+	("Platinum", 1680),
+	("Gold", 1390),
+	("Silver", 1130),
+	("Bronze", 910),
+	("Tin", 0),
+)
+RequestLine = re.compile(rb"[A-Z]+ (\S+) HTTP/1\.[01]")
+HttpReasons: Final[dict[int, str]] = {
+	200: "OK",
+	400: "Bad Request",
+	403: "Forbidden",
+	404: "Not Found",
+	429: "Too Many Requests",
+}
+
+
+def rating_tier(rating: int) -> str:
+	"""
+	Name the ranked tier of a rating.
+
+	Args:
+		rating (int): The rating to name the tier of
+
+	Returns:
+		str: The tier, such as "Gold".
+
+	"""
+	return next(name for name, floor in Tiers if rating >= floor)
+
+
+def ranked_record(rng: random.Random) -> dict[str, Any]:
+	"""
+	Generate the rating, peak rating, tier, and record of one ranked queue.
+
+	Args:
+		rng (random.Random): The source of randomness
+
+	Returns:
+		dict[str, Any]: The ranked fields of a player, team, or legend.
+
+	"""
+	games = rng.randint(0, 600)
+	wins = rng.randint(games // 4, games * 3 // 4)
+	rating = rng.randint(750, 2400) if games else 750
+	return {
+		"rating": rating,
+		"peak_rating": rating + rng.randint(0, 150),
+		"tier": rating_tier(rating),
+		"wins": wins,
+		"games": games,
+	}
+
+
+class BrawlStubServer:
+	"""
+	Local HTTP/1.1 keep-alive server standing in for the Brawlhalla API.
+
+	Players 1 to players exist; any other id gets an empty object, as an
+	unknown id does from the real API. Every response waits latency seconds,
+	plus up to jitter more. A request without an api_key gets a 403.
+
+	Attributes:
+		players (int): How many synthetic players exist
+		seed (int): The seed all synthetic data is derived from
+		latency (float): Seconds to wait before each response
+		jitter (float): Up to this many extra seconds are added to latency,
+			uniformly at random
+		quotas (tuple[tuple[int, float], ...]): Each quota's request limit
+			and period in seconds, applied to each API key separately
+		legends (list[dict[str, Any]]): The legend/all response
+		rng (random.Random): The source of jitter
+		calls (defaultdict[str, deque[float]]): The times of each API key's
+			requests within the longest quota period
+		connections (int): How many connections have been accepted
+		requests (int): How many requests have been answered
+		throttled (int): How many of those were answered with a 429
+		server (asyncio.Server | None): The listening server, once started
+		routes (tuple[tuple[re.Pattern[str], Callable[..., Payload]], ...]):
+			Each route's path pattern and the method that answers it
+
+	Methods:
+		player(brawl_id):
+			Generate a player's shared fields, or None if they don't exist
+		ranked(brawl_id):
+			Answer player/{id}/ranked
+		stats(brawl_id):
+			Answer player/{id}/stats
+		clan(clan_id):
+			Answer clan/{id}
+		legend(legend_id):
+			Answer legend/{id}
+		all_legends():
+			Answer legend/all
+		search(steam_id):
+			Answer search?steamid=
+		over_quota(key):
+			Record a request, and check whether it exceeds a quota
+		respond(target):
+			Answer a request target with a status and payload
+		send(writer, status, payload):
+			Write one response to a connection
+		handle(reader, writer):
+			Answer every request on a connection
+		start(host, port):
+			Start listening and return the root URL
+
+	"""
+
+	def __init__(  # noqa: PLR0913
+		self,
+		players: int = 100000,
+		*,
+		seed: int = 0,
+		latency: float = 0,
+		jitter: float = 0,
+		quotas: Sequence[tuple[int, float]] = ApiLimiter.quotas,
+		legends_path: Path = Path("resources/legends.json"),
+	) -> None:
+		"""
+		Create a stand-in server that has not yet started listening.
+
+		Args:
+			players (int): How many synthetic players exist
+				(default is 100000)
+			seed (int): The seed all synthetic data is derived from
+				(default is 0)
+			latency (float): Seconds to wait before each response
+				(default is 0)
+			jitter (float): Maximum extra seconds of random delay
+				(default is 0)
+			quotas (Sequence[tuple[int, float]]): Each quota's request limit
+				and period in seconds; if empty, requests are never
+				throttled (default is ApiLimiter.quotas, the real API's)
+			legends_path (Path): The legend/all response to serve
+				(default is Path("resources/legends.json"))
+
+		"""
+		self.players = players
+		self.seed = seed
+		self.latency = latency
+		self.jitter = jitter
+		self.quotas = tuple(quotas)
+		with legends_path.open("r", encoding="UTF-8") as f:
+			self.legends: list[dict[str, Any]] = json.load(f)
+		self.rng = random.Random(seed)
+		self.calls: defaultdict[str, deque[float]] = defaultdict(deque)
+		self.connections = 0
+		self.requests = 0
+		self.throttled = 0
+		self.server: asyncio.Server | None = None
+		self.routes: tuple[
+			tuple[re.Pattern[str], Callable[..., Payload]], ...,
+		] = (
+			(re.compile(r"/player/(\d+)/ranked/?"), self.ranked),
+			(re.compile(r"/player/(\d+)/stats/?"), self.stats),
+			(re.compile(r"/clan/(\d+)/?"), self.clan),
+			(re.compile(r"/legend/all/?"), self.all_legends),
+			(re.compile(r"/legend/(\d+)/?"), self.legend),
+		)
+
+	def player(self, brawl_id: int) -> tuple[random.Random, int | None] | None:
+		"""
+		Generate a player's shared fields, or None if they don't exist.
+
+		Args:
+			brawl_id (int): The player's Brawlhalla id
+
+		Returns:
+			tuple[random.Random, int | None] | None: A source of randomness
+				that is the same every time for this player, and the id of
+				their clan, or None if they are not in one.
+
+		"""
+		if not 1 <= brawl_id <= self.players:
+			return None
+		clan_id = None
+		if brawl_id % ClanlessEvery:
+			clan_id = (brawl_id - 1) // ClanSize + 1
+		return random.Random(f"{self.seed}:{brawl_id}"), clan_id
+
+	def ranked(self, brawl_id: str) -> dict[str, Any]:
+		"""Answer player/{id}/ranked."""
+		if (player := self.player(int(brawl_id))) is None:
+			return {}
+		rng = player[0]
+		region = rng.choice(Regions).upper()
+		legends = rng.sample(self.legends, rng.randint(1, 8))
+		teammates = rng.sample(
+			range(1, self.players + 1), min(3, self.players),
+		)
+		return {
+			"name": f"Player {brawl_id}",
+			"brawlhalla_id": int(brawl_id),
+			"region": region,
+			**ranked_record(rng),
+			"legends": [
+				{
+					"legend_id": legend["legend_id"],
+					"legend_name_key": legend["legend_name_key"],
+					**ranked_record(rng),
+				}
+				for legend in legends
+			],
+			"2v2": [
+				{
+					"brawlhalla_id_one": int(brawl_id),
+					"brawlhalla_id_two": teammate,
+					"teamname": f"Player {brawl_id}+Player {teammate}",
+					"region": region,
+					**ranked_record(rng),
+				}
+				for teammate in teammates
+				if teammate != int(brawl_id)
+			],
+		}
+
+	def stats(self, brawl_id: str) -> dict[str, Any]:
+		"""Answer player/{id}/stats."""
+		if (player := self.player(int(brawl_id))) is None:
+			return {}
+		rng, clan_id = player
+		legends = []
+		for legend in rng.sample(self.legends, rng.randint(1, 20)):
+			games = rng.randint(1, 2000)
+			matchtime = games * rng.randint(120, 240)
+			legends.append({
+				"legend_id": legend["legend_id"],
+				"legend_name_key": legend["legend_name_key"],
+				"damagedealt": matchtime * rng.randint(10, 30),
+				"kos": games * rng.randint(1, 4),
+				"falls": games * rng.randint(1, 4),
+				"games": games,
+				"wins": rng.randint(0, games),
+				"matchtime": matchtime,
+				"xp": games * rng.randint(100, 200),
+			})
+		j: dict[str, Any] = {
+			"brawlhalla_id": int(brawl_id),
+			"name": f"Player {brawl_id}",
+			"games": sum(legend["games"] for legend in legends),
+			"wins": sum(legend["wins"] for legend in legends),
+			"legends": legends,
+		}
+		if clan_id is not None:
+			j["clan"] = {"clan_name": f"Clan {clan_id}", "clan_id": clan_id}
+		return j
+
+	def clan(self, clan_id: str) -> dict[str, Any]:
+		"""Answer clan/{id}."""
+		first = (int(clan_id) - 1) * ClanSize + 1
+		members = [
+			brawl_id
+			for brawl_id in range(max(first, 1), first + ClanSize)
+			if (player := self.player(brawl_id)) is not None
+			and player[1] == int(clan_id)
+		]
+		if not members:
+			return {}
+		rng = random.Random(f"{self.seed}:clan:{clan_id}")
+		created = rng.randint(1500000000, 1700000000)
+		roster = [
+			{
+				"brawlhalla_id": brawl_id,
+				"name": f"Player {brawl_id}",
+				"rank": "Leader" if i == 0 else rng.choice(
+					("Officer", "Member", "Recruit"),
+				),
+				"join_date": created + rng.randint(0, 10 ** 8),
+				"xp": rng.randint(0, 10 ** 6),
+			}
+			for i, brawl_id in enumerate(members)
+		]
+		return {
+			"clan_id": int(clan_id),
+			"clan_name": f"Clan {clan_id}",
+			"clan_create_date": created,
+			"clan_lifetime_xp": sum(member["xp"] for member in roster),
+			"clan": roster,
+		}
+
+	def legend(self, legend_id: str) -> dict[str, Any]:
+		"""Answer legend/{id}."""
+		for legend in self.legends:
+			if legend["legend_id"] == int(legend_id):
+				return {
+					**legend,
+					"bio_text": f"{legend['bio_name']} is a legend.",
+					"bio_quote": "Stand-in quote.",
+					"bio_quote_about_attrib": f"- {legend['bio_name']}",
+					"bio_quote_from": "Stand-in reply.",
+					"bio_quote_from_attrib": "- Someone else",
+				}
+		return {}
+
+	def all_legends(self) -> list[dict[str, Any]]:
+		"""Answer legend/all."""
+		return self.legends
+
+	def search(self, steam_id: str) -> Payload:
+		"""Answer search?steamid=, with [] for an unknown account."""
+		brawl_id = int(steam_id) - SteamIdBase if steam_id.isdigit() else 0
+		if self.player(brawl_id) is None:
+			return []
+		return {"brawlhalla_id": brawl_id, "name": f"Player {brawl_id}"}
+
+	def over_quota(self, key: str) -> bool:
+		"""
+		Record a request, and check whether it exceeds a quota.
+
+		A throttled request still counts against the quotas, as it does
+		with the real API.
+
+		Args:
+			key (str): The request's API key
+
+		Returns:
+			bool: Whether any quota is exceeded.
+
+		"""
+		if not self.quotas:
+			return False
+		now = monotonic()
+		calls = self.calls[key]
+		calls.append(now)
+		longest = max(period for _, period in self.quotas)
+		while calls[0] <= now - longest:
+			calls.popleft()
+		over = False
+		for limit, period in self.quotas:
+			recent = 0
+			for call in reversed(calls):
+				if call <= now - period:
+					break
+				recent += 1
+			over = over or recent > limit
+		return over
+
+	def respond(self, target: str) -> tuple[int, Payload]:
+		"""
+		Answer a request target with a status and payload.
+
+		Args:
+			target (str): The request line's target, such as
+				"/player/1/ranked?api_key=foo"
+
+		Returns:
+			tuple[int, Payload]: The status code and JSON payload.
+
+		"""
+		url = urlsplit(target)
+		query = parse_qs(url.query)
+		if not (key := query.get("api_key", [""])[0]):
+			return 403, {"error": {"code": 403, "message": "Forbidden"}}
+		if self.over_quota(key):
+			self.throttled += 1
+			return 429, {"error": {"code": 429, "message": "Too Many Requests"}}
+		if url.path.rstrip("/") == "/search" and "steamid" in query:
+			return 200, self.search(query["steamid"][0])
+		for pattern, route in self.routes:
+			if match := pattern.fullmatch(url.path):
+				return 200, route(*match.groups())
+		return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+	async def send(
+		self, writer: asyncio.StreamWriter, status: int, payload: Payload,
+	) -> None:
+		"""
+		Write one response to a connection.
+
+		Args:
+			writer (asyncio.StreamWriter): The connection to write to
+			status (int): The response's status code
+			payload (Payload): The response's JSON body
+
+		"""
+		self.requests += 1
+		body = json.dumps(payload).encode()
+		writer.write(
+			f"HTTP/1.1 {status} {HttpReasons[status]}\r\n"
+			"Content-Type: application/json\r\n"
+			f"Content-Length: {len(body)}\r\n\r\n".encode() + body,
+		)
+		await writer.drain()
+
+	async def handle(
+		self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+	) -> None:
+		"""
+		Answer every request on a connection.
+
+		A request with a malformed request line, or whose head is too long
+		to buffer, gets a 400, and the connection is closed.
+		"""
+		self.connections += 1
+		bad_request = {"error": {"code": 400, "message": "Bad Request"}}
+		try:
+			while head := await reader.readuntil(b"\r\n\r\n"):
+				line = head.split(b"\r\n", 1)[0]
+				if (match := RequestLine.fullmatch(line)) is None:
+					await self.send(writer, 400, bad_request)
+					break
+				if delay := self.latency + self.rng.uniform(0, self.jitter):
+					await asyncio.sleep(delay)
+				await self.send(
+					writer, *self.respond(match[1].decode("latin-1")),
+				)
+		except asyncio.LimitOverrunError:
+			await self.send(writer, 400, bad_request)
+		except (asyncio.IncompleteReadError, ConnectionError):
+			pass
+		finally:
+			writer.close()
+
+	async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+		"""
+		Start listening and return the root URL.
+
+		Args:
+			host (str): The address to listen on (default is "127.0.0.1")
+			port (int): The port to listen on; if 0, pick a free one
+				(default is 0)
+
+		Returns:
+			str: The root URL to set brawl.BrawlApiRoot to.
+
+		"""
+		self.server = await asyncio.start_server(self.handle, host, port)
+		port = self.server.sockets[0].getsockname()[1]
+		return f"http://{host}:{port}/"
+
+	async def __aenter__(self) -> str:
+		"""Start listening on a free local port and return the root URL."""
+		return await self.start()
+
+	async def __aexit__(self, *args: object) -> None:
+		"""Stop accepting connections."""
+		assert self.server is not None
+		self.server.close()
+
+
+async def serve(stub: BrawlStubServer, host: str, port: int) -> None:
+	"""Serve requests until cancelled."""
+	root = await stub.start(host, port)
+	logger.info("Serving %i players at %s", stub.players, root)
+	assert stub.server is not None
+	async with stub.server:
+		await stub.server.serve_forever()
+
+
+async def bench(
+	stub: BrawlStubServer,
+	requests: int,
+	*,
+	concurrency: int = 50,
+	quotas: Sequence[tuple[int, float]] | None = None,
+	seed: int = 0,
+) -> tuple[float, list[float], int]:
+	"""
+	Measure brawl_api_call's throughput and latency against a stand-in.
+
+	The stand-in is started on a free local port, and brawl.use_api points
+	brawl_api_call at it, with quotas for ApiLimiter, for the length of the
+	run. Each request is for a random player's ranked or stats data.
+
+	Args:
+		stub (BrawlStubServer): The stand-in to benchmark against
+		requests (int): How many requests to make
+		concurrency (int): The most requests in flight at once
+			(default is 50)
+		quotas (Sequence[tuple[int, float]] | None): The quotas ApiLimiter
+			follows during the run; if None, the real API's
+			(default is None)
+		seed (int): The seed the players requested are picked with
+			(default is 0)
+
+	Returns:
+		tuple[float, list[float], int]: The run's length in seconds, each
+		request's latency in seconds including time queued in ApiLimiter,
+		and how many requests failed.
+
+	"""
+	root_before, limiter_before = brawl.BrawlApiRoot, brawl.ApiLimiter
+	rng = random.Random(seed)
+	semaphore = asyncio.Semaphore(concurrency)
+	latencies: list[float] = []
+	failures = 0
+
+	async def call(brawl_id: int, route: str) -> None:
+		nonlocal failures
+		async with semaphore:
+			start = monotonic()
+			try:
+				await brawl.brawl_api_call(
+					"player/", f"{brawl_id}/{route}", "bench",
+				)
+			except httpx.RequestError:
+				failures += 1
+			latencies.append(monotonic() - start)
+
+	root = await stub.start()
+	brawl.use_api(root, limiter_before.quotas if quotas is None else quotas)
+	try:
+		started = monotonic()
+		await asyncio.gather(*(
+			call(rng.randint(1, stub.players), rng.choice(("ranked", "stats")))
+			for _ in range(requests)
+		))
+		elapsed = monotonic() - started
+	finally:
+		await close_http_clients()
+		assert stub.server is not None
+		stub.server.close()
+		brawl.BrawlApiRoot, brawl.ApiLimiter = root_before, limiter_before
+		brawl.ApiCache.clear()
+	return elapsed, latencies, failures
+
+
+def percentile(latencies: Sequence[float], fraction: float) -> float:
+	"""Return the latency that fraction of requests were at or under."""
+	ordered = sorted(latencies)
+	return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def main() -> None:
+	"""Run a stand-in server with the requested players and behavior."""
+	parser = argparse.ArgumentParser(
+		description="Serve a local stand-in for the Brawlhalla API.",
+	)
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8080)
+	parser.add_argument("--players", type=int, default=100000)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument(
+		"--latency",
+		type=float,
+		default=0,
+		help="Seconds to wait before each response.",
+	)
+	parser.add_argument(
+		"--jitter",
+		type=float,
+		default=0,
+		help="Maximum extra seconds of random delay per response.",
+	)
+	parser.add_argument(
+		"--no-quota",
+		action="store_true",
+		help="Never answer with 429, however many requests are made.",
+	)
+	parser.add_argument(
+		"--bench",
+		type=int,
+		metavar="N",
+		help=(
+			"Instead of serving, make N requests through brawl_api_call"
+			" and report throughput and latency."
+		),
+	)
+	parser.add_argument(
+		"--concurrency",
+		type=int,
+		default=50,
+		help="With --bench, the most requests in flight at once.",
+	)
+	parser.add_argument(
+		"--quotas",
+		type=brawl.parse_quotas,
+		help=(
+			"With --bench, the quotas brawl_api_call follows, such as"
+			" 180/900,10/1; an empty string for none. Default is the real"
+			" API's, like BRAWLQUOTAS in .env."
+		),
+	)
+	args = parser.parse_args()
+
+	stub = BrawlStubServer(
+		args.players,
+		seed=args.seed,
+		latency=args.latency,
+		jitter=args.jitter,
+		quotas=() if args.no_quota else ApiLimiter.quotas,
+	)
+	if args.bench is None:
+		asyncio.run(serve(stub, args.host, args.port))
+		return
+	# One log line per request would swamp the results.
+	logging.getLogger("httpx").setLevel(logging.WARNING)
+	elapsed, latencies, failures = asyncio.run(bench(
+		stub,
+		args.bench,
+		concurrency=args.concurrency,
+		quotas=args.quotas,
+		seed=args.seed,
+	))
+	logger.info(
+		"%i requests in %.2fs (%.1f/s), %i failed, %i throttled",
+		len(latencies),
+		elapsed,
+		len(latencies) / elapsed,
+		failures,
+		stub.throttled,
+	)
+	if latencies:
+		logger.info(
+			"Latency p50 %.1fms, p95 %.1fms, p99 %.1fms, max %.1fms",
+			*(
+				1000 * percentile(latencies, fraction)
+				for fraction in (0.5, 0.95, 0.99, 1)
+			),
+		)
+
+
+if __name__ == "__main__":  # pragma: no cover
+	logging.basicConfig(format="%(message)s", level=logging.INFO)
+	main()
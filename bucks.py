@@ -1,15 +1,19 @@
 """Beardless Bot methods that modify resources/money.csv."""
 
 import csv
-import random
+import itertools
+import json
+import math
 from collections import OrderedDict
+from collections.abc import Hashable
 from enum import Enum
 from operator import itemgetter
 from pathlib import Path
+from time import time_ns
 
 import nextcord
 
-from misc import bb_embed, member_search
+from misc import BbRandom, bb_embed, member_search, new_rng
 
 CommaWarn = (
 	"Beardless Bot gambling is available to Discord"
@@ -47,6 +51,39 @@ GameHelpMsg = (
 	"or !stay to stop at your current total."
 )
 
+HintsPath = Path("resources/blackjackHints.json")
+
+
+def load_hints(
+	path: Path = HintsPath,
+) -> dict[tuple[int, bool, int], bool]:
+	"""
+	Load the basic strategy table used by !hint.
+
+	The table is generated offline by simulator.write_hints, so answering
+	a hint is a single dictionary lookup.
+
+	Args:
+		path (Path): The table to load (default is HintsPath)
+
+	Returns:
+		dict[tuple[int, bool, int], bool]: Whether to hit, keyed by the
+		player's total, whether they hold an Ace counted high, and the
+		dealer's up card.
+
+	"""
+	with path.open("r", encoding="UTF-8") as f:
+		table = json.load(f)
+	hints: dict[tuple[int, bool, int], bool] = {}
+	for soft, rows in ((False, table["hard"]), (True, table["soft"])):
+		for total, row in rows.items():
+			for up, play in zip(table["upcards"], row, strict=True):
+				hints[int(total), soft, up] = play == "H"
+	return hints
+
+
+BlackjackHints = load_hints()
+
 
 class BlackjackPlayer:
 	"""
@@ -119,6 +156,10 @@ class BlackjackGame:
 		FaceVal (int): The value of a face card (J Q K)
 		Goal (int): The desired score
 		CardVals (tuple[int, ...]): Blackjack values for each card
+		game_id (int): Unique id of this game, across restarts too, for
+			routing button presses
+		seed (int or None): The seed of rng in seeded RNG mode, to replay
+			this game with
 		owner (nextcord.User or Member): The user who is owns this game
 		players (list[BlackjackPlayer]): The players in the game
 		turn_idx (int): an index into players that holds player to play
@@ -128,6 +169,14 @@ class BlackjackGame:
 		deck (list): The cards remaining in the deck
 		started (bool): Whether the match/round started
 		message (str): The report to be sent in the Discord channel
+		channel (nextcord.abc.Messageable or None): Where the game is
+			being played, for reports not triggered by a command
+		rng (BbRandom): The source of randomness for shuffling and naming
+			cards; replaying its seed replays the game
+		status (nextcord.Message or None): The live status message of a
+			multiplayer table, edited in place as the game progresses
+		pinged (BlackjackPlayer or None): The player last told that it is
+			their turn, as edits to status do not notify anyone
 
 	Methods:
 		dealer_draw():
@@ -136,7 +185,7 @@ class BlackjackGame:
 			Ends a round after everyone plays their turn.
 		deal_to_current_player():
 			Deals the player whose turn it is a card.
-		card_name(card):
+		card_name(card, rng):
 			Gives the human-friendly name of a given card.
 		ready_to_start():
 			Checks if a multiplayer match is ready to start.
@@ -156,6 +205,12 @@ class BlackjackGame:
 			End a round where the dealer blackjacked.
 		start_game():
 			Deal the user(s) a starting hand of 2 cards.
+		expire():
+			Settle or close a game that has been abandoned.
+		hint(player):
+			Suggests whether a player should hit or stay.
+		table_status():
+			Summarizes the table for its live status message.
 
 	"""
 
@@ -165,12 +220,17 @@ class BlackjackGame:
 	Goal = 21
 	CardVals = (2, 3, 4, 5, 6, 7, 8, 9, 10, FaceVal, FaceVal, FaceVal, AceVal)
 	NumOfDecksInMatch = 4
+	# Game ids are prefixed with the process's start time in milliseconds,
+	# so buttons left on messages from before a restart match no new game.
+	_game_ids = itertools.count(time_ns() // 10**6 * 10**6)
 
 	def __init__(
 		self,
 		owner: nextcord.User | nextcord.Member,
 		*,
 		multiplayer: bool,
+		rng: BbRandom | None = None,
+		context: str = "",
 	) -> None:
 		"""
 		Create a new BlackjackGame instance.
@@ -184,12 +244,23 @@ class BlackjackGame:
 				in a singleplayer game the owner is also the only player.
 				in multiplayer the owner is the one who can start the round.
 			multiplayer (bool): Whether to make a multiplayer game
+			rng (BbRandom or None): The source of randomness for the whole
+				game; if None, use new_rng() (default is None)
+			context (str): What started the game, logged with the seed of
+				a new rng (default is "")
 
 		"""
+		self.game_id = next(BlackjackGame._game_ids)
+		self.rng = rng or new_rng(context="; ".join(filter(None, (
+			f"Blackjack game: {self.game_id}", context,
+		))))
+		self.seed = self.rng.seed
 		self.owner = BlackjackPlayer(owner)
 		self.players: list[BlackjackPlayer] = [self.owner]
 		self.deck: list[int] = []
-		self.deck.extend(BlackjackGame.CardVals * 4 * 4)  # 4 decks
+		self.deck.extend(  # 4 suits per deck
+			BlackjackGame.CardVals * 4 * BlackjackGame.NumOfDecksInMatch,
+		)
 		# TODO: dealerUp should NEVER be None
 		# and dealerSum should NEVER be 0
 		self.dealerUp: int | None = None
@@ -197,6 +268,9 @@ class BlackjackGame:
 		self.started: bool = False
 		self.turn_idx = 0
 		self.multiplayer = multiplayer  # only multiplayer games can be joined
+		self.channel: nextcord.abc.Messageable | None = None
+		self.status: nextcord.Message | None = None
+		self.pinged: BlackjackPlayer | None = None
 		if not multiplayer:
 			self.message = self.start_game()
 		else:
@@ -241,7 +315,7 @@ class BlackjackGame:
 				dealer_cards: list[int] = self.dealer_draw()
 				report += "The dealer's cards are {} ".format(
 					", ".join(
-						BlackjackGame.card_name(card)
+						BlackjackGame.card_name(card, self.rng)
 						for card in dealer_cards),
 				)
 				report += f"for a total of {self.dealerSum}.\n"
@@ -311,12 +385,14 @@ class BlackjackGame:
 		return report
 
 	@staticmethod
-	def card_name(card: int) -> str:
+	def card_name(card: int, rng: BbRandom | None = None) -> str:
 		"""
 		Return the human-friendly name of a card based on int value.
 
 		Args:
 			card (int): The card whose name should be rendered
+			rng (BbRandom or None): The source of randomness for picking a
+				face card; if None, use new_rng() (default is None)
 
 		Returns:
 			str: A human-friendly card name.
@@ -326,7 +402,7 @@ class BlackjackGame:
 			# TODO: this can cause us to draw more of a single facecard
 			# than would exist in the card pool in a real game.
 			# fixing this is not simple
-			return "a " + random.choice(
+			return "a " + (rng or new_rng()).choice(
 				(str(BlackjackGame.FaceVal), "Jack", "Queen", "King"),
 			)
 		if card == BlackjackGame.AceVal:
@@ -380,7 +456,7 @@ class BlackjackGame:
 			int: The value of the top card of the deck.
 
 		"""
-		return self.deck.pop(random.randint(0, len(self.deck) - 1))
+		return self.deck.pop(self.rng.randint(0, len(self.deck) - 1))
 
 	def _deal_cards(self) -> None:
 		"""Deal the starting cards to the dealer and all players."""
@@ -446,8 +522,8 @@ class BlackjackGame:
 			else:
 				message += (
 					f"{p.name.mention} your starting hand consists of "
-					f"{BlackjackGame.card_name(p.hand[0])} "
-					f"and {BlackjackGame.card_name(p.hand[1])}. "
+					f"{BlackjackGame.card_name(p.hand[0], self.rng)} "
+					f"and {BlackjackGame.card_name(p.hand[1], self.rng)}. "
 				)
 				if p.perfect():
 					if not self.multiplayer:
@@ -530,7 +606,7 @@ class BlackjackGame:
 		append_help: bool = True
 		report = (
 			f"{player.name.mention} you were dealt "
-			f"{BlackjackGame.card_name(dealt_card)}, "
+			f"{BlackjackGame.card_name(dealt_card, self.rng)}, "
 			"bringing your total to "
 		)
 		if BlackjackGame.AceVal in player.hand and player.check_bust():
@@ -616,6 +692,183 @@ class BlackjackGame:
 				return p
 		return None
 
+	def expire(self) -> str:
+		"""
+		Settle or close a game that has been abandoned.
+
+		If a round is in progress, every player who has yet to act is stayed,
+		which plays out the dealer and settles all bets as usual. Bets are
+		only ever deducted when a round is settled, so a game that never
+		started needs no refund.
+
+		Returns:
+			str: A report of how the game was closed.
+
+		"""
+		report = "This game of blackjack was closed due to inactivity.\n"
+		while self.started and not self.round_over():
+			report += self.stay_current_player()
+		return report
+
+	def hint(self, player: BlackjackPlayer) -> str:
+		"""
+		Suggest whether a player should hit or stay.
+
+		Looks the player's hand and the dealer's up card up in
+		BlackjackHints, so no simulation happens at request time.
+
+		Args:
+			player (BlackjackPlayer): The player asking for advice
+
+		Returns:
+			str: report
+
+		"""
+		assert self.dealerUp is not None
+		total = sum(player.hand)
+		soft = BlackjackGame.AceVal in player.hand
+		play = (
+			"hit"
+			if BlackjackHints.get((total, soft, self.dealerUp), False)
+			else "stay"
+		)
+		return (
+			f"With a {'soft' if soft else 'hard'} {total} against the dealer's"
+			f" {self.dealerUp}, basic strategy says you should {play},"
+			f" {player.name.mention}."
+		)
+
+	def table_status(self) -> str:
+		"""
+		Summarize the table for its live status message.
+
+		Returns:
+			str: One line for the dealer, then one line per player.
+
+		"""
+		lines = [
+			f"The dealer is showing {self.dealerUp}."
+			if self.started
+			else "Waiting for the owner to start the round.",
+		]
+		for i, p in enumerate(self.players):
+			line = f"{p.name.mention}: bet {p.bet}"
+			if p.hand:
+				cards = ", ".join(str(card) for card in p.hand)
+				line += f", cards {cards} for a total of {sum(p.hand)}"
+			if p is self.owner:
+				line += " (owner)"
+			if self.started and i == self.turn_idx:
+				line += " (to act)"
+			lines.append(line)
+		return "\n".join(lines)
+
+
+class TimingWheel[T: Hashable]:
+	"""
+	Hashed timing wheel for tracking many deadlines cheaply.
+
+	Deadlines are rounded up to the next tick and hashed into one of a fixed
+	number of slots, so scheduling, rescheduling, and cancelling a key are
+	all O(1). Advancing the wheel only visits the slots for the ticks that
+	have elapsed, regardless of how many keys are scheduled.
+
+	Attributes:
+		tick (float): The resolution of the wheel, in seconds
+		slots (list[dict[T, int]]): Each slot maps keys to their deadline tick
+		deadlines (dict[T, int]): The deadline tick of every scheduled key
+		last_tick (int): The most recent tick the wheel has advanced to
+
+	Methods:
+		schedule(key, delay, now):
+			Set, or reset, the deadline for key.
+		cancel(key):
+			Remove the deadline for key, if it has one.
+		advance(now):
+			Pop every key whose deadline has passed.
+
+	"""
+
+	def __init__(self, now: float, tick: float = 1.0, slots: int = 64) -> None:
+		"""
+		Create a new TimingWheel instance.
+
+		Args:
+			now (float): The current time, in seconds
+			tick (float): The resolution of the wheel, in seconds
+				(default is 1.0)
+			slots (int): The number of slots in the wheel (default is 64)
+
+		"""
+		self.tick = tick
+		self.slots: list[dict[T, int]] = [{} for _ in range(slots)]
+		self.deadlines: dict[T, int] = {}
+		self.last_tick = math.floor(now / tick)
+
+	def __len__(self) -> int:
+		"""
+		Count the keys currently scheduled.
+
+		Returns:
+			int: The number of scheduled keys.
+
+		"""
+		return len(self.deadlines)
+
+	def schedule(self, key: T, delay: float, now: float) -> None:
+		"""
+		Set, or reset, the deadline for key.
+
+		Args:
+			key (T): The key to schedule
+			delay (float): How long from now the deadline should be, in seconds
+			now (float): The current time, in seconds
+
+		"""
+		self.cancel(key)
+		deadline = max(math.ceil((now + delay) / self.tick), self.last_tick + 1)
+		self.slots[deadline % len(self.slots)][key] = deadline
+		self.deadlines[key] = deadline
+
+	def cancel(self, key: T) -> None:
+		"""
+		Remove the deadline for key, if it has one.
+
+		Args:
+			key (T): The key to cancel
+
+		"""
+		if (deadline := self.deadlines.pop(key, None)) is not None:
+			del self.slots[deadline % len(self.slots)][key]
+
+	def advance(self, now: float) -> list[T]:
+		"""
+		Pop every key whose deadline has passed.
+
+		If more than a full rotation has elapsed since the last advance, each
+		slot only needs to be visited once.
+
+		Args:
+			now (float): The current time, in seconds
+
+		Returns:
+			list[T]: The expired keys, in no particular order.
+
+		"""
+		target = math.floor(now / self.tick)
+		expired: list[T] = []
+		for t in range(
+			self.last_tick + 1,
+			self.last_tick + 1 + min(target - self.last_tick, len(self.slots)),
+		):
+			slot = self.slots[t % len(self.slots)]
+			for key in [k for k, tick in slot.items() if tick <= target]:
+				del slot[key]
+				del self.deadlines[key]
+				expired.append(key)
+		self.last_tick = max(self.last_tick, target)
+		return expired
+
 
 class MoneyFlags(Enum):
 	"""Enum for additional readability in the writeMoney method."""
@@ -823,19 +1076,25 @@ def leaderboard(
 	return emb
 
 
-def flip(author: nextcord.User | nextcord.Member, bet: str | int) -> str:
+def flip(
+	author: nextcord.User | nextcord.Member,
+	bet: str | int,
+	rng: BbRandom | None = None,
+) -> str:
 	"""
 	Gamble a certain number of BeardlessBucks on a coin toss.
 
 	Args:
 		author (nextcord.User or Member): The user who is gambling
 		bet (str): The amount author is wagering
+		rng (BbRandom or None): The source of randomness; if None, use
+			new_rng() (default is None)
 
 	Returns:
 		str: A report of the outcome and how author's balance changed.
 
 	"""
-	heads = random.randint(0, 1)
+	heads = (rng or new_rng()).flip()
 	report = InvalidBetMsg
 	assert "," not in author.name
 	if bet == "all":
@@ -923,6 +1182,9 @@ def make_bet(
 def blackjack(
 	author: nextcord.User | nextcord.Member,
 	bet: str | int | None,
+	rng: BbRandom | None = None,
+	*,
+	context: str = "",
 ) -> tuple[str, BlackjackGame | None]:
 	"""
 	Gamble a certain number of BeardlessBucks on blackjack.
@@ -931,6 +1193,10 @@ def blackjack(
 		author (nextcord.User or Member): The user who is gambling
 		bet (str | int | None): The amount author is wagering.
 			if None then a multiplayer game is created & returned
+		rng (BbRandom or None): The source of randomness for the game; if
+			None, use new_rng() (default is None)
+		context (str): What started the game, logged with the seed of a
+			new rng (default is "")
 
 	Returns:
 		str: A report of the outcome and how author's balance changed.
@@ -942,7 +1208,9 @@ def blackjack(
 	game = None
 	if bet is None:
 		# bet being None means user wants a multiplayer game
-		game = BlackjackGame(author, multiplayer=True)
+		game = BlackjackGame(
+			author, multiplayer=True, rng=rng, context=context,
+		)
 		report = game.message
 		return report.format(author.mention), game
 	if isinstance(bet, str) and bet != "all":
@@ -954,7 +1222,9 @@ def blackjack(
 		(isinstance(bet, str) and bet == "all")
 		or (isinstance(bet, int) and bet >= 0)
 	):
-		game = BlackjackGame(author, multiplayer=False)
+		game = BlackjackGame(
+			author, multiplayer=False, rng=rng, context=context,
+		)
 		report, bet = make_bet(author, game, bet)
 		player = game.players[0]
 		player.bet = bet
@@ -0,0 +1,354 @@
+"""
+Beardless Bot HTTP record/replay cassettes.
+
+A Cassette sits under every httpx client the bot makes, including the
+shared pooled clients and one-off httpx.get calls. In record mode, each
+response from a live upstream is saved to a JSON file as it passes
+through. In replay mode, the same file answers every request without
+touching the network, optionally after an injected delay or with an
+injected failure, so that command paths and caching strategies can be
+benchmarked offline and reproducibly.
+
+Run `python3 cassette.py --help` to record a cassette of GET requests.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from base64 import b64decode, b64encode
+from collections import defaultdict
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Final, Literal, Self
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+type CassetteMode = Literal["record", "replay"]
+
+# Query parameters that never reach a cassette file or its request keys.
+SecretParams: Final[tuple[str, ...]] = ("api_key",)
+# Headers that describe the wire encoding rather than the content. Bodies
+# are stored decoded, so these would no longer be true on replay.
+DroppedHeaders: Final[frozenset[str]] = frozenset(
+	("content-encoding", "content-length", "transfer-encoding"),
+)
+
+
+def request_key(request: httpx.Request) -> str:
+	"""
+	Identify a request by its method and URL, minus any secrets.
+
+	Args:
+		request (httpx.Request): The request to identify
+
+	Returns:
+		str: The key the request's responses are filed under.
+
+	"""
+	url = request.url
+	for param in SecretParams:
+		url = url.copy_remove_param(param)
+	return f"{request.method} {url}"
+
+
+class Cassette:
+	"""
+	Record/replay store for the responses to the bot's HTTP requests.
+
+	Use as a context manager; while it is open, every httpx transport in
+	the process goes through it. Replay cycles through the responses
+	recorded for each request key, so a request made more often than it
+	was recorded gets the same answers again, in order.
+
+	Attributes:
+		path (Path): The JSON file responses are stored in
+		mode (CassetteMode): "record" to call upstreams and save their
+			responses, "replay" to answer from path alone
+		latency (float): Seconds to wait before each replayed response
+		jitter (float): Up to this many extra seconds are added to latency,
+			uniformly at random
+		error_rate (float): The chance that a replayed request fails
+		error_status (int | None): The status of an injected failure; if
+			None, an injected failure raises httpx.ConnectError instead
+		rng (random.Random): The source of jitter and injected failures
+		interactions (defaultdict[str, list[dict[str, Any]]]): The stored
+			responses, by request key
+		positions (defaultdict[str, int]): How many responses have been
+			replayed for each request key
+		injected (int): How many failures have been injected
+		originals (tuple[tuple[type, str, Any], ...] | None): Each patched
+			transport class, method name, and original method, while the
+			cassette is open
+
+	Methods:
+		load():
+			Read the stored responses from path
+		save():
+			Write the stored responses to path
+		record(request, response, body):
+			Store a response and rebuild it around its read body
+		replay(request):
+			Build the next stored response to a request
+		delay():
+			Pick how long to wait before a replayed response
+		failure(request):
+			Build an injected failure, or None if this request succeeds
+
+	"""
+
+	def __init__(  # noqa: PLR0913
+		self,
+		path: Path,
+		mode: CassetteMode = "replay",
+		*,
+		latency: float = 0,
+		jitter: float = 0,
+		error_rate: float = 0,
+		error_status: int | None = 503,
+		seed: int | None = None,
+	) -> None:
+		"""
+		Create a new Cassette instance.
+
+		Args:
+			path (Path): The JSON file responses are stored in
+			mode (CassetteMode): "record" or "replay" (default is "replay")
+			latency (float): Seconds to wait before each replayed response
+				(default is 0)
+			jitter (float): Maximum extra seconds of random delay
+				(default is 0)
+			error_rate (float): The chance that a replayed request fails
+				(default is 0)
+			error_status (int | None): The status of an injected failure,
+				or None to raise httpx.ConnectError (default is 503)
+			seed (int | None): The seed for jitter and injected failures
+				(default is None)
+
+		"""
+		self.path = path
+		self.mode: CassetteMode = mode
+		self.latency = latency
+		self.jitter = jitter
+		self.error_rate = error_rate
+		self.error_status = error_status
+		self.rng = random.Random(seed)
+		self.interactions: defaultdict[str, list[dict[str, Any]]] = (
+			defaultdict(list)
+		)
+		self.positions: defaultdict[str, int] = defaultdict(int)
+		self.injected = 0
+		self.originals: tuple[tuple[type, str, Any], ...] | None = None
+
+	def load(self) -> None:
+		"""Read the stored responses from path, if it exists."""
+		self.interactions.clear()
+		self.positions.clear()
+		try:
+			with self.path.open("r", encoding="UTF-8") as f:
+				self.interactions.update(json.load(f))
+		except FileNotFoundError:
+			if self.mode == "replay":
+				raise
+
+	def save(self) -> None:
+		"""Write the stored responses to path."""
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		with self.path.open("w", encoding="UTF-8") as f:
+			json.dump(self.interactions, f, indent="\t")
+
+	def record(
+		self, request: httpx.Request, response: httpx.Response, body: bytes,
+	) -> httpx.Response:
+		"""
+		Store a response and rebuild it around its read body.
+
+		Args:
+			request (httpx.Request): The request the response answers
+			response (httpx.Response): The live response
+			body (bytes): The response's decoded body
+
+		Returns:
+			httpx.Response: A response equivalent to the live one.
+
+		"""
+		headers = [
+			(k, v) for k, v in response.headers.multi_items()
+			if k.lower() not in DroppedHeaders
+		]
+		self.interactions[request_key(request)].append({
+			"status": response.status_code,
+			"headers": headers,
+			"body": b64encode(body).decode(),
+		})
+		return httpx.Response(
+			response.status_code,
+			headers=headers,
+			content=body,
+			request=request,
+		)
+
+	def replay(self, request: httpx.Request) -> httpx.Response:
+		"""
+		Build the next stored response to a request.
+
+		Args:
+			request (httpx.Request): The request to answer
+
+		Returns:
+			httpx.Response: The stored response.
+
+		Raises:
+			httpx.ConnectError: If no response to the request was recorded.
+
+		"""
+		key = request_key(request)
+		if not (stored := self.interactions.get(key)):
+			msg = f"No recorded response for {key}"
+			raise httpx.ConnectError(msg, request=request)
+		entry = stored[self.positions[key] % len(stored)]
+		self.positions[key] += 1
+		return httpx.Response(
+			entry["status"],
+			headers=[tuple(pair) for pair in entry["headers"]],
+			content=b64decode(entry["body"]),
+			request=request,
+		)
+
+	def delay(self) -> float:
+		"""
+		Pick how long to wait before a replayed response.
+
+		Returns:
+			float: The delay, in seconds.
+
+		"""
+		if self.jitter:
+			return self.latency + self.rng.uniform(0, self.jitter)
+		return self.latency
+
+	def failure(self, request: httpx.Request) -> httpx.Response | None:
+		"""
+		Build an injected failure, or None if this request succeeds.
+
+		Args:
+			request (httpx.Request): The request to maybe fail
+
+		Returns:
+			httpx.Response | None: An error response, or None if the
+				request is not failed.
+
+		Raises:
+			httpx.ConnectError: If the request is failed and error_status
+				is None.
+
+		"""
+		if not self.error_rate or self.rng.random() >= self.error_rate:
+			return None
+		self.injected += 1
+		if self.error_status is None:
+			msg = f"Injected failure for {request_key(request)}"
+			raise httpx.ConnectError(msg, request=request)
+		return httpx.Response(self.error_status, request=request)
+
+	def __enter__(self) -> Self:
+		"""
+		Load the stored responses and patch every httpx transport.
+
+		Raises:
+			RuntimeError: If the cassette is already open.
+
+		"""
+		if self.originals is not None:
+			msg = "Cassette is already open"
+			raise RuntimeError(msg)
+		self.load()
+		send_async = httpx.AsyncHTTPTransport.handle_async_request
+		send_sync = httpx.HTTPTransport.handle_request
+
+		async def handle_async_request(
+			transport: httpx.AsyncHTTPTransport, request: httpx.Request,
+		) -> httpx.Response:
+			if self.mode == "record":
+				response = await send_async(transport, request)
+				body = await response.aread()
+				await response.aclose()
+				return self.record(request, response, body)
+			if delay := self.delay():
+				await asyncio.sleep(delay)
+			return self.failure(request) or self.replay(request)
+
+		def handle_request(
+			transport: httpx.HTTPTransport, request: httpx.Request,
+		) -> httpx.Response:
+			if self.mode == "record":
+				response = send_sync(transport, request)
+				body = response.read()
+				response.close()
+				return self.record(request, response, body)
+			if delay := self.delay():
+				time.sleep(delay)
+			return self.failure(request) or self.replay(request)
+
+		patches = (
+			(httpx.AsyncHTTPTransport, "handle_async_request", send_async),
+			(httpx.HTTPTransport, "handle_request", send_sync),
+		)
+		self.originals = patches
+		for (cls, name, _), patch in zip(
+			patches, (handle_async_request, handle_request), strict=True,
+		):
+			setattr(cls, name, patch)
+		return self
+
+	def __exit__(
+		self,
+		exc_type: type[BaseException] | None,
+		exc: BaseException | None,
+		tb: TracebackType | None,
+	) -> None:
+		"""Restore the httpx transports and save a recording."""
+		assert self.originals is not None
+		for cls, name, original in self.originals:
+			setattr(cls, name, original)
+		self.originals = None
+		if self.mode == "record":
+			self.save()
+
+
+def main() -> None:
+	"""Record the responses to a list of GET requests into a cassette."""
+	parser = argparse.ArgumentParser(
+		description="Record a cassette of responses for offline replay.",
+	)
+	parser.add_argument("path", type=Path, help="The cassette file to write.")
+	parser.add_argument("urls", nargs="+", help="The URLs to GET.")
+	parser.add_argument(
+		"--append",
+		action="store_true",
+		help="Keep the responses already in the cassette.",
+	)
+	args = parser.parse_args()
+
+	if not args.append:
+		args.path.unlink(missing_ok=True)
+	with Cassette(args.path, "record") as cassette, httpx.Client(
+		timeout=10, follow_redirects=True,
+	) as client:
+		for url in args.urls:
+			r = client.get(url)
+			logger.info("%s %i", url, r.status_code)
+	logger.info(
+		"Recorded %i responses to %s",
+		sum(map(len, cassette.interactions.values())),
+		args.path,
+	)
+
+
+if __name__ == "__main__":  # pragma: no cover
+	logging.basicConfig(format="%(message)s", level=logging.INFO)
+	main()
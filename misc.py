@@ -1,12 +1,18 @@
 """Beardless Bot miscellaneous methods."""
 
+import asyncio
+import heapq
 import logging
 import random
 import re
-from collections.abc import Mapping
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable, Mapping, Sequence
 from datetime import datetime
-from json import loads
+from hashlib import sha256
+from itertools import count
+from json import dump, load, loads
 from pathlib import Path
+from time import monotonic
 from typing import Any, Final, override
 from urllib.parse import quote_plus
 from zoneinfo import ZoneInfo
@@ -20,8 +26,10 @@ from nextcord.utils import get
 logger = logging.getLogger(__name__)
 
 MaxMsgLength: Final[int] = 1024
+MaxDescLength: Final[int] = 4096
 MaxEmbedFields: Final[int] = 25
 Ok: Final[int] = 200
+NotModified: Final[int] = 304
 BadRequest: Final[int] = 404
 BbColor: Final[int] = 0xFFF994
 BbId: Final[int] = 654133911558946837
@@ -73,6 +81,10 @@ BearRootUrl = "https://placebear.com/{}/{}"
 FrogRootUrl = "https://raw.githubusercontent.com/a9-i/frog/main/ImgSetOpt/"
 SealRootUrl = "https://focabot.github.io/random-seal/seals/{}.jpg"
 
+# Upstreams requested through a shared client from http_client.
+GitHubRoot = "https://github.com/"
+DogApiRoot = "https://dog.ceo/api/"
+
 BotContext = commands.Context[commands.Bot]
 
 TargetTypes = str | nextcord.User | nextcord.Member
@@ -278,6 +290,599 @@ def fetch_avatar(
 	return user.default_avatar.url
 
 
+# Long-lived HTTP clients, one per upstream host. Reusing a client keeps its
+# connections alive between requests, so only the first request to a host
+# pays for TCP and TLS setup.
+HttpLimits = httpx.Limits(
+	max_connections=20, max_keepalive_connections=10, keepalive_expiry=60,
+)
+HttpClients: dict[
+	str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient],
+] = {}
+
+
+def http_client(
+	base_url: str,
+	*,
+	limits: httpx.Limits | None = None,
+	http2: bool = False,
+) -> httpx.AsyncClient:
+	"""
+	Get the shared client for an upstream host, creating it if needed.
+
+	A client's connection pool belongs to the event loop it was created on,
+	so a client left over from a different loop is replaced, not reused.
+
+	Args:
+		base_url (str): The root URL of the host; requests made with the
+			client are relative to it
+		limits (httpx.Limits | None): Connection pool limits for a new
+			client; if None, use HttpLimits (default is None)
+		http2 (bool): Whether a new client should negotiate HTTP/2, which
+			requires the h2 package (default is False)
+
+	Returns:
+		httpx.AsyncClient: The shared client.
+
+	"""
+	loop = asyncio.get_running_loop()
+	if (
+		(entry := HttpClients.get(base_url)) is not None
+		and entry[0] is loop
+		and not entry[1].is_closed
+	):
+		return entry[1]
+	client = httpx.AsyncClient(
+		base_url=base_url,
+		timeout=10,
+		limits=limits or HttpLimits,
+		http2=http2,
+	)
+	HttpClients[base_url] = (loop, client)
+	return client
+
+
+async def close_http_clients() -> None:
+	"""Close every shared HTTP client made on the running event loop."""
+	loop = asyncio.get_running_loop()
+	for base_url, (client_loop, client) in list(HttpClients.items()):
+		del HttpClients[base_url]
+		if client_loop is loop:
+			await client.aclose()
+
+
+# Coroutine functions that BbBot awaits on shutdown, before closing the shared
+# HTTP clients, such as ones that flush writes still waiting to go to disk.
+ShutdownHooks: list[Callable[[], Coroutine[Any, Any, None]]] = []
+
+
+class BbBot(commands.Bot):
+	"""
+	commands.Bot that also cleans up after the rest of the bot on shutdown.
+
+	Every hook in ShutdownHooks is awaited, and then the shared HTTP clients
+	are closed.
+	"""
+
+	@override
+	async def close(self) -> None:
+		for hook in ShutdownHooks:
+			await hook()
+		await close_http_clients()
+		await super().close()
+
+
+class TtlCache[K: Hashable, V]:
+	"""
+	Size-bounded cache whose entries each expire after their own TTL.
+
+	Entries are kept in least-recently-used order. Once the cache holds
+	maxsize entries, adding another evicts the least recently used one.
+	Expired entries are dropped lazily, when they are next looked up.
+
+	Attributes:
+		maxsize (int): The most entries the cache will hold
+		entries (OrderedDict[K, tuple[float, float, V]]): Each key's
+			expiry time, the time it was stored, and its value, least
+			recently used first
+		hits (int): How many lookups found a live entry
+		misses (int): How many lookups found nothing, or an expired entry
+
+	Methods:
+		get(key, now):
+			Returns the live value for key, or None.
+		lookup(key, now):
+			Returns the live value for key and when it was stored, or None.
+		put(key, value, ttl, now):
+			Caches value under key for ttl seconds.
+		discard(key):
+			Drops the entry for key, if there is one.
+		clear():
+			Drops every entry and resets the counters.
+
+	"""
+
+	def __init__(self, maxsize: int = 256) -> None:
+		"""
+		Create a new TtlCache instance.
+
+		Args:
+			maxsize (int): The most entries the cache will hold
+				(default is 256)
+
+		"""
+		self.maxsize = maxsize
+		self.entries: OrderedDict[K, tuple[float, float, V]] = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self) -> int:
+		"""
+		Count the entries in the cache, live or expired.
+
+		Returns:
+			int: The number of entries.
+
+		"""
+		return len(self.entries)
+
+	def get(self, key: K, now: float) -> V | None:
+		"""
+		Look up the live value for key, marking it as recently used.
+
+		Args:
+			key (K): The key to look up
+			now (float): The current time, in seconds
+
+		Returns:
+			V | None: The cached value, or None if there is no live entry.
+
+		"""
+		return None if (hit := self.lookup(key, now)) is None else hit[0]
+
+	def lookup(self, key: K, now: float) -> tuple[V, float] | None:
+		"""
+		Look up the live value for key and when it was stored.
+
+		Args:
+			key (K): The key to look up
+			now (float): The current time, in seconds
+
+		Returns:
+			tuple[V, float] | None: The cached value and the time it was
+			stored, or None if there is no live entry.
+
+		"""
+		if (entry := self.entries.get(key)) is None or entry[0] <= now:
+			self.entries.pop(key, None)
+			self.misses += 1
+			return None
+		self.entries.move_to_end(key)
+		self.hits += 1
+		return entry[2], entry[1]
+
+	def put(self, key: K, value: V, ttl: float, now: float) -> None:
+		"""
+		Cache value under key for ttl seconds.
+
+		Args:
+			key (K): The key to cache under
+			value (V): The value to cache
+			ttl (float): How long the entry should live, in seconds
+			now (float): The current time, in seconds
+
+		"""
+		self.entries[key] = (now + ttl, now, value)
+		self.entries.move_to_end(key)
+		while len(self.entries) > self.maxsize:
+			self.entries.popitem(last=False)
+
+	def discard(self, key: K) -> None:
+		"""
+		Drop the entry for key, if there is one.
+
+		Args:
+			key (K): The key to drop
+
+		"""
+		self.entries.pop(key, None)
+
+	def clear(self) -> None:
+		"""Drop every entry and reset the counters."""
+		self.entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+
+class SingleFlight[K: Hashable, V]:
+	"""
+	Deduplicator for concurrent calls that would fetch the same thing.
+
+	While a call for a key is in flight, further calls for that key wait on
+	its result instead of making their own. Each caller waits on a shield,
+	so a caller being cancelled does not cancel the call for the others.
+
+	Attributes:
+		calls (dict[K, asyncio.Task[V]]): The call in flight for each key
+		coalesced (int): How many calls were answered by another's result
+
+	Methods:
+		run(key, fetch):
+			Returns the result of the call in flight for key, or of a new
+			call to fetch if there is none.
+
+	"""
+
+	def __init__(self) -> None:
+		"""Create a new SingleFlight instance."""
+		self.calls: dict[K, asyncio.Task[V]] = {}
+		self.coalesced = 0
+
+	async def run(
+		self, key: K, fetch: Callable[[], Coroutine[Any, Any, V]],
+	) -> V:
+		"""
+		Join the call in flight for key, or start one.
+
+		Args:
+			key (K): What the call fetches
+			fetch (Callable[[], Coroutine[Any, Any, V]]): Makes the call, if
+				none is in flight for key
+
+		Returns:
+			V: The call's result.
+
+		Raises:
+			Exception: Whatever the call raised.
+
+		"""
+		if (task := self.calls.get(key)) is not None:
+			self.coalesced += 1
+		else:
+			task = asyncio.create_task(fetch())
+			self.calls[key] = task
+			task.add_done_callback(lambda _: self.calls.pop(key, None))
+		return await asyncio.shield(task)
+
+
+class RateLimitError(httpx.RequestError):
+	"""Exception raised when a RateLimiter's queue is already full."""
+
+
+class RateLimiter:
+	"""
+	Token-bucket rate limiter with a priority queue in front of it.
+
+	Each quota is a bucket holding up to limit tokens, refilled evenly over
+	period seconds; a request needs one token from every bucket. Requests
+	that cannot go yet wait in a queue, ordered first by priority, then by
+	fair queuing between keys: a key's nth waiting request goes after every
+	other key's (n - 1)th, so one busy guild cannot starve the rest. A
+	request queued under a flight id can later be promoted to a higher
+	priority, for when a more urgent caller comes to share its response.
+
+	Attributes:
+		Interactive (int): Priority for requests a user is waiting on
+		Background (int): Priority for requests nobody is waiting on
+		quotas (tuple[tuple[int, float], ...]): Each bucket's limit and
+			period, in seconds
+		tokens (list[float]): The tokens left in each bucket
+		updated (float): When the buckets were last refilled
+		maxqueue (int): The most requests that may wait at once
+		waiters (list[tuple[int, int, int, asyncio.Future[None]]]): Heap of
+			waiting requests, as priority, fair-queuing tag, arrival order,
+			and the future to resolve once the request may go
+		tags (dict[Hashable, int]): Each key's latest fair-queuing tag
+		flights (dict[Hashable, asyncio.Future[None]]): The future of each
+			waiting request queued under a flight id
+		virtual (int): The tag of the request that went most recently
+		arrivals (count[int]): Numbers waiting requests in arrival order
+		dispatcher (asyncio.Task[None] | None): The task releasing waiters
+
+	Methods:
+		acquire(priority, key, flight):
+			Waits until a request may go, then spends its tokens.
+		promote(flight, priority):
+			Raises the priority of the request waiting for a flight.
+		drain():
+			Empties every bucket, as if the quota had just been used up.
+
+	"""
+
+	Interactive: Final[int] = 0
+	Background: Final[int] = 1
+
+	def __init__(
+		self, quotas: Sequence[tuple[int, float]], maxqueue: int = 100,
+	) -> None:
+		"""
+		Create a new RateLimiter instance, with every bucket full.
+
+		Args:
+			quotas (Sequence[tuple[int, float]]): Each bucket's limit and
+				period, in seconds
+			maxqueue (int): The most requests that may wait at once
+				(default is 100)
+
+		"""
+		self.quotas = tuple(quotas)
+		self.tokens = [float(limit) for limit, _ in self.quotas]
+		self.updated = monotonic()
+		self.maxqueue = maxqueue
+		self.waiters: list[tuple[int, int, int, asyncio.Future[None]]] = []
+		self.tags: dict[Hashable, int] = {}
+		self.flights: dict[Hashable, asyncio.Future[None]] = {}
+		self.virtual = 0
+		self.arrivals = count()
+		self.dispatcher: asyncio.Task[None] | None = None
+
+	def refill(self) -> float:
+		"""
+		Top up every bucket for the time passed since the last refill.
+
+		Returns:
+			float: How long until every bucket has a token, in seconds.
+
+		"""
+		now = monotonic()
+		elapsed, self.updated = now - self.updated, now
+		wait = 0.0
+		for i, (limit, period) in enumerate(self.quotas):
+			self.tokens[i] = min(
+				limit, self.tokens[i] + elapsed * limit / period,
+			)
+			wait = max(wait, (1 - self.tokens[i]) * period / limit)
+		return wait
+
+	async def acquire(
+		self,
+		priority: int = Interactive,
+		key: Hashable = None,
+		flight: Hashable = None,
+	) -> None:
+		"""
+		Wait until a request may go, then spend one token from each bucket.
+
+		Args:
+			priority (int): Lower goes first; see Interactive and Background
+				(default is Interactive)
+			key (Hashable): What to queue fairly by, such as a guild id
+				(default is None)
+			flight (Hashable): The id to promote the request by while it
+				waits; if None, it cannot be promoted (default is None)
+
+		Raises:
+			RateLimitError: If maxqueue requests are already waiting.
+
+		"""
+		if not self.waiters and self.refill() == 0:
+			self.tokens = [tokens - 1 for tokens in self.tokens]
+			return
+		if len(self.waiters) >= self.maxqueue:
+			msg = "Rate limiter queue is full"
+			raise RateLimitError(msg)
+		tag = max(self.virtual, self.tags.get(key, 0)) + 1
+		self.tags[key] = tag
+		future = asyncio.get_running_loop().create_future()
+		heapq.heappush(
+			self.waiters, (priority, tag, next(self.arrivals), future),
+		)
+		if self.dispatcher is None or self.dispatcher.done():
+			self.dispatcher = asyncio.create_task(self.dispatch())
+		if flight is None:
+			await future
+			return
+		self.flights[flight] = future
+		try:
+			await future
+		finally:
+			if self.flights.get(flight) is future:
+				del self.flights[flight]
+
+	def promote(self, flight: Hashable, priority: int) -> None:
+		"""
+		Raise the priority of the request waiting for a flight.
+
+		Args:
+			flight (Hashable): The flight id the request was queued under
+			priority (int): The new priority; ignored unless it is higher,
+				that is, lower, than the request's own
+
+		"""
+		if (future := self.flights.get(flight)) is None:
+			return
+		for i, (old, tag, arrival, waiter) in enumerate(self.waiters):
+			if waiter is future:
+				if priority < old:
+					self.waiters[i] = priority, tag, arrival, waiter
+					heapq.heapify(self.waiters)
+				return
+
+	async def dispatch(self) -> None:
+		"""Release waiters in queue order, as tokens become available."""
+		while self.waiters:
+			if (wait := self.refill()) > 0:
+				await asyncio.sleep(wait)
+				continue
+			_, tag, _, future = heapq.heappop(self.waiters)
+			if future.done():
+				# The waiter was cancelled; its tokens go to the next one.
+				continue
+			self.tokens = [tokens - 1 for tokens in self.tokens]
+			self.virtual = tag
+			future.set_result(None)
+		self.tags.clear()
+		self.virtual = 0
+
+	def drain(self) -> None:
+		"""Empty every bucket, so that the next request waits for a refill."""
+		self.refill()
+		self.tokens = [0.0] * len(self.quotas)
+
+
+class HttpCache:
+	"""
+	On-disk cache of parsed HTTP responses, revalidated on every request.
+
+	A response is parsed once, and the parsed value is stored with the
+	response's ETag and Last-Modified validators. Later requests for the
+	same resource send them back as If-None-Match and If-Modified-Since, so
+	a resource that has not changed costs a 304 Not Modified response and
+	no parsing. Responses without validators are parsed every time and not
+	stored. Parsed values must be JSON-serializable, and are shared between
+	callers, so they must not be mutated.
+
+	Attributes:
+		root (Path): The directory entries are stored in, one file each
+		entries (dict[str, dict[str, Any]]): The entries read or stored so
+			far, by key
+		hits (int): How many requests were answered with a 304
+		misses (int): How many requests had to parse a full response
+
+	Methods:
+		headers(key):
+			Returns the conditional request headers for key.
+		resolve(key, r, parse):
+			Returns the value for a response to a conditional request, and
+			whether it was modified.
+		fetch(client, url, parse, key=None):
+			Makes a conditional request, and returns the value.
+
+	"""
+
+	def __init__(self, root: Path) -> None:
+		"""
+		Create a new HttpCache instance.
+
+		Args:
+			root (Path): The directory to store entries in; it is created
+				when the first entry is stored
+
+		"""
+		self.root = root
+		self.entries: dict[str, dict[str, Any]] = {}
+		self.hits = 0
+		self.misses = 0
+
+	def path(self, key: str) -> Path:
+		"""Return the file that stores the entry for key."""
+		return self.root / (sha256(key.encode()).hexdigest() + ".json")
+
+	def entry(self, key: str) -> dict[str, Any] | None:
+		"""Return the stored entry for key, reading it from disk once."""
+		if key not in self.entries:
+			try:
+				with self.path(key).open("r", encoding="UTF-8") as f:
+					entry = load(f)
+			except (OSError, ValueError):
+				return None
+			if not isinstance(entry, dict) or entry.get("key") != key:
+				return None
+			self.entries[key] = entry
+		return self.entries[key]
+
+	def headers(self, key: str) -> dict[str, str]:
+		"""
+		Build the conditional request headers for a resource.
+
+		Args:
+			key (str): The resource's cache key
+
+		Returns:
+			dict[str, str]: If-None-Match and If-Modified-Since headers for
+			whichever validators the stored entry has; empty if there is no
+			stored entry.
+
+		"""
+		if (entry := self.entry(key)) is None:
+			return {}
+		headers = {}
+		if entry["etag"]:
+			headers["If-None-Match"] = entry["etag"]
+		if entry["last_modified"]:
+			headers["If-Modified-Since"] = entry["last_modified"]
+		return headers
+
+	def resolve[T](
+		self,
+		key: str,
+		r: httpx.Response,
+		parse: Callable[[httpx.Response], T],
+	) -> tuple[T, bool] | None:
+		"""
+		Get the value for the response to a conditional request.
+
+		Args:
+			key (str): The resource's cache key
+			r (httpx.Response): The response
+			parse (Callable[[httpx.Response], T]): Parses a full response
+
+		Returns:
+			tuple[T, bool] | None: The stored value and False if the
+			response was a 304, the newly parsed value and True if it was a
+			200, or None otherwise.
+
+		"""
+		if r.status_code == NotModified and key in self.entries:
+			self.hits += 1
+			value: T = self.entries[key]["value"]
+			return value, False
+		if r.status_code != Ok:
+			return None
+		self.misses += 1
+		value = parse(r)
+		etag = r.headers.get("ETag")
+		last_modified = r.headers.get("Last-Modified")
+		if etag or last_modified:
+			entry = {
+				"key": key,
+				"etag": etag,
+				"last_modified": last_modified,
+				"value": value,
+			}
+			self.entries[key] = entry
+			try:
+				self.root.mkdir(parents=True, exist_ok=True)
+				temp = self.path(key).with_suffix(".tmp")
+				with temp.open("w", encoding="UTF-8") as f:
+					dump(entry, f)
+				temp.replace(self.path(key))
+			except OSError:
+				logger.warning("Failed to write HTTP cache entry for %s", key)
+		return value, True
+
+	async def fetch[T](
+		self,
+		client: httpx.AsyncClient,
+		url: str,
+		parse: Callable[[httpx.Response], T],
+		key: str | None = None,
+	) -> T | None:
+		"""
+		Request a resource, revalidating the stored copy if there is one.
+
+		Args:
+			client (httpx.AsyncClient): The client to make the request with
+			url (str): The resource's URL
+			parse (Callable[[httpx.Response], T]): Parses a full response
+			key (str | None): The resource's cache key, for URLs that hold
+				secrets such as API keys; if None, the URL (default is None)
+
+		Returns:
+			T | None: The resource's value, or None if the request failed.
+
+		"""
+		key = key or url
+		r = await client.get(url, headers=self.headers(key))
+		resolved = self.resolve(key, r, parse)
+		return None if resolved is None else resolved[0]
+
+
+# Slowly changing upstream resources, such as the lists of frog and moose
+# pictures and of dog breeds, are kept here between runs.
+HttpDiskCache = HttpCache(Path("resources/httpCache"))
+
+
 class AnimalException(httpx.RequestError):
 	"""Exception raised when an Animal API call fails."""
 
@@ -331,21 +936,34 @@ async def fetch_animal(url: str, *args: str | int) -> str | None:
 	return None
 
 
-async def get_moose() -> str:
-	async with httpx.AsyncClient(timeout=10) as client:
-		r = await client.get("https://github.com/LevBernstein/moosePictures/")
-	if r.status_code == Ok:
-		soup = BeautifulSoup(r.content.decode("utf-8"), "html.parser")
-		moose = random.choice(
-			tuple(
-				m for m in soup.stripped_strings
-				if m.startswith("moose") and m.endswith(".jpg")
-			),
-		)
+def parse_moose_list(r: httpx.Response) -> list[str]:
+	"""
+	Parse the moose picture filenames out of the GitHub repo page.
+
+	Args:
+		r (httpx.Response): The response from the moosePictures repo
+
+	Returns:
+		list[str]: The filenames of every moose picture.
+
+	"""
+	soup = BeautifulSoup(r.content.decode("utf-8"), "html.parser")
+	return [
+		m for m in soup.stripped_strings
+		if m.startswith("moose") and m.endswith(".jpg")
+	]
 
+
+async def get_moose() -> str:
+	pictures = await HttpDiskCache.fetch(
+		http_client(GitHubRoot),
+		GitHubRoot + "LevBernstein/moosePictures/",
+		parse_moose_list,
+	)
+	if pictures is not None:
 		return (
 			"https://raw.githubusercontent.com/"
-			f"LevBernstein/moosePictures/main/{moose}"
+			f"LevBernstein/moosePictures/main/{random.choice(pictures)}"
 		)
 	raise AnimalException(animal="moose")
 
@@ -361,12 +979,13 @@ async def get_dog(breed: str | None = None) -> str:
 	elif breed == "moose":
 		return await get_moose()
 	elif breed.startswith("breed"):
-		async with httpx.AsyncClient(timeout=10) as client:
-			r = await client.get("https://dog.ceo/api/breeds/list/all")
-		if r.status_code == Ok:
-			return "Dog breeds: {}.".format(
-				", ".join(dog for dog in r.json()["message"]),
-			)
+		breeds = await HttpDiskCache.fetch(
+			http_client(DogApiRoot),
+			DogApiRoot + "breeds/list/all",
+			lambda r: list(r.json()["message"]),
+		)
+		if breeds is not None:
+			return "Dog breeds: {}.".format(", ".join(breeds))
 	elif breed.isalpha() and isinstance(
 		message := await fetch_animal(
 			f"https://dog.ceo/api/breed/{breed}/images/random", "message",
@@ -378,7 +997,7 @@ async def get_dog(breed: str | None = None) -> str:
 	raise AnimalException(animal="dog")
 
 
-def get_frog_list() -> list[str]:
+async def get_frog_list() -> list[str]:
 	"""
 	Get a list of filenames of frog images.
 
@@ -387,30 +1006,47 @@ def get_frog_list() -> list[str]:
 	When that happens, massage the response a bit so that the proper payload
 	can be located.
 
-	Amortize the cost of pulling the frog images by making just one initial
-	call within misc.py.
+	Amortize the cost of pulling the frog images by keeping the list in
+	FrogList once it has been fetched; the first request is a conditional
+	one if the list is in HttpDiskCache from an earlier run. A failed
+	request, or a page that can't be parsed, never raises; the list from an
+	earlier run is used instead, if there is one.
 
 	Returns:
-		list[str]: A list of frog image filenames.
+		list[str]: A list of frog image filenames; empty if GitHub could not
+		be reached and no list was stored by an earlier run.
 
 	"""
-	r = httpx.get(
-		"https://github.com/a9-i/frog/tree/main/ImgSetOpt", timeout=10,
-	)
-	soup = BeautifulSoup(r.content.decode("utf-8"), "html.parser")
+
+	def parse(r: httpx.Response) -> list[str]:
+		soup = BeautifulSoup(r.content.decode("utf-8"), "html.parser")
+		try:
+			j = loads(soup.find_all("script")[-1].text)["payload"]
+		except KeyError:
+			j = loads(
+				soup.find_all("script")[-2].text.replace("\\", "\\\\"),
+			)["payload"]
+		return [i["name"] for i in j["codeViewTreeRoute"]["tree"]["items"]]
+
+	url = GitHubRoot + "a9-i/frog/tree/main/ImgSetOpt"
 	try:
-		j = loads(soup.find_all("script")[-1].text)["payload"]
-	except KeyError:
-		j = loads(
-			soup.find_all("script")[-2].text.replace("\\", "\\\\"),
-		)["payload"]
-	return [i["name"] for i in j["codeViewTreeRoute"]["tree"]["items"]]
+		frogs = await HttpDiskCache.fetch(http_client(GitHubRoot), url, parse)
+	except (httpx.HTTPError, LookupError, ValueError):
+		frogs = None
+	if frogs is None:
+		logger.warning("Failed to fetch the list of frog pictures")
+		entry = HttpDiskCache.entry(url)
+		frogs = [] if entry is None else entry["value"]
+	return frogs
 
 
-FrogList = get_frog_list()
+# Filled in by the first !frog that gets the list, then kept for the life of
+# the process.
+FrogList: list[str] = []
 
 
 async def get_animal(animal_type: str) -> str:
+	global FrogList  # noqa: PLW0603
 	url: str | None = None
 
 	if animal_type == "bear":
@@ -419,7 +1055,8 @@ async def get_animal(animal_type: str) -> str:
 		)
 
 	elif animal_type == "frog":
-		url = FrogRootUrl + random.choice(FrogList)
+		FrogList = FrogList or await get_frog_list()
+		url = FrogRootUrl + random.choice(FrogList) if FrogList else None
 
 	elif animal_type == "seal":
 		url = SealRootUrl.format(str(random.randint(0, 83)).rjust(4, "0"))
@@ -487,7 +1124,168 @@ async def define(word: str) -> nextcord.Embed:
 	)
 
 
-def roll(text: str) -> tuple[int, int, str, bool, int] | None:
+class BbRandom:
+	"""
+	Source of randomness for Beardless Bot's games of chance.
+
+	An unseeded BbRandom defers to the global random module at call time.
+	A seeded one draws from its own generator instead, so replaying the
+	same seed and the same sequence of calls reproduces every flip, roll,
+	and card exactly.
+
+	Attributes:
+		seed (int or None): The seed to replay this source with, if any
+
+	Methods:
+		randint(a, b):
+			Returns a random integer N such that a <= N <= b.
+		choice(seq):
+			Returns a random element from a non-empty sequence.
+		flip():
+			Flips a coin, returning 1 for heads and 0 for tails.
+		roll(sides, count):
+			Rolls count dice with the given number of sides.
+
+	"""
+
+	def __init__(self, seed: int | None = None) -> None:
+		"""
+		Create a new BbRandom instance.
+
+		Args:
+			seed (int or None): The seed for this source; if None, use the
+				global random module (default is None)
+
+		"""
+		self.seed = seed
+		self._rng = None if seed is None else random.Random(seed)
+
+	def randint(self, a: int, b: int) -> int:
+		"""
+		Return a random integer N such that a <= N <= b.
+
+		Args:
+			a (int): The lowest possible result
+			b (int): The highest possible result
+
+		Returns:
+			int: The random integer.
+
+		"""
+		if self._rng is None:
+			return random.randint(a, b)
+		return self._rng.randint(a, b)
+
+	def choice[T](self, seq: Sequence[T]) -> T:
+		"""
+		Return a random element from a non-empty sequence.
+
+		Args:
+			seq (Sequence): The sequence to choose from
+
+		Returns:
+			The chosen element.
+
+		"""
+		if self._rng is None:
+			return random.choice(seq)
+		return self._rng.choice(seq)
+
+	def flip(self) -> int:
+		"""
+		Flip a coin.
+
+		Returns:
+			int: 1 for heads, 0 for tails.
+
+		"""
+		if self._rng is None:
+			return random.randint(0, 1)
+		return self._rng.getrandbits(1)
+
+	def roll(self, sides: int, count: int = 1) -> list[int]:
+		"""
+		Roll several dice at once.
+
+		Args:
+			sides (int): The number of sides on each die
+			count (int): The number of dice to roll (default is 1)
+
+		Returns:
+			list[int]: The result of each die.
+
+		"""
+		if self._rng is None:
+			return [random.randint(1, sides) for _ in range(count)]
+		return self._rng.choices(range(1, sides + 1), k=count)
+
+
+SeedSource: random.Random | None = None
+
+
+def seed_rng(seed: int | None) -> None:
+	"""
+	Turn seeded mode on or off for every future call to new_rng.
+
+	In seeded mode, each game or command gets its own seed, drawn from a
+	master generator seeded with seed. Replaying the master seed replays
+	every game in order, and any single game can be replayed on its own
+	from the seed new_rng logs for it, alongside what it was for.
+
+	Args:
+		seed (int or None): The master seed; if None, go back to drawing
+			from the global random module
+
+	"""
+	global SeedSource  # noqa: PLW0603
+	SeedSource = None if seed is None else random.Random(seed)
+
+
+def new_rng(seed: int | None = None, *, context: str = "") -> BbRandom:
+	"""
+	Create the source of randomness for a single game or command.
+
+	Args:
+		seed (int or None): The seed to replay; if None, draw one from the
+			master seed in seeded mode, or go unseeded otherwise
+			(default is None)
+		context (str): What the source is for, logged with its seed so
+			the seed can be found again (default is "")
+
+	Returns:
+		BbRandom: The new source of randomness.
+
+	"""
+	if seed is None and SeedSource is not None:
+		seed = SeedSource.getrandbits(64)
+	if seed is not None:
+		if context:
+			logger.info("Seeded RNG with %i; %s", seed, context)
+		else:
+			logger.info("Seeded RNG with %i", seed)
+	return BbRandom(seed)
+
+
+def rng_context(ctx: BotContext) -> str:
+	"""
+	Describe a command invocation for new_rng's log line.
+
+	Args:
+		ctx (botContext): The command invocation context
+
+	Returns:
+		str: The command, its author, and the channel it was sent in.
+
+	"""
+	return (
+		f"Command: {ctx.invoked_with}; Author: {ctx.author}"
+		f" ({ctx.author.id}); Channel: {ctx.channel} ({ctx.channel.id})"
+	)
+
+
+def roll(
+	text: str, rng: BbRandom | None = None,
+) -> tuple[int, int, str, bool, int] | None:
 	"""
 	Convert a roll message into a dice roll.
 
@@ -496,6 +1294,8 @@ def roll(text: str) -> tuple[int, int, str, bool, int] | None:
 
 	Args:
 		text (str): The roll string to process
+		rng (BbRandom or None): The source of randomness; if None, use
+			new_rng() (default is None)
 
 	Returns:
 		tuple[int, int, str, bool, int] | None: None if the roll failed due
@@ -530,9 +1330,7 @@ def roll(text: str) -> tuple[int, int, str, bool, int] | None:
 			modifier = (-1 if "-" in command else 1) * min(int(bonus), 999999)
 		else:
 			modifier = 0
-		dice_sum = sum(
-			random.randint(1, int(side)) for i in range(number_of_dice)
-		)
+		dice_sum = sum((rng or new_rng()).roll(int(side), number_of_dice))
 		return (
 			dice_sum + modifier,
 			number_of_dice,
@@ -544,9 +1342,11 @@ def roll(text: str) -> tuple[int, int, str, bool, int] | None:
 
 
 def roll_report(
-	text: str, author: nextcord.User | nextcord.Member,
+	text: str,
+	author: nextcord.User | nextcord.Member,
+	rng: BbRandom | None = None,
 ) -> nextcord.Embed:
-	if (result := roll(text.lower())) is not None:
+	if (result := roll(text.lower(), rng)) is not None:
 		modifier = "" if result[3] else "+"
 		title = f"Rolling {result[1]}d{result[2]}{modifier}{result[4]}"
 		report = f"You got {result[0]}, {author.mention}."
@@ -710,8 +1510,8 @@ class BbHelpCommand(commands.HelpCommand):
 			),
 			(
 				"!blackjack [bet]",
-				"Starts up a game of blackjack. Once you're in a"
-				" game, you can use !hit and !stay to play.",
+				"Starts up a game of blackjack. Once you're in a game, you"
+				" can use !hit and !stay to play, or !hint for advice.",
 			),
 			(
 				"!roll [count]d[num][+/-][mod]",
@@ -0,0 +1,547 @@
+"""
+Beardless Bot blackjack simulator.
+
+Plays large batches of hands of single-player blackjack under the exact
+rules implemented by bucks.BlackjackGame, in order to measure the house
+edge, variance, and bust rates of a given rule set. Every hand in a batch
+is advanced in lockstep with NumPy, so the per-card Python overhead is paid
+once per batch rather than once per hand.
+
+Run `python3 simulator.py --help` for usage.
+"""
+
+import argparse
+import json
+import logging
+import math
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, replace
+from functools import cache
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import numpy.typing as npt
+
+from bucks import BlackjackGame, HintsPath
+
+logger = logging.getLogger(__name__)
+
+Suits: Final[int] = 4
+DefaultBatchSize: Final[int] = 250000
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+
+@dataclass(frozen=True, slots=True)
+class RuleSet:
+	"""
+	The rules of a game of blackjack.
+
+	Defaults are read straight from bucks.BlackjackGame so that the
+	simulator cannot drift from the game the bot actually plays.
+
+	Attributes:
+		goal (int): The desired score
+		dealer_soft_goal (int): The sum at which the dealer stops drawing
+		ace_val (int): The high value of an Ace
+		card_vals (tuple[int, ...]): Blackjack values for each card in a suit
+		decks (int): The number of decks in the shoe
+
+	"""
+
+	goal: int = BlackjackGame.Goal
+	dealer_soft_goal: int = BlackjackGame.DealerSoftGoal
+	ace_val: int = BlackjackGame.AceVal
+	card_vals: tuple[int, ...] = BlackjackGame.CardVals
+	decks: int = BlackjackGame.NumOfDecksInMatch
+
+	@property
+	def ace_drop(self) -> int:
+		"""
+		How much a hand's total drops when an Ace is treated as a 1.
+
+		Returns:
+			int: The difference between the high and low values of an Ace.
+
+		"""
+		return self.ace_val - 1
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+	"""
+	Aggregate outcome of a simulation run.
+
+	All rates are fractions of the total number of hands played. Payouts are
+	1:1, so each hand's payoff is -1, 0, or 1 times the bet.
+
+	Attributes:
+		rules (RuleSet): The rules the hands were played under
+		hands (int): The number of hands played
+		house_edge (float): The expected loss per unit bet
+		variance (float): The variance of the payoff per unit bet
+		player_bust_rate (float): How often the player went over goal
+		dealer_bust_rate (float): How often the dealer went over goal
+		push_rate (float): How often the player's bet was returned
+		dealer_blackjack_rate (float): How often the dealer was dealt goal
+		player_goal_rate (float): How often the player reached goal
+
+	"""
+
+	rules: RuleSet
+	hands: int
+	house_edge: float
+	variance: float
+	player_bust_rate: float
+	dealer_bust_rate: float
+	push_rate: float
+	dealer_blackjack_rate: float
+	player_goal_rate: float
+
+	@property
+	def standard_error(self) -> float:
+		"""
+		Standard error of the house edge estimate.
+
+		Returns:
+			float: The standard error of the mean payoff.
+
+		"""
+		return math.sqrt(self.variance / self.hands)
+
+
+def threshold_policy(stand_on: int, rules: RuleSet | None = None) -> BoolArray:
+	"""
+	Build a policy that hits on any total below stand_on.
+
+	Policies are boolean arrays indexed by [player total, soft, dealer up
+	card], where soft is 1 if the player holds an Ace still counted high.
+	True means hit.
+
+	Args:
+		stand_on (int): The lowest total on which to stay
+		rules (RuleSet | None): The rules the policy is for; if None, use
+			the default rules (default is None)
+
+	Returns:
+		BoolArray: The policy.
+
+	"""
+	rules = rules or RuleSet()
+	policy = np.zeros((rules.goal + 1, 2, rules.ace_val + 1), dtype=np.bool_)
+	policy[:stand_on] = True
+	return policy
+
+
+def _dealer_outcomes(rules: RuleSet) -> dict[int, dict[int, float]]:
+	# Infinite-deck distribution of the dealer's final total for each up
+	# card, given that the dealer did not get dealt goal.
+	deck = Counter(rules.card_vals)
+	odds = {card: count / len(rules.card_vals) for card, count in deck.items()}
+
+	@cache
+	def finish(total: int, soft: int) -> dict[int, float]:
+		# Follows BlackjackGame.dealer_draw, as _play_dealer does. Once even
+		# dropping every Ace leaves the dealer over goal, they have busted;
+		# stopping there cuts off the endless run of Aces an infinite shoe
+		# would otherwise allow.
+		if (
+			total == rules.dealer_soft_goal
+			or (total > rules.dealer_soft_goal and not soft)
+			or total - soft * rules.ace_drop > rules.goal
+		):
+			return {total: 1.0}
+		if total > rules.dealer_soft_goal:
+			total -= rules.ace_drop
+			soft -= 1
+		outcome: defaultdict[int, float] = defaultdict(float)
+		for card, chance in odds.items():
+			drawn = finish(total + card, soft + (card == rules.ace_val))
+			for final, p in drawn.items():
+				outcome[final] += chance * p
+		return dict(outcome)
+
+	outcomes: dict[int, dict[int, float]] = {}
+	for up in odds:
+		outcome: defaultdict[int, float] = defaultdict(float)
+		for hole, chance in odds.items():
+			if up + hole != rules.goal:
+				soft = (up == rules.ace_val) + (hole == rules.ace_val)
+				for final, p in finish(up + hole, soft).items():
+					outcome[final] += chance * p
+		norm = sum(outcome.values())
+		outcomes[up] = {final: p / norm for final, p in outcome.items()}
+	return outcomes
+
+
+def _hit_values(
+	rules: RuleSet, dealer: dict[int, float],
+) -> tuple[dict[int, float], dict[tuple[int, int], float]]:
+	# Expected payoff of staying on, and of hitting on, every player hand
+	# against a dealer whose final total is distributed as dealer.
+	deck = Counter(rules.card_vals)
+	odds = {card: count / len(rules.card_vals) for card, count in deck.items()}
+	stay = {
+		total: sum(
+			p * (
+				1 if total > final or final > rules.goal
+				else 0 if total == final else -1
+			)
+			for final, p in dealer.items()
+		)
+		for total in range(rules.goal + 1)
+	}
+
+	@cache
+	def best(total: int, soft: int) -> float:
+		if total > rules.goal:
+			return -1
+		if total == rules.goal:
+			return 1
+		return max(stay[total], hit(total, soft))
+
+	@cache
+	def hit(total: int, soft: int) -> float:
+		value = 0.0
+		for card, chance in odds.items():
+			new_total = total + card
+			new_soft = soft + (card == rules.ace_val)
+			if new_total > rules.goal and new_soft:
+				new_total -= rules.ace_drop
+				new_soft -= 1
+			value += chance * best(new_total, new_soft)
+		return value
+
+	hits = {
+		(total, soft): hit(total, soft)
+		for total in range(rules.goal)
+		for soft in (0, 1)
+	}
+	return stay, hits
+
+
+def basic_strategy(rules: RuleSet | None = None) -> BoolArray:
+	"""
+	Solve for the policy that maximizes the player's expected payoff.
+
+	The dealer's hand is solved exactly, assuming an infinite shoe, for
+	every up card; the player then hits wherever hitting is worth strictly
+	more than staying. Dealer blackjack has already ended the round by the
+	time the player acts, so the dealer is known not to hold goal.
+
+	Args:
+		rules (RuleSet | None): The rules to solve for; if None, use the
+			bot's rules (default is None)
+
+	Returns:
+		BoolArray: The policy, in the same format as threshold_policy.
+
+	"""
+	rules = rules or RuleSet()
+	policy = threshold_policy(0, rules)
+	for up, dealer in _dealer_outcomes(rules).items():
+		stay, hits = _hit_values(rules, dealer)
+		for (total, soft), value in hits.items():
+			policy[total, soft, up] = value > stay[total]
+	return policy
+
+
+def write_hints(
+	path: Path = HintsPath, rules: RuleSet | None = None,
+) -> None:
+	"""
+	Write the basic strategy table used by !hint.
+
+	Rows are player totals, and each character in a row is the play against
+	one dealer up card: H to hit, S to stay.
+
+	Args:
+		path (Path): Where to write the table (default is HintsPath)
+		rules (RuleSet | None): The rules to solve for; if None, use the
+			bot's rules (default is None)
+
+	"""
+	rules = rules or RuleSet()
+	policy = basic_strategy(rules)
+	upcards = sorted(set(rules.card_vals))
+	lowest = 2 * min(upcards)
+
+	def rows(soft: int, totals: range) -> dict[str, str]:
+		return {
+			str(total): "".join(
+				"H" if policy[total, soft, up] else "S" for up in upcards
+			)
+			for total in totals
+		}
+
+	table = {
+		"rules": asdict(rules),
+		"upcards": upcards,
+		"hard": rows(0, range(lowest, rules.goal)),
+		"soft": rows(1, range(rules.ace_val + 1, rules.goal)),
+	}
+	with path.open("w", encoding="UTF-8") as f:
+		json.dump(table, f, indent=4)
+		f.write("\n")
+
+
+class _Shoe:
+	"""
+	One shoe per simulated hand, with draws vectorized across hands.
+
+	Each hand only ever draws from its own shoe, without replacement, exactly
+	like a fresh BlackjackGame. Shoes are stored as per-value card counts
+	rather than shuffled lists, so a draw costs O(distinct card values).
+	"""
+
+	def __init__(
+		self, rules: RuleSet, hands: int, rng: np.random.Generator,
+	) -> None:
+		self.values = np.array(sorted(set(rules.card_vals)), dtype=np.int64)
+		per_value = [
+			rules.card_vals.count(int(v)) * Suits * rules.decks
+			for v in self.values
+		]
+		self.counts = np.tile(np.array(per_value, dtype=np.int64), (hands, 1))
+		self.remaining = np.full(hands, sum(per_value), dtype=np.int64)
+		self.rng = rng
+
+	def draw(self, idx: IntArray) -> IntArray:
+		"""Draw one card for each hand in idx."""
+		u = self.rng.random(len(idx)) * self.remaining[idx]
+		cumulative = np.cumsum(self.counts[idx], axis=1)
+		picks = (cumulative <= u[:, None]).sum(axis=1)
+		self.counts[idx, picks] -= 1
+		self.remaining[idx] -= 1
+		return self.values[picks]
+
+
+def _play_dealer(
+	rules: RuleSet,
+	shoe: _Shoe,
+	dealer: IntArray,
+	dealer_soft: IntArray,
+	drawing: IntArray,
+) -> None:
+	# Follows BlackjackGame.dealer_draw: an Ace is dropped to 1 whenever the
+	# dealer is over the soft goal, and the dealer then draws again.
+	while len(drawing):
+		at_goal = dealer[drawing] == rules.dealer_soft_goal
+		over = dealer[drawing] > rules.dealer_soft_goal
+		convert = over & (dealer_soft[drawing] > 0)
+		dealer[drawing[convert]] -= rules.ace_drop
+		dealer_soft[drawing[convert]] -= 1
+		drawing = drawing[~(at_goal | (over & ~convert))]
+		card = shoe.draw(drawing)
+		dealer[drawing] += card
+		dealer_soft[drawing] += card == rules.ace_val
+
+
+def _play_batch(
+	rules: RuleSet,
+	policy: BoolArray,
+	hands: int,
+	rng: np.random.Generator,
+) -> dict[str, int]:
+	shoe = _Shoe(rules, hands, rng)
+	everyone = np.arange(hands)
+	ace = rules.ace_val
+
+	# Same order as BlackjackGame._deal_cards: dealer first, then player.
+	up = shoe.draw(everyone)
+	dealer = up + shoe.draw(everyone)
+	dealer_soft = (up == ace).astype(np.int64)
+	dealer_soft += dealer - up == ace
+	first = shoe.draw(everyone)
+	second = shoe.draw(everyone)
+	total = first + second
+	soft = (first == ace).astype(np.int64) + (second == ace)
+
+	payoff = np.zeros(hands, dtype=np.int64)
+	player_bust = np.zeros(hands, dtype=np.bool_)
+
+	# Dealer blackjack ends the round before anyone acts.
+	dealer_blackjack = dealer == rules.goal
+	payoff[dealer_blackjack & (total != rules.goal)] = -1
+
+	# Two Aces: one of them is treated as a 1.
+	doubled = total > rules.goal
+	total[doubled] -= rules.ace_drop
+	soft[doubled] -= 1
+
+	player_goal = ~dealer_blackjack & (total == rules.goal)
+	payoff[player_goal] = 1
+	done = dealer_blackjack | player_goal
+
+	def hitting(idx: IntArray) -> IntArray:
+		hit: IntArray = idx[
+			policy[total[idx], np.minimum(soft[idx], 1), up[idx]]
+		]
+		return hit
+
+	active = hitting(np.flatnonzero(~done))
+	while len(active):
+		card = shoe.draw(active)
+		total[active] += card
+		soft[active] += card == ace
+		convert = active[(total[active] > rules.goal) & (soft[active] > 0)]
+		total[convert] -= rules.ace_drop
+		soft[convert] -= 1
+
+		busted = active[total[active] > rules.goal]
+		reached = active[total[active] == rules.goal]
+		player_bust[busted] = done[busted] = True
+		player_goal[reached] = done[reached] = True
+		active = hitting(active[~done[active]])
+	payoff[player_bust] = -1
+	payoff[player_goal] = 1
+
+	stayed = np.flatnonzero(~done)
+	_play_dealer(rules, shoe, dealer, dealer_soft, stayed)
+	player, house = total[stayed], dealer[stayed]
+	payoff[stayed] = np.where(
+		(player > house) | (house > rules.goal),
+		1,
+		np.where(player == house, 0, -1),
+	)
+	return {
+		"payoff": int(payoff.sum()),
+		"payoff_squared": int((payoff * payoff).sum()),
+		"player_bust": int(player_bust.sum()),
+		"dealer_bust": int((house > rules.goal).sum()),
+		"push": int((payoff == 0).sum()),
+		"dealer_blackjack": int(dealer_blackjack.sum()),
+		"player_goal": int(player_goal.sum()),
+	}
+
+
+def simulate(
+	hands: int,
+	rules: RuleSet | None = None,
+	policy: BoolArray | None = None,
+	seed: int | None = None,
+	batch_size: int = DefaultBatchSize,
+) -> SimulationResult:
+	"""
+	Play many hands of single-player blackjack.
+
+	Args:
+		hands (int): The number of hands to play
+		rules (RuleSet | None): The rules to play under; if None, use the
+			bot's rules (default is None)
+		policy (BoolArray | None): When the player hits, as returned by
+			threshold_policy; if None, mimic the dealer (default is None)
+		seed (int | None): Seed for the random number generator, for
+			reproducible runs (default is None)
+		batch_size (int): The most hands to hold in memory at once
+			(default is DefaultBatchSize)
+
+	Returns:
+		SimulationResult: The aggregate outcome of every hand.
+
+	"""
+	rules = rules or RuleSet()
+	if policy is None:
+		policy = threshold_policy(rules.dealer_soft_goal, rules)
+	rng = np.random.default_rng(seed)
+	totals: dict[str, int] = {}
+	for start in range(0, hands, batch_size):
+		batch = _play_batch(rules, policy, min(batch_size, hands - start), rng)
+		for key, value in batch.items():
+			totals[key] = totals.get(key, 0) + value
+	mean = totals["payoff"] / hands
+	return SimulationResult(
+		rules=rules,
+		hands=hands,
+		house_edge=-mean,
+		variance=totals["payoff_squared"] / hands - mean * mean,
+		player_bust_rate=totals["player_bust"] / hands,
+		dealer_bust_rate=totals["dealer_bust"] / hands,
+		push_rate=totals["push"] / hands,
+		dealer_blackjack_rate=totals["dealer_blackjack"] / hands,
+		player_goal_rate=totals["player_goal"] / hands,
+	)
+
+
+def main() -> None:
+	"""Simulate the bot's rules, plus any requested variants, and log them."""
+	parser = argparse.ArgumentParser(
+		description="Measure the house edge of Beardless Bot blackjack.",
+	)
+	parser.add_argument("--hands", type=int, default=1000000)
+	parser.add_argument("--seed", type=int, default=None)
+	policy_group = parser.add_mutually_exclusive_group()
+	policy_group.add_argument(
+		"--stand-on",
+		type=int,
+		default=None,
+		help="Lowest total the player stays on; defaults to the dealer's.",
+	)
+	policy_group.add_argument(
+		"--basic-strategy",
+		action="store_true",
+		help="Play the solved basic strategy instead of a threshold.",
+	)
+	parser.add_argument(
+		"--dealer-soft-goal",
+		type=int,
+		nargs="*",
+		default=[],
+		help="Extra dealer soft goals to compare against the bot's own.",
+	)
+	parser.add_argument(
+		"--decks",
+		type=int,
+		nargs="*",
+		default=[],
+		help="Extra shoe sizes to compare against the bot's own.",
+	)
+	parser.add_argument(
+		"--write-hints",
+		action="store_true",
+		help=f"Regenerate {HintsPath} from the bot's rules.",
+	)
+	args = parser.parse_args()
+
+	if args.write_hints:
+		write_hints()
+		logger.info("Wrote %s", HintsPath)
+
+	rule_sets = [
+		RuleSet(),
+		*(
+			replace(RuleSet(), dealer_soft_goal=goal)
+			for goal in args.dealer_soft_goal
+		),
+		*(replace(RuleSet(), decks=d) for d in args.decks),
+	]
+	for rules in rule_sets:
+		policy = None
+		if args.basic_strategy:
+			policy = basic_strategy(rules)
+		elif args.stand_on is not None:
+			policy = threshold_policy(args.stand_on, rules)
+		result = simulate(args.hands, rules, policy, args.seed)
+		logger.info(
+			"Soft goal %i, %i decks: house edge %.4f (+/- %.4f), variance"
+			" %.4f, player bust %.4f, dealer bust %.4f, push %.4f, dealer"
+			" blackjack %.4f, player %i %.4f",
+			rules.dealer_soft_goal,
+			rules.decks,
+			result.house_edge,
+			result.standard_error,
+			result.variance,
+			result.player_bust_rate,
+			result.dealer_bust_rate,
+			result.push_rate,
+			result.dealer_blackjack_rate,
+			rules.goal,
+			result.player_goal_rate,
+		)
+
+
+if __name__ == "__main__":  # pragma: no cover
+	logging.basicConfig(format="%(message)s", level=logging.INFO)
+	main()